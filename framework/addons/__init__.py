@@ -1,9 +1,36 @@
 # -*- coding: utf-8 -*-
 
+import collections
+
+from modularodm import Q
+
 from framework.mongo import StoredObject
 from website import settings
 
 
+def load_addons(owners):
+    """Load the add-on settings records of several owners, querying each
+    settings collection once for all owners rather than once per record, and
+    cache the records on each owner.
+
+    :param list owners: `AddonModelMixin` records, e.g. the children of a node
+    """
+    owners = [owner for owner in owners if owner is not None]
+    ids_by_model = collections.defaultdict(set)
+    for owner in owners:
+        for addon_config in settings.ADDONS_AVAILABLE_DICT.values():
+            model = addon_config.settings_models.get(owner._name)
+            if model:
+                ids_by_model[model].update(owner._addon_ids(addon_config))
+    for model, ids in ids_by_model.iteritems():
+        missing = [each for each in ids if model._load_from_cache(each) is None]
+        if missing:
+            # Loaded records are added to the object cache
+            list(model.find(Q('_id', 'in', missing)))
+    for owner in owners:
+        owner.get_addons()
+
+
 class AddonModelMixin(StoredObject):
 
     _meta = {
@@ -38,6 +65,26 @@ class AddonModelMixin(StoredObject):
             addon_config.settings_models[self._name]._name,
         )
 
+    def _addon_ids(self, addon_config):
+        return tuple(
+            getattr(self, self._backref_key(addon_config))._to_primary_keys()
+        )
+
+    def _get_addon_records(self, addon_config):
+        """Get the settings records of an add-on that point to this owner.
+        Records are cached on the instance until the owner's back-references
+        to the add-on change.
+        """
+        ids = self._addon_ids(addon_config)
+        cache = self.__dict__.setdefault('_addon_cache', {})
+        cached = cache.get(addon_config.short_name)
+        if cached is None or cached[0] != ids:
+            model = addon_config.settings_models[self._name]
+            records = [model.load(each) for each in ids]
+            cached = (ids, [record for record in records if record is not None])
+            cache[addon_config.short_name] = cached
+        return cached[1]
+
     def get_addon(self, addon_name, deleted=False):
         """Get addon for node.
 
@@ -49,11 +96,7 @@ class AddonModelMixin(StoredObject):
         if not addon_config or not addon_config.settings_models.get(self._name):
             return False
 
-        backref_key = self._backref_key(addon_config)
-        addons = [
-            addon for addon in getattr(self, backref_key)
-            if addon is not None
-        ]
+        addons = self._get_addon_records(addon_config)
         if addons:
             if deleted or not addons[0].deleted:
                 assert len(addons) == 1, 'Violation of one-to-one mapping with addon model'
@@ -6,9 +6,12 @@ from datetime import datetime
 
 from framework.mongo import database
 from framework.sessions import session
+from framework.analytics.buffer import counter_buffer
 
 from flask import request
 
+from website import settings
+
 
 collection = database['pagecounters']
 
@@ -76,11 +79,9 @@ def update_counter(page, db=None):
     """Update counters for page.
 
     :param str page: Colon-delimited page key in analytics collection
-    :param db: MongoDB database or `None`
+    :param db: MongoDB database or `None`; if provided, counters are written
+        immediately rather than buffered
     """
-    db = db or database
-    collection = db['pagecounters']
-
     date = datetime.utcnow()
     date = date.strftime('%Y/%m/%d')
 
@@ -114,7 +115,13 @@ def update_counter(page, db=None):
         visited.append(page)
         session.data['visited'] = visited
     d['$inc']['total'] = 1
-    collection.update({'_id': page}, d, True, False)
+
+    if settings.ANALYTICS_BUFFER_COUNTERS and db is None:
+        counter_buffer.add(page, d['$inc'])
+    else:
+        db = db or database
+        collection = db['pagecounters']
+        collection.update({'_id': page}, d, True, False)
 
 
 def update_counters(rex, db=None):
@@ -130,7 +137,7 @@ def update_counters(rex, db=None):
         def wrapped(*args, **kwargs):
             ret = func(*args, **kwargs)
             page = build_page(rex, kwargs)
-            update_counter(page, db or database)
+            update_counter(page, db)
             return ret
         return wrapped
     return wrapper
@@ -154,3 +161,28 @@ def get_basic_counters(page, db=None):
         return unique, total
     else:
         return None, None
+
+
+def get_basic_counters_many(pages, db=None):
+    """Fetch counters for many pages in a single query.
+
+    :param list pages: Page keys in analytics collection
+    :param db: MongoDB database or `None`
+    :return: Dict mapping each page to a tuple of (unique, total); pages
+        without counters map to `(None, None)`
+    """
+    db = db or database
+    collection = db['pagecounters']
+    cleaned = dict((page, clean_page(page)) for page in pages)
+    results = collection.find(
+        {'_id': {'$in': list(set(cleaned.values()))}},
+        {'total': 1, 'unique': 1}
+    )
+    counters = dict(
+        (result['_id'], (result.get('unique', 0), result.get('total', 0)))
+        for result in results
+    )
+    return dict(
+        (page, counters.get(key, (None, None)))
+        for page, key in cleaned.items()
+    )
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""In-process write buffer for page counters. Increments for the same page key
+are merged in memory and written as a single upsert per key, either when the
+buffer holds too many keys or when the flush interval has elapsed. A daemon
+thread flushes buffers of idle processes once per interval.
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+import collections
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def merge_increments(target, increments):
+    """Merge a `$inc` document into another in place.
+
+    :param dict target: Accumulated increments
+    :param dict increments: Increments to add
+    """
+    for field, value in increments.iteritems():
+        target[field] = target.get(field, 0) + value
+    return target
+
+
+def write_counters(pending, db=None):
+    """Write merged counters to the `pagecounters` collection, issuing one
+    upsert per page key. Keys are removed from `pending` as they are written,
+    so that after a failure it holds only the increments still to be written.
+
+    :param dict pending: Dict mapping page keys to `$inc` documents
+    :param db: MongoDB database or `None`
+    :return: Number of writes issued
+    """
+    from framework.mongo import database
+    db = db or database
+    collection = db['pagecounters']
+    written = 0
+    for page in list(pending):
+        collection.update({'_id': page}, {'$inc': pending[page]}, True, False)
+        del pending[page]
+        written += 1
+    return written
+
+
+class CounterBuffer(object):
+    """Thread-safe buffer of pending counter increments, keyed by page.
+
+    :param int max_keys: Flush once this many distinct pages are pending
+    :param float interval: Flush once this many seconds have passed since the
+        last flush
+    :param writer: Callable receiving the dict of pending increments; it may
+        remove keys from the dict as they are written
+    :param bool periodic: Also flush from a daemon thread once per interval,
+        so that idle processes do not hold on to increments
+    """
+
+    def __init__(self, max_keys, interval, writer=write_counters, periodic=False):
+        self.max_keys = max_keys
+        self.interval = interval
+        self.writer = writer
+        self.periodic = periodic and interval > 0
+        self._timer_pid = None
+        self._lock = threading.Lock()
+        self._pending = collections.defaultdict(dict)
+        self._pending_count = 0
+        self._last_flush = time.time()
+        # Metrics: increments received and flushed vs. writes actually issued
+        self.received = 0
+        self.flushed = 0
+        self.written = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, page, increments):
+        """Merge increments for a page, flushing if a threshold is reached.
+
+        :param str page: Cleaned page key
+        :param dict increments: `$inc` document for the page
+        """
+        if self.periodic:
+            self._ensure_timer()
+        with self._lock:
+            merge_increments(self._pending[page], increments)
+            self._pending_count += 1
+            self.received += 1
+            due = (
+                len(self._pending) >= self.max_keys or
+                time.time() - self._last_flush >= self.interval
+            )
+        if due:
+            try:
+                self.flush()
+            except Exception:
+                # Already logged; increments stay buffered for the next flush
+                pass
+
+    def _ensure_timer(self):
+        """Start the flush thread of this process. Threads do not survive a
+        fork, so the thread is started lazily and again in each child process.
+        """
+        pid = os.getpid()
+        if self._timer_pid == pid:
+            return
+        with self._lock:
+            if self._timer_pid == pid:
+                return
+            self._timer_pid = pid
+        thread = threading.Thread(target=self._run_timer, name='counter-buffer-flush')
+        thread.daemon = True
+        thread.start()
+
+    def _run_timer(self):
+        while True:
+            time.sleep(self.interval)
+            if time.time() - self._last_flush < self.interval or not self._pending:
+                continue
+            try:
+                self.flush()
+            except Exception:
+                # Already logged; increments stay buffered for the next flush
+                pass
+
+    def drain(self):
+        """Remove all pending increments.
+
+        :return: Tuple of (dict of pending increments, number of merged calls)
+        """
+        with self._lock:
+            pending = dict(self._pending)
+            count = self._pending_count
+            self._pending = collections.defaultdict(dict)
+            self._pending_count = 0
+            self._last_flush = time.time()
+        return pending, count
+
+    def flush(self, writer=None):
+        """Write all pending increments.
+
+        :param writer: Optional callable overriding the buffer's writer
+        :return: Number of page keys flushed
+        """
+        pending, count = self.drain()
+        if not pending:
+            return 0
+        writer = writer or self.writer
+        try:
+            writer(pending)
+        except Exception:
+            logger.exception('Could not flush {0} page counters'.format(len(pending)))
+            # Put back the increments that were not written, so they can be
+            # retried on the next flush
+            with self._lock:
+                for page, increments in pending.iteritems():
+                    merge_increments(self._pending[page], increments)
+                self._pending_count += count
+            raise
+        with self._lock:
+            self.flushed += count
+            self.written += len(pending)
+        return len(pending)
+
+    @property
+    def writes_saved(self):
+        """Number of database writes avoided by merging increments."""
+        return self.flushed - self.written
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'flushed': self.flushed,
+            'written': self.written,
+            'pending': len(self._pending),
+            'writes_saved': self.writes_saved,
+        }
+
+
+def enqueue_write(pending):
+    """Hand merged counters to Celery so that writes happen outside of the
+    request; fall back to writing synchronously if Celery is disabled.
+    """
+    if settings.USE_CELERY:
+        from framework.analytics.tasks import write_counters as write_counters_task
+        write_counters_task.delay(pending)
+    else:
+        write_counters(pending)
+
+
+counter_buffer = CounterBuffer(
+    max_keys=settings.ANALYTICS_BUFFER_MAX_KEYS,
+    interval=settings.ANALYTICS_BUFFER_INTERVAL,
+    writer=enqueue_write,
+    periodic=True,
+)
+
+
+@atexit.register
+def flush_on_exit():
+    """Write remaining counters directly on interpreter exit; Celery may no
+    longer accept tasks at this point.
+    """
+    try:
+        counter_buffer.flush(writer=write_counters)
+    except Exception:
+        pass
@@ -5,6 +5,7 @@ from framework.tasks.handlers import queued_task
 from framework.transactions.context import transaction
 
 from . import piwik
+from . import buffer
 
 
 @queued_task
@@ -30,3 +31,17 @@ def update_node(self, node_id, updated_fields=None):
         piwik._update_node_object(node, updated_fields)
     except Exception as error:
         raise self.retry(exc=error)
+
+
+@app.task(bind=True, max_retries=5, default_retry_delay=60)
+def write_counters(self, pending):
+    """Write page counters merged by `buffer.CounterBuffer`.
+
+    :param dict pending: Dict mapping page keys to `$inc` documents
+    """
+    try:
+        buffer.write_counters(pending)
+    except Exception as error:
+        # `pending` now holds only the keys that were not written; retrying
+        # the rest would count them twice
+        raise self.retry(args=(pending,), exc=error)
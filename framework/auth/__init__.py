@@ -153,6 +153,10 @@ def logout():
             del session.data[key]
         except KeyError:
             pass
+    if session._get_current_object():
+        # NOTE: Avoid circular import
+        from website.addons.base import invalidate_auth_cache
+        invalidate_auth_cache(session_id=session._id)
     return True
 
 
@@ -2,10 +2,9 @@
 import re
 import logging
 import urlparse
-import itertools
 import datetime as dt
+import collections
 
-import bson
 import pytz
 
 from modularodm import fields, Q
@@ -122,8 +121,8 @@ def get_user(email=None, password=None, verification_key=None):
 
     query_list = []
     if email:
-        email = email.strip().lower()
-        query_list.append(Q('emails', 'eq', email) | Q('username', 'eq', email))
+        email = utils.normalize_email(email)
+        query_list.append(Q('normalized_emails', 'eq', email) | Q('username', 'eq', email))
     if password:
         password = password.strip()
         try:
@@ -279,6 +278,10 @@ class User(GuidStoredObject, AddonModelMixin):
     # all User's email lists
     emails = fields.StringField(list=True)
 
+    # normalized copies of ``emails``, maintained on save; use for all
+    # case-insensitive email lookups. Empty for merged users.
+    normalized_emails = fields.StringField(list=True, index=True)
+
     # email verification tokens
     #   see also ``unconfirmed_emails``
     email_verifications = fields.DictionaryField(default=dict)
@@ -721,7 +724,7 @@ class User(GuidStoredObject, AddonModelMixin):
         email = self._get_unconfirmed_email_for_token(token)
 
         # If this email is confirmed on another account, abort
-        if User.find(Q('emails', 'iexact', email)).count() > 0:
+        if User.find(Q('normalized_emails', 'eq', utils.normalize_email(email))).count() > 0:
             raise exceptions.DuplicateEmailError()
 
         # If another user has this email as its username, get it
@@ -890,6 +893,7 @@ class User(GuidStoredObject, AddonModelMixin):
         # Avoid circular import
         from framework.analytics import tasks as piwik_tasks
         self.username = self.username.lower().strip() if self.username else None
+        self.normalized_emails = self.get_normalized_emails()
         ret = super(User, self).save(*args, **kwargs)
         if self.SEARCH_UPDATE_FIELDS.intersection(ret) and self.is_confirmed:
             self.update_search()
@@ -905,11 +909,24 @@ class User(GuidStoredObject, AddonModelMixin):
             logger.exception(e)
             log_exception()
 
+    def get_normalized_emails(self):
+        """Return this user's confirmed emails, normalized and without
+        duplicates. Merged users are not found by email.
+        """
+        if self.merged_by is not None:
+            return []
+        normalized = []
+        for email in self.emails:
+            email = utils.normalize_email(email)
+            if email and email not in normalized:
+                normalized.append(email)
+        return normalized
+
     @classmethod
     def find_by_email(cls, email):
         try:
             user = cls.find_one(
-                Q('emails', 'eq', email)
+                Q('normalized_emails', 'eq', utils.normalize_email(email))
             )
             return [user]
         except:
@@ -960,31 +977,49 @@ class User(GuidStoredObject, AddonModelMixin):
         watched_node_ids = set([config.node._id for config in self.watched])
         return node._id in watched_node_ids
 
-    def get_recent_log_ids(self, since=None):
-        '''Return a generator of recent logs' ids.
+    def get_watched_node_ids(self):
+        '''Return the primary keys of watched nodes, using a single query.
+        '''
+        from website.project.model import WatchConfig
+        watch_config_ids = self.watched._to_primary_keys()
+        if not watch_config_ids:
+            return []
+        configs = WatchConfig._storage[0].store.find(
+            {'_id': {'$in': watch_config_ids}},
+            {'node': True},
+        )
+        return [config['node'] for config in configs if config.get('node')]
+
+    def get_recent_logs(self, since=None):
+        '''Return a query set of logs on watched nodes, most recent first.
+        Logs are selected by the nodes that list them, so the number of
+        queries does not depend on the number of watched nodes, and a log
+        listed by several watched nodes (e.g. a component and its parent)
+        is only returned once.
 
         :param since: A datetime specifying the oldest time to retrieve logs
         from. If ``None``, defaults to 60 days before today. Must be a tz-aware
-        datetime because PyMongo's generation times are tz-aware.
-
-        :rtype: generator of log ids (strings)
+        datetime.
         '''
-        log_ids = []
+        from website.project.model import NodeLog
         # Default since to 60 days before today if since is None
         # timezone aware utcnow
         utcnow = dt.datetime.utcnow().replace(tzinfo=pytz.utc)
         since_date = since or (utcnow - dt.timedelta(days=60))
-        for config in self.watched:
-            # Extract the timestamps for each log from the log_id (fast!)
-            # The first 4 bytes of Mongo's ObjectId encodes time
-            # This prevents having to load each Log Object and access their
-            # date fields
-            node_log_ids = [log_id for log_id in config.node.logs._to_primary_keys()
-                                   if bson.ObjectId(log_id).generation_time > since_date and
-                                   log_id not in log_ids]
-            # Log ids in reverse chronological order
-            log_ids = _merge_into_reversed(log_ids, node_log_ids)
-        return (l_id for l_id in log_ids)
+        # Log dates are stored as naive UTC datetimes
+        since_date = since_date.astimezone(pytz.utc).replace(tzinfo=None)
+        return NodeLog.find(
+            Q('__backrefs.logged.node.logs', 'in', self.get_watched_node_ids()) &
+            Q('date', 'gt', since_date)
+        ).sort('-date', '-_id')
+
+    def get_recent_log_ids(self, since=None):
+        '''Return a generator of recent logs' ids.
+
+        :param since: See ``get_recent_logs``
+        :rtype: generator of log ids (strings)
+        '''
+        return (log._id for log in self.get_recent_logs(since=since))
 
     def get_daily_digest_log_ids(self):
         '''Return a generator of log ids generated in the past day
@@ -1119,10 +1154,70 @@ class User(GuidStoredObject, AddonModelMixin):
 
     def n_projects_in_common(self, other_user):
         """Returns number of "shared projects" (projects that both users are contributors for)"""
-        return len(self.get_projects_in_common(other_user, primary_keys=True))
+        if other_user == self:
+            return len(self.node__contributed._to_primary_keys())
+        return self.get_cocontributor_counts().get(other_user._id, 0)
+
+    def get_cocontributor_counts(self):
+        """Return a dict mapping the IDs of users this user shares projects
+        with to the number of projects shared. Counts are maintained by
+        `update_cocontributor_counts` as contributors change; a user's counts
+        are computed from scratch the first time they are read.
+        """
+        record = framework.mongo.database['cocontributors'].find_one({'_id': self._id})
+        if record and record.get('initialized'):
+            return dict(
+                (user_id, count)
+                for user_id, count in record.get('counts', {}).iteritems()
+                if count > 0
+            )
+        from website.project.model import Node
+        counts = collections.Counter(
+            user_id
+            for node in Node._storage[0].store.find(
+                {'contributors': self._id},
+                {'contributors': True},
+            )
+            for user_id in node['contributors']
+            if user_id != self._id
+        )
+        framework.mongo.database['cocontributors'].update(
+            {'_id': self._id},
+            {'$set': {'counts': dict(counts), 'initialized': True}},
+            upsert=True,
+        )
+        return dict(counts)
 
 
-def _merge_into_reversed(*iterables):
-    '''Merge multiple sorted inputs into a single output in reverse order.
-    '''
-    return sorted(itertools.chain(*iterables), reverse=True)
+def _pair_increments(increments, member_ids, changed_ids, sign):
+    for user_id in changed_ids:
+        for other_id in member_ids:
+            # Count each pair of changed users once
+            if other_id == user_id or (other_id in changed_ids and other_id < user_id):
+                continue
+            increments[user_id][other_id] += sign
+            increments[other_id][user_id] += sign
+
+
+def update_cocontributor_counts(old_ids, new_ids):
+    """Update co-contributor counts after the contributors of a project change
+    from `old_ids` to `new_ids`.
+
+    :param set old_ids: Previous contributor IDs
+    :param set new_ids: Current contributor IDs
+    """
+    increments = collections.defaultdict(collections.Counter)
+    _pair_increments(increments, new_ids, new_ids - old_ids, 1)
+    _pair_increments(increments, old_ids, old_ids - new_ids, -1)
+    for user_id, counts in increments.iteritems():
+        update = dict(
+            ('counts.{0}'.format(other_id), count)
+            for other_id, count in counts.iteritems()
+            if count
+        )
+        if update:
+            framework.mongo.database['cocontributors'].update(
+                {'_id': user_id},
+                {'$inc': update},
+                upsert=True,
+            )
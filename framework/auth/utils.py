@@ -33,3 +33,9 @@ def privacy_info_handle(info, anonymous, name=False):
     if anonymous:
         return 'A user' if name else ''
     return info
+
+
+def normalize_email(email):
+    """Normalize an email address for case-insensitive lookups.
+    """
+    return email.strip().lower() if email else email
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Bounded in-process caches. Each web or Celery worker process holds its own
+copy, so cached values must be safe to serve until they expire or are
+invalidated locally.
+"""
+
+import time
+import threading
+import collections
+
+
+class LRUCache(object):
+    """Thread-safe least-recently-used cache with optional per-entry expiry.
+
+    :param int max_size: Maximum number of entries
+    :param ttl: Default lifetime of entries in seconds, or `None` to keep
+        entries until evicted
+    """
+
+    def __init__(self, max_size, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, record=False) is not None
+
+    def get(self, key, default=None, record=True):
+        now = time.time()
+        with self._lock:
+            try:
+                value, expires = self._data.pop(key)
+            except KeyError:
+                if record:
+                    self.misses += 1
+                return default
+            if expires is not None and expires <= now:
+                if record:
+                    self.misses += 1
+                return default
+            # Re-insert to mark as most recently used
+            self._data[key] = (value, expires)
+            if record:
+                self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Add or replace an entry.
+
+        :param ttl: Lifetime in seconds; defaults to the cache's `ttl`. Pass
+            `0` for an entry that never expires regardless of the default
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expires)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_matching(self, predicate):
+        """Remove all entries whose key satisfies `predicate`.
+
+        :return: Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+        }
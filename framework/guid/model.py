@@ -1,9 +1,23 @@
 # -*- coding: utf-8 -*-
 
+import threading
+import collections
+
 from modularodm import fields
+from modularodm.storage.base import KeyExistsException
 
+from framework.cache import LRUCache
 from framework.mongo import StoredObject
 
+from website import settings
+
+
+# Resolved GUIDs keyed by GUID primary key. Values are tuples of (referent
+# schema name, referent deep URL); GUIDs that resolve to nothing are stored as
+# `MISSING_GUID` with a short lifetime
+guid_cache = LRUCache(settings.GUID_CACHE_SIZE, ttl=settings.GUID_CACHE_TTL)
+MISSING_GUID = (None, None)
+
 
 class Guid(StoredObject):
 
@@ -14,10 +28,56 @@ class Guid(StoredObject):
         'optimistic': True,
     }
 
+    def save(self, *args, **kwargs):
+        ret = super(Guid, self).save(*args, **kwargs)
+        guid_cache.delete(self._id)
+        return ret
+
     def __repr__(self):
         return '<id:{0}, referent:({1}, {2})>'.format(self._id, self.referent._primary_key, self.referent._name)
 
 
+class GuidBlock(object):
+    """Per-process block of GUID keys that were free when the block was
+    filled. Keys are not reserved in the database, so another process may
+    still take a key first; callers must handle `KeyExistsException`.
+
+    :param int size: Number of candidate keys generated per fill
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._keys = collections.deque()
+        self._lock = threading.Lock()
+
+    def _fill(self):
+        storage = Guid._storage[0]
+        candidates = set()
+        while len(candidates) < self.size:
+            candidates.add(storage._generate_random_id())
+        taken = set(
+            record['_id']
+            for record in storage.store.find(
+                {'_id': {'$in': list(candidates)}},
+                {'_id': True},
+            )
+        )
+        self._keys.extend(candidates - taken)
+
+    def pop(self):
+        with self._lock:
+            while not self._keys:
+                self._fill()
+            return self._keys.popleft()
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+guid_block = GuidBlock(settings.GUID_BLOCK_SIZE)
+
+
 class GuidStoredObject(StoredObject):
     """Subclass of `StoredObject` that provisions a `Guid` for each new instance
     on save. When saving a `GuidStoredObject` for the first time, creates a new
@@ -32,39 +92,60 @@ class GuidStoredObject(StoredObject):
 
     def _ensure_guid(self):
         """Create GUID record if current record doesn't already have one, then
-        point GUID to self.
+        point GUID to self. The instance remembers that its GUID exists, so
+        later saves skip the lookup.
         """
+        if self._primary_key and self._primary_key == getattr(self, '_guid_key', None):
+            return
+
         # Create GUID with specified ID if provided
         if self._primary_key:
 
-            # Done if GUID already exists
-            guid = Guid.load(self._primary_key)
-            if guid is not None:
-                return
+            # Create GUID unless it already exists
+            if Guid.load(self._primary_key) is None:
+                guid = Guid(
+                    _id=self._primary_key,
+                    referent=self,
+                )
+                guid.save()
 
-            # Create GUID
-            guid = Guid(
-                _id=self._primary_key,
-                referent=self,
-            )
-            guid.save()
-
-        # Else create GUID optimistically
+        # Else create GUID from the preallocated block
         else:
+            self._primary_key = self._create_guid()
+
+        self._guid_key = self._primary_key
 
-            # Create GUID
-            guid = Guid()
-            guid.save()
-            guid.referent = (guid._primary_key, self._name)
-            guid.save()
+    def _create_guid(self):
+        """Insert a GUID pointing to this record with a single write.
 
-            # Set primary key to GUID key
-            self._primary_key = guid._primary_key
+        :return: Key of the new GUID
+        """
+        while True:
+            key = guid_block.pop()
+            guid = Guid(_id=key, referent=(key, self._name))
+            try:
+                guid.save()
+            except KeyExistsException:
+                # Taken by another process since the block was filled
+                continue
+            return key
+
+    def _invalidate_guid_cache(self):
+        """Drop the cached resolution of this record's GUID if the record has
+        been deleted or its URL has changed.
+        """
+        cached = guid_cache.get(self._primary_key, record=False)
+        if cached is None:
+            return
+        if getattr(self, 'is_deleted', False) or cached != (self._name, self.deep_url):
+            guid_cache.delete(self._primary_key)
 
     def save(self, *args, **kwargs):
         """Ensure GUID on save."""
         self._ensure_guid()
-        return super(GuidStoredObject, self).save(*args, **kwargs)
+        ret = super(GuidStoredObject, self).save(*args, **kwargs)
+        self._invalidate_guid_cache()
+        return ret
 
     def __str__(self):
         return str(self._id)
@@ -57,3 +57,43 @@ def unique_on(*groups):
         ])
         return cls
     return wrapper
+
+
+def bulk_insert(objects):
+    """Insert new records of one schema with a single MongoDB insert, applying
+    the field and record validation that `save` would, and mark the inserted
+    records as saved. Records that would violate a unique index are skipped;
+    the remaining records are still inserted. Records must not have
+    back-referenced fields, since back-references are not updated.
+
+    :param list objects: Unsaved `StoredObject` instances of one schema
+    :return: Set of primary keys of the inserted records
+    """
+    if not objects:
+        return set()
+    schema = type(objects[0])
+    docs = []
+    for obj in objects:
+        for name, field in obj._fields.items():
+            if hasattr(field, 'on_before_save'):
+                field.on_before_save(obj)
+            field.do_validate(getattr(obj, name), obj)
+        obj.validate_record()
+        docs.append(obj.to_storage())
+    collection = schema._storage[0].store
+    keys = [obj._primary_key for obj in objects]
+    try:
+        collection.insert(docs, continue_on_error=True)
+    except pymongo.errors.DuplicateKeyError:
+        inserted = set(
+            doc['_id']
+            for doc in collection.find({'_id': {'$in': keys}}, {'_id': True})
+        )
+    else:
+        inserted = set(keys)
+    for obj, doc in zip(objects, docs):
+        if obj._primary_key in inserted:
+            obj._stored_key = obj._primary_key
+            obj._is_loaded = True
+            schema._set_cache(obj._primary_key, obj, doc)
+    return inserted
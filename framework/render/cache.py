@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""Content-addressed cache for rendered MFR output. Entries are keyed by the
+hash of the source file, its extension and the renderer version, so identical
+files (e.g. in forks and registrations) are only rendered once. The extension is
+part of the key because MFR picks a renderer by extension: the same bytes saved
+as `.txt` and `.py` render differently. The cache is bounded by a byte budget;
+least recently used entries are evicted first.
+"""
+
+import os
+import cgi
+import codecs
+import errno
+import hashlib
+import logging
+import tempfile
+import threading
+
+import mfr
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Stand-ins for the guid-specific download URL embedded by some renderers
+# (e.g. images and PDFs), raw and HTML-escaped; substituted back when an entry
+# is read
+SOURCE_URL_PLACEHOLDER = u'__osf_mfr_source_url__'
+ESCAPED_SOURCE_URL_PLACEHOLDER = u'__osf_mfr_escaped_source_url__'
+
+HASH_CHUNK_SIZE = 64 * 1024  # 64kb
+
+
+def hash_file(path, algorithm='sha256'):
+    """Compute a content hash of a file on disk.
+
+    :param str path: Path to file
+    :return: Hash prefixed with algorithm name, e.g. `sha256:abc...`
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return u'{0}:{1}'.format(algorithm, digest.hexdigest())
+
+
+def file_extension(path):
+    """Extension used to key rendered output, e.g. `.py`."""
+    return os.path.splitext(path)[1].lower()
+
+
+def _source_url_replacements(source_url):
+    return [
+        (cgi.escape(source_url, quote=True), ESCAPED_SOURCE_URL_PLACEHOLDER),
+        (source_url, SOURCE_URL_PLACEHOLDER),
+    ]
+
+
+def strip_source_url(rendered, source_url):
+    """Replace a guid-specific source URL with placeholders so that rendered
+    output can be shared between files with the same content.
+    """
+    for value, placeholder in _source_url_replacements(source_url):
+        rendered = rendered.replace(value, placeholder)
+    return rendered
+
+
+def restore_source_url(rendered, source_url):
+    for value, placeholder in _source_url_replacements(source_url):
+        rendered = rendered.replace(placeholder, value)
+    return rendered
+
+
+def restore_source_url_chunks(chunks, source_url):
+    """Streaming version of `restore_source_url`. Holds back enough trailing
+    characters of each chunk that placeholders split across chunks are
+    still replaced.
+
+    :param chunks: Iterable of unicode chunks
+    """
+    overlap = max(len(SOURCE_URL_PLACEHOLDER), len(ESCAPED_SOURCE_URL_PLACEHOLDER)) - 1
+    pending = u''
+    for chunk in chunks:
+        pending = restore_source_url(pending + chunk, source_url)
+        if len(pending) > overlap:
+            yield pending[:-overlap]
+            pending = pending[-overlap:]
+    if pending:
+        yield restore_source_url(pending, source_url)
+
+
+def read_chunks(fp, chunk_size=settings.MFR_STREAM_CHUNK_SIZE):
+    return iter(lambda: fp.read(chunk_size), fp.read(0))
+
+
+def atomic_write(path, content):
+    """Write unicode content to a temporary file in the destination directory,
+    then rename it into place so readers never see a partial file.
+
+    :param content: Unicode string or iterable of unicode chunks
+    """
+    if isinstance(content, basestring):
+        content = [content]
+    dirname = os.path.dirname(path)
+    try:
+        os.makedirs(dirname)
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            raise
+    fd, temp_path = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+    try:
+        with codecs.getwriter('utf-8')(os.fdopen(fd, 'wb')) as fp:
+            for chunk in content:
+                fp.write(chunk)
+        os.rename(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class RenderCache(object):
+    """On-disk, content-addressed LRU cache of rendered HTML.
+
+    :param str root: Cache directory
+    :param int max_bytes: Byte budget; `evict` removes least recently used
+        entries until the cache fits. Published bytes are tallied so that
+        callers only need to evict once the budget is exceeded
+    :param str renderer_version: Version of the renderer; part of every key
+        so that upgrading MFR invalidates stale output
+    """
+
+    def __init__(self, root, max_bytes, renderer_version):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.renderer_version = renderer_version
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Approximate size of the cache in bytes; `None` until first scanned
+        self._size = None
+
+    def key(self, content_hash, extension):
+        return hashlib.sha256(
+            u'{0}:{1}:{2}'.format(self.renderer_version, extension, content_hash).encode('utf-8')
+        ).hexdigest()
+
+    def path_for(self, content_hash, extension):
+        key = self.key(content_hash, extension)
+        return os.path.join(self.root, key[:2], key + '.html')
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_path(self, content_hash, extension):
+        """Return the path of a cached entry, or `None` on a miss. Hits are
+        marked as recently used by updating the entry's mtime.
+        """
+        if not content_hash:
+            return None
+        path = self.path_for(content_hash, extension)
+        try:
+            os.utime(path, None)
+        except OSError:
+            self._record(False)
+            return None
+        self._record(True)
+        return path
+
+    def read(self, content_hash, extension, source_url):
+        """Read cached output for the given content, or `None` on a miss.
+
+        :param str content_hash: Hash of the source file
+        :param str extension: Extension of the source file, see `file_extension`
+        :param str source_url: Download URL of the file being viewed
+        """
+        path = self.get_path(content_hash, extension)
+        if path is None:
+            return None
+        try:
+            with codecs.open(path, 'r', 'utf-8') as fp:
+                return restore_source_url(fp.read(), source_url)
+        except IOError:
+            # Evicted between lookup and read
+            return None
+
+    def copy_to(self, content_hash, extension, source_url, dest_path):
+        """Stream cached output for the given content to `dest_path` without
+        loading it into memory.
+
+        :return: `True` on a hit, else `False`
+        """
+        path = self.get_path(content_hash, extension)
+        if path is None:
+            return False
+        try:
+            with codecs.open(path, 'r', 'utf-8') as fp:
+                atomic_write(
+                    dest_path,
+                    restore_source_url_chunks(read_chunks(fp), source_url),
+                )
+        except IOError:
+            return False
+        return True
+
+    def publish(self, content_hash, extension, rendered, source_url):
+        """Atomically add rendered output to the cache."""
+        path = self.path_for(content_hash, extension)
+        atomic_write(path, strip_source_url(rendered, source_url))
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+        return path
+
+    def should_evict(self):
+        """Whether the tallied size of the cache exceeds its budget. The cache
+        directory is only walked on the first call and after the budget has
+        been exceeded, when the tally is discarded so that it is recounted
+        once eviction has run (possibly in another process).
+        """
+        with self._lock:
+            size = self._size
+        if size is None:
+            size = sum(entry_size for _, entry_size, _ in self.entries())
+        over = size > self.max_bytes
+        with self._lock:
+            self._size = None if over else size
+        return over
+
+    def entries(self):
+        """Yield (mtime, size, path) for each published entry."""
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith('.html'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its budget.
+
+        :return: Number of bytes removed
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total - removed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed += size
+        with self._lock:
+            self._size = total - removed
+        if removed:
+            logger.info('Evicted {0} bytes from render cache'.format(removed))
+        return removed
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+        }
+
+
+render_cache = RenderCache(
+    root=settings.MFR_RENDER_CACHE_PATH,
+    max_bytes=settings.MFR_RENDER_CACHE_MAX_BYTES,
+    renderer_version=getattr(mfr, '__version__', 'unknown'),
+)
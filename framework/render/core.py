@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
 import os
-import time
+import urllib
 
 import mfr
 from mfr.ext import ALL_HANDLERS
 
 import requests
+from flask import Response
 
 from framework.render.exceptions import error_message_or_exception
 
@@ -29,30 +30,26 @@ def init_mfr(app):
     mfr.collect_static(dest=mfr.config['ASSETS_FOLDER'])
 
 
-def render_is_done_or_happening(cache_path, temp_path):
-    # if the cached file exists do nothing
-    if os.path.isfile(cache_path):
-        return True
-
-    if os.path.isfile(temp_path):
-        if time.time() - os.path.getmtime(temp_path) > settings.MFR_TIMEOUT:
-            # If the temp path has not been modified since the timeout
-            # seconds assume the task failed, remove the file and
-            # start over
-            os.remove(temp_path)
-            return False
-        # Otherwise the task is happening somewhere else
-        return True
-
-    # If none of the above go ahead and start
-    return False
+def get_chunk_size(response):
+    """Choose a download chunk size from the response's Content-Length: large
+    files use larger chunks to cut per-chunk overhead, bounded so that memory
+    use per download stays small.
+    """
+    try:
+        length = int(response.headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        return settings.MFR_MIN_CHUNK_SIZE
+    return max(
+        settings.MFR_MIN_CHUNK_SIZE,
+        min(settings.MFR_MAX_CHUNK_SIZE, length // 16),
+    )
 
 
 def save_to_file_or_error(download_url, dest_path):
     with open(dest_path, 'wb') as temp_file:
         response = requests.get(download_url, stream=True)
         if response.ok:
-            for block in response.iter_content(1024):  # 1kb
+            for block in response.iter_content(get_chunk_size(response)):
                 temp_file.write(block)
             return response
         temp_file.write(
@@ -62,3 +59,29 @@ def save_to_file_or_error(download_url, dest_path):
                 download_url=download_url,
             )
         )
+
+
+def stream_file(path, chunk_size=None):
+    chunk_size = chunk_size or settings.MFR_STREAM_CHUNK_SIZE
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b''):
+            yield chunk
+
+
+def send_rendered_file(path):
+    """Build a response for cached render output without reading it into
+    memory. Behind a proxy configured for `MFR_SENDFILE_HEADER`, the proxy
+    serves the file; otherwise it is streamed in chunks.
+
+    :param str path: Path to rendered HTML under `MFR_CACHE_PATH`
+    """
+    headers = {'Content-Type': 'text/html; charset=utf-8'}
+    if settings.MFR_SENDFILE_HEADER == 'X-Accel-Redirect':
+        relative = os.path.relpath(path, settings.MFR_CACHE_PATH)
+        headers['X-Accel-Redirect'] = settings.MFR_ACCEL_REDIRECT_PREFIX + urllib.quote(relative)
+        return Response('', headers=headers)
+    if settings.MFR_SENDFILE_HEADER == 'X-Sendfile':
+        headers['X-Sendfile'] = path
+        return Response('', headers=headers)
+    headers['Content-Length'] = str(os.path.getsize(path))
+    return Response(stream_file(path), headers=headers, direct_passthrough=True)
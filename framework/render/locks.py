@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Lease locks ensuring that only one worker renders a given file version at a
+time. A lease expires after a timeout so that a crashed worker cannot block
+rendering forever. Viewers do not wait on a lease; the client polls until the
+rendered file exists.
+"""
+
+import time
+import uuid
+import datetime
+import threading
+
+from pymongo.errors import DuplicateKeyError
+
+from website import settings
+
+
+class LocalLeaseLock(object):
+    """In-process stand-in for `MongoLeaseLock`, for development and tests."""
+
+    def __init__(self):
+        self._leases = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, timeout):
+        """Acquire a lease on `key`.
+
+        :param str key: Lock key, e.g. the render cache path
+        :param int timeout: Seconds after which the lease expires
+        :return: Owner token, or `None` if another owner holds the lease
+        """
+        with self._lock:
+            if self.is_held(key):
+                return None
+            token = uuid.uuid4().hex
+            self._leases[key] = (token, time.time() + timeout)
+            return token
+
+    def release(self, key, token):
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease and lease[0] == token:
+                del self._leases[key]
+
+    def is_held(self, key):
+        lease = self._leases.get(key)
+        return lease is not None and lease[1] > time.time()
+
+
+class MongoLeaseLock(object):
+    """Lease lock shared by all web and Celery workers. Leases are documents
+    in `collection_name`.
+
+    :param db: MongoDB database or proxy
+    """
+
+    def __init__(self, db, collection_name='renderlocks'):
+        self.db = db
+        self.collection_name = collection_name
+
+    @property
+    def collection(self):
+        return self.db[self.collection_name]
+
+    def acquire(self, key, timeout):
+        now = datetime.datetime.utcnow()
+        token = uuid.uuid4().hex
+        lease = {
+            'owner': token,
+            'expires': now + datetime.timedelta(seconds=timeout),
+        }
+        try:
+            self.collection.insert(dict(lease, _id=key))
+            return token
+        except DuplicateKeyError:
+            pass
+        # Take over an expired lease
+        stolen = self.collection.find_and_modify(
+            {'_id': key, 'expires': {'$lt': now}},
+            {'$set': lease},
+        )
+        return token if stolen else None
+
+    def release(self, key, token):
+        self.collection.remove({'_id': key, 'owner': token})
+
+    def is_held(self, key):
+        return self.collection.find_one({
+            '_id': key,
+            'expires': {'$gte': datetime.datetime.utcnow()},
+        }) is not None
+
+
+def get_render_lock():
+    if settings.MFR_RENDER_LOCK_BACKEND == 'mongo':
+        from framework.mongo import database
+        return MongoLeaseLock(database)
+    return LocalLeaseLock()
+
+
+render_lock = get_render_lock()
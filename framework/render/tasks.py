@@ -15,8 +15,9 @@ from website.language import ERROR_PREFIX
 
 from framework.tasks import app
 from framework.render import exceptions
+from framework.render.cache import atomic_write, file_extension, hash_file, render_cache
 from framework.render.core import save_to_file_or_error
-from framework.render.core import render_is_done_or_happening
+from framework.render.locks import render_lock
 
 
 logger = logging.getLogger(__name__)
@@ -46,18 +47,32 @@ def render_mfr_error(err):
         """.format(**locals())
 
 
-# TODO only allow one task at a time
 @app.task(ignore_result=True, timeout=settings.MFR_TIMEOUT)
-def _build_rendered_html(download_url, cache_path, temp_path, public_download_url):
+def _build_rendered_html(download_url, cache_path, temp_path, public_download_url, content_hash=None):
     """
     :param str download_url: The url to download the file to be rendered
     :param str cache_path: Location to cache the rendered file
     :param str temp_path: Where the downloaded file will be cached
+    :param str content_hash: Hash of the file contents, if known; otherwise
+        computed from the downloaded file
     """
 
-    if render_is_done_or_happening(cache_path, temp_path):
+    if os.path.isfile(cache_path):
         return
 
+    # Only one worker renders a given file version; others return immediately
+    # and viewers keep polling until the cached file appears
+    token = render_lock.acquire(cache_path, settings.MFR_RENDER_LEASE_TIMEOUT)
+    if token is None:
+        return
+
+    try:
+        _render_to_cache(download_url, cache_path, temp_path, public_download_url, content_hash)
+    finally:
+        render_lock.release(cache_path, token)
+
+
+def _render_to_cache(download_url, cache_path, temp_path, public_download_url, content_hash):
     # Ensure our paths exists
     # Note: Ensures that cache directories have the same owner
     # as the files inside them
@@ -65,12 +80,17 @@ def _build_rendered_html(download_url, cache_path, temp_path, public_download_ur
     ensure_path(os.path.split(cache_path)[0])
 
     rendered = None
+    extension = file_extension(temp_path)
     try:
         save_to_file_or_error(download_url, temp_path)
     except exceptions.RenderNotPossibleException as e:
         # Write out unavoidable errors
         rendered = e.renderable_error
     else:
+        content_hash = content_hash or hash_file(temp_path)
+        rendered = render_cache.read(content_hash, extension, public_download_url)
+
+    if rendered is None:
         encoding = None
         # Workaround for https://github.com/CenterForOpenScience/osf.io/issues/2389
         # Open text files as utf-8
@@ -81,20 +101,29 @@ def _build_rendered_html(download_url, cache_path, temp_path, public_download_ur
         with codecs.open(temp_path, encoding=encoding) as temp_file:
             try:
                 render_result = mfr.render(temp_file, src=public_download_url)
-                # Rendered result
-                rendered = _build_html(render_result)
             except MFRError as err:
-                # Rendered MFR error
+                # Rendered MFR error; kept out of the shared cache so that a
+                # transient failure is not served for every copy of the file
                 rendered = render_mfr_error(err)
+            else:
+                # Rendered result
+                rendered = _build_html(render_result)
+                render_cache.publish(content_hash, extension, rendered, public_download_url)
+                if render_cache.should_evict():
+                    evict_render_cache()
 
     # Cache rendered content
-    with codecs.open(cache_path, 'w', 'utf-8') as render_result_cache:
-        render_result_cache.write(rendered)
+    atomic_write(cache_path, rendered)
 
     # Cleanup when we're done
     os.remove(temp_path)
 
 
+@app.task(ignore_result=True)
+def _evict_render_cache():
+    render_cache.evict()
+
+
 @app.task(ignore_result=True, timeout=settings.MFR_TIMEOUT)
 def _old_build_rendered_html(file_path, cache_dir, cache_file_name, download_url):
     """
@@ -127,13 +156,38 @@ def _old_build_rendered_html(file_path, cache_dir, cache_file_name, download_url
     return True
 
 
+def get_render_queue(size):
+    """Route renders of small files to a separate queue so that they are not
+    starved by large renders. Files of unknown size are treated as large.
+
+    :param int size: Size of the source file in bytes, or `None`
+    """
+    if size is not None and size <= settings.MFR_SMALL_FILE_SIZE:
+        return settings.MFR_SMALL_RENDER_QUEUE
+    return settings.MFR_LARGE_RENDER_QUEUE
+
+
+def _enqueue_rendered_html(download_url, cache_path, temp_path, public_download_url, content_hash=None, size=None):
+    _build_rendered_html.apply_async(
+        args=(download_url, cache_path, temp_path, public_download_url),
+        kwargs={'content_hash': content_hash},
+        queue=get_render_queue(size),
+    )
+
+
+def _run_rendered_html(download_url, cache_path, temp_path, public_download_url, content_hash=None, size=None):
+    _build_rendered_html(download_url, cache_path, temp_path, public_download_url, content_hash=content_hash)
+
+
 if settings.USE_CELERY:
-    build_rendered_html = _build_rendered_html.delay
+    build_rendered_html = _enqueue_rendered_html
     old_build_rendered_html = _old_build_rendered_html.delay
+    evict_render_cache = _evict_render_cache.delay
 else:
     #Expose render function
-    build_rendered_html = _build_rendered_html
+    build_rendered_html = _run_rendered_html
     old_build_rendered_html = _old_build_rendered_html
+    evict_render_cache = _evict_render_cache
 
 
 def _build_css_asset(css_uri):
@@ -24,3 +24,12 @@ def attach_models(*args, **kwargs):
     """Attach models to database collections on worker initialization.
     """
     set_up_storage(models.MODELS, storage.MongoStorage)
+
+
+@signals.worker_process_shutdown.connect
+def flush_counters(*args, **kwargs):
+    """Write any page counters still buffered in this worker process so that
+    increments are not lost on shutdown.
+    """
+    from framework.analytics.buffer import counter_buffer, write_counters
+    counter_buffer.flush(writer=write_counters)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Set the root target and depth of existing comments, and rebuild the
+per-node, per-user comment counts used by the discussion sidebar.
+
+Dry run: python -m scripts.migrate_comment_threads dry
+Real: python -m scripts.migrate_comment_threads
+"""
+
+import sys
+import logging
+import collections
+
+from modularodm import Q
+
+from framework.mongo import database
+from website.app import init_app
+from website.models import Comment
+from scripts import utils as scripts_utils
+
+
+logger = logging.getLogger(__name__)
+
+
+def set_thread_position(comment):
+    """Set the root target and depth of `comment`, first setting those of the
+    comments it replies to.
+    """
+    if comment.root_target is not None:
+        return
+    target = comment.target
+    if isinstance(target, Comment):
+        set_thread_position(target)
+    comment.root_target, comment.depth = Comment.thread_position(target)
+    comment.save()
+
+
+def count_comments():
+    """Count non-deleted comments per node and user.
+
+    :return: Dict mapping node IDs to dicts mapping user IDs to counts
+    """
+    counts = collections.defaultdict(collections.Counter)
+    for comment in Comment.find(Q('is_deleted', 'ne', True)):
+        counts[comment.node._id][comment.user._id] += 1
+    return counts
+
+
+def main(dry_run=True):
+    missing = Comment.find(Q('root_target', 'eq', None))
+    logger.info('Setting thread position of {0} comments'.format(missing.count()))
+    if not dry_run:
+        for comment in missing:
+            set_thread_position(comment)
+
+    counts = count_comments()
+    logger.info('Rebuilding comment counts for {0} nodes'.format(len(counts)))
+    if not dry_run:
+        database['commentcounts'].remove()
+        for node_id, users in counts.iteritems():
+            database['commentcounts'].insert({'_id': node_id, 'users': dict(users)})
+
+
+if __name__ == '__main__':
+    dry_run = 'dry' in sys.argv
+    init_app(set_backends=True, routes=False, mfr=False)
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    main(dry_run=dry_run)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Populate the normalized email index used for case-insensitive email
+lookups.
+
+Dry run: python -m scripts.migrate_normalized_emails dry
+Real: python -m scripts.migrate_normalized_emails
+"""
+
+import sys
+import logging
+
+from website.app import init_app
+from website.models import User
+from framework.auth.utils import normalize_email
+from scripts import utils as scripts_utils
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_normalized_emails(record):
+    """Compute normalized emails from a raw user record; see
+    `User.get_normalized_emails`.
+    """
+    if record.get('merged_by') is not None:
+        return []
+    normalized = []
+    for email in record.get('emails') or []:
+        email = normalize_email(email)
+        if email and email not in normalized:
+            normalized.append(email)
+    return normalized
+
+
+def main(dry_run=True):
+    collection = User._storage[0].store
+    updated = 0
+    for record in collection.find({}, {'emails': True, 'merged_by': True, 'normalized_emails': True}):
+        normalized = get_normalized_emails(record)
+        if record.get('normalized_emails') == normalized:
+            continue
+        updated += 1
+        if not dry_run:
+            collection.update(
+                {'_id': record['_id']},
+                {'$set': {'normalized_emails': normalized}},
+            )
+    User._clear_caches()
+    logger.info('Updated normalized emails of {0} users'.format(updated))
+    return updated
+
+
+if __name__ == '__main__':
+    dry_run = 'dry' in sys.argv
+    init_app(set_backends=True, routes=False, mfr=False)
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    main(dry_run=dry_run)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compact wiki page histories. Moves the full text of every version from the
+legacy `content` field to `stored_content`, marks versions shared with forks
+and registrations, then stores older versions as deltas against the following
+version, keeping periodic keyframes and shared versions in full. Reports the
+storage saved.
+
+Dry run: python -m scripts.migrate_wiki_deltas
+Real: python -m scripts.migrate_wiki_deltas false
+"""
+
+import sys
+import logging
+
+from modularodm import Q
+
+from website import models, settings
+from website.app import init_app
+from website.addons.wiki.model import NodeWikiPage
+from scripts import utils as scripts_utils
+
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def migrate_content_field():
+    """Rename the legacy `content` field to `stored_content`.
+
+    :return: Number of records renamed
+    """
+    collection = NodeWikiPage._storage[0].store
+    result = collection.update(
+        {'content': {'$exists': True}, 'stored_content': {'$exists': False}},
+        {'$rename': {'content': 'stored_content'}},
+        multi=True,
+    )
+    # Records re-saved since the field was added hold both copies
+    collection.update(
+        {'content': {'$exists': True}},
+        {'$unset': {'content': ''}},
+        multi=True,
+    )
+    NodeWikiPage._clear_caches()
+    return result['n']
+
+
+def find_shared_pages(save=True):
+    """Find versions listed by a node other than the one that created them,
+    i.e. versions shared with forks and registrations, and mark them as
+    shared.
+
+    :return: Set of shared version ids
+    """
+    collection = NodeWikiPage._storage[0].store
+    shared = set()
+    for node in models.Node.find(Q('wiki_pages_versions', 'ne', {})):
+        page_ids = [
+            page_id
+            for versions in node.wiki_pages_versions.values()
+            for page_id in versions
+        ]
+        records = collection.find(
+            {'_id': {'$in': page_ids}, 'node': {'$ne': node._id}},
+            {'_id': True},
+        )
+        shared.update(record['_id'] for record in records)
+    if save and shared:
+        collection.update(
+            {'_id': {'$in': list(shared)}},
+            {'$set': {'is_shared': True}},
+            multi=True,
+        )
+        NodeWikiPage._clear_caches()
+    return shared
+
+
+def compress_history(page_ids, save=True, seen=None, shared=None):
+    """Compress each version of a page against the version that follows it.
+    Versions shared with forks and registrations are kept in full.
+
+    :param list page_ids: Ids of all versions of a page, oldest first
+    :param set seen: Ids of versions already processed; versions are shared
+        with forks and registrations
+    :param set shared: Ids of shared versions not yet marked, e.g. in a dry run
+    :return: Tuple of (versions compressed, bytes before, bytes saved)
+    """
+    seen = seen if seen is not None else set()
+    shared = shared or set()
+    pages = [NodeWikiPage.load(page_id) for page_id in page_ids]
+    pages = [page for page in pages if page is not None]
+    compressed, total, saved = 0, 0, 0
+    for page, base in zip(pages, pages[1:] + [None]):
+        if page._id in seen:
+            continue
+        seen.add(page._id)
+        total += len(page.content.encode('utf-8'))
+        if base is None or page._id in shared:
+            continue
+        page_saved = page.compress(base, save=save)
+        if page_saved:
+            compressed += 1
+            saved += page_saved
+    return compressed, total, saved
+
+
+def main(dry_run=True):
+    if not dry_run:
+        logger.info('Renamed content field on {0} wiki pages'.format(migrate_content_field()))
+    shared = find_shared_pages(save=not dry_run)
+    logger.info('{0} wiki versions are shared with forks or registrations'.format(len(shared)))
+    compressed, total, saved = 0, 0, 0
+    seen = set()
+    for node in models.Node.find(Q('wiki_pages_versions', 'ne', {})):
+        for page_ids in node.wiki_pages_versions.values():
+            page_compressed, page_total, page_saved = compress_history(
+                page_ids, save=not dry_run, seen=seen, shared=shared,
+            )
+            compressed += page_compressed
+            total += page_total
+            saved += page_saved
+    logger.info(
+        '{0} wiki versions compressed; {1} of {2} bytes saved ({3:.1f}%)'.format(
+            compressed, saved, total, 100.0 * saved / total if total else 0,
+        )
+    )
+    if dry_run:
+        logger.info('Dry run; no changes saved')
+    return compressed, total, saved
+
+
+if __name__ == '__main__':
+    dry_run = len(sys.argv) == 1 or sys.argv[1].lower() not in ['f', 'false']
+    settings.SEARCH_ENGINE = None
+    init_app(set_backends=True, routes=False, mfr=False)
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    main(dry_run=dry_run)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import *  # noqa
+from modularodm import Q
+
+from tests.base import OsfTestCase
+from tests.factories import CommentFactory, ProjectFactory, UserFactory
+
+from framework.mongo import database
+from website.models import Comment
+
+from scripts.migrate_comment_threads import main
+
+
+class TestMigrateCommentThreads(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateCommentThreads, self).setUp()
+        self.project = ProjectFactory()
+        self.user = UserFactory()
+        self.comment = CommentFactory(node=self.project)
+        self.reply = CommentFactory(node=self.project, target=self.comment, user=self.user)
+        self.nested = CommentFactory(node=self.project, target=self.reply, user=self.user)
+        # Simulate comments created before thread positions were stored
+        Comment._storage[0].store.update(
+            {},
+            {'$unset': {'root_target': '', 'depth': ''}},
+            multi=True,
+        )
+        database['commentcounts'].remove()
+        Comment._clear_caches()
+
+    def test_set_thread_position(self):
+        main(dry_run=False)
+        Comment._clear_caches()
+        comments = [Comment.load(comment._id) for comment in [self.comment, self.reply, self.nested]]
+        assert_equal([comment.root_target for comment in comments], [self.project._id] * 3)
+        assert_equal([comment.depth for comment in comments], [0, 1, 2])
+
+    def test_rebuild_counts(self):
+        main(dry_run=False)
+        assert_equal(
+            Comment.get_user_counts(self.project),
+            {self.project.creator._id: 1, self.user._id: 2},
+        )
+
+    def test_dry_run(self):
+        main(dry_run=True)
+        assert_is_none(database['commentcounts'].find_one({'_id': self.project._id}))
+        assert_equal(Comment.find(Q('root_target', 'eq', None)).count(), 3)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import UserFactory
+
+from website.models import User
+
+from scripts.migrate_normalized_emails import main
+
+
+class TestMigrateNormalizedEmails(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateNormalizedEmails, self).setUp()
+        self.user = UserFactory()
+        self.merged = UserFactory()
+        self.merged.merged_by = self.user
+        self.merged.save()
+        # Simulate users saved before the index was added
+        User._storage[0].store.update(
+            {'_id': self.user._id},
+            {'$set': {'emails': [' Fred@Example.com', 'fred@example.com']}},
+        )
+        User._storage[0].store.update(
+            {},
+            {'$unset': {'normalized_emails': ''}},
+            multi=True,
+        )
+        User._clear_caches()
+
+    def test_dry_run(self):
+        assert_equal(main(dry_run=True), 2)
+        assert_equal(User.find_by_email('fred@example.com'), [])
+
+    def test_migrate(self):
+        assert_equal(main(dry_run=False), 2)
+        user = User.load(self.user._id)
+        assert_equal(user.normalized_emails, ['fred@example.com'])
+        assert_equal(User.load(self.merged._id).normalized_emails, [])
+        assert_equal(User.find_by_email('FRED@example.com'), [user])
+        # Records are only updated once
+        assert_equal(main(dry_run=False), 0)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+
+from framework.auth.core import Auth
+
+from website.addons.wiki.model import NodeWikiPage
+
+from scripts.migrate_wiki_deltas import main, migrate_content_field
+
+
+class TestMigrateWikiDeltas(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateWikiDeltas, self).setUp()
+        self.project = ProjectFactory()
+        self.collection = NodeWikiPage._storage[0].store
+        lines = ['line {0}\n'.format(i) for i in range(50)]
+        self.contents = []
+        for i in range(3):
+            lines[i] = 'edit {0}\n'.format(i)
+            self.contents.append(''.join(lines))
+            self.project.update_node_wiki('home', self.contents[-1], Auth(self.project.creator))
+        self.page_ids = self.project.wiki_pages_versions['home']
+        # Simulate histories written before delta storage
+        self.collection.update(
+            {'_id': {'$in': self.page_ids}},
+            {'$unset': {'delta': ''}},
+            multi=True,
+        )
+        for page_id, content in zip(self.page_ids, self.contents):
+            self.collection.update(
+                {'_id': page_id},
+                {'$set': {'content': content}, '$unset': {'stored_content': ''}},
+            )
+        NodeWikiPage._clear_caches()
+
+    def test_migrate_content_field(self):
+        assert_equal(migrate_content_field(), 3)
+        for page_id, content in zip(self.page_ids, self.contents):
+            record = self.collection.find_one({'_id': page_id})
+            assert_not_in('content', record)
+            assert_equal(record['stored_content'], content)
+
+    def test_compress_histories(self):
+        compressed, total, saved = main(dry_run=False)
+        assert_equal(compressed, 2)
+        assert_true(0 < saved < total)
+        NodeWikiPage._clear_caches()
+        pages = [NodeWikiPage.load(page_id) for page_id in self.page_ids]
+        assert_equal([page.content for page in pages], self.contents)
+        assert_equal([bool(page.delta) for page in pages], [True, True, False])
+
+    def test_dry_run(self):
+        main(dry_run=True)
+        for page_id in self.page_ids:
+            record = self.collection.find_one({'_id': page_id})
+            assert_in('content', record)
+            assert_false(record.get('delta'))
+
+    def test_versions_shared_with_forks_kept_in_full(self):
+        fork = self.project.fork_node(Auth(self.project.creator))
+        # Simulate forks made before shared versions were marked
+        self.collection.update(
+            {'_id': {'$in': self.page_ids}},
+            {'$unset': {'is_shared': ''}},
+            multi=True,
+        )
+        NodeWikiPage._clear_caches()
+        compressed, _, _ = main(dry_run=False)
+        assert_equal(compressed, 0)
+        NodeWikiPage._clear_caches()
+        pages = [NodeWikiPage.load(page_id) for page_id in self.page_ids]
+        assert_true(all(page.is_shared for page in pages))
+        assert_false(any(page.delta for page in pages))
+        assert_equal(fork.get_wiki_page('home', 1).content, self.contents[0])
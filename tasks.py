@@ -273,9 +273,17 @@ def sharejs(host=None, port=None, db_host=None, db_port=None, db_name=None, cors
 
 
 @task(aliases=['celery'])
-def celery_worker(level="debug"):
-    """Run the Celery process."""
-    cmd = 'celery worker -A framework.tasks -l {0}'.format(level)
+def celery_worker(level="debug", queues=None):
+    """Run the Celery process. By default the worker consumes the default queue
+    and both render queues; pass e.g. ``--queues=render_small`` to run a worker
+    dedicated to small-file renders.
+    """
+    queues = queues or ','.join([
+        'celery',
+        settings.MFR_SMALL_RENDER_QUEUE,
+        settings.MFR_LARGE_RENDER_QUEUE,
+    ])
+    cmd = 'celery worker -A framework.tasks -l {0} -Q {1}'.format(level, queues)
     run(bin_prefix(cmd))
 
 
@@ -3,14 +3,18 @@
 Unit tests for analytics logic in framework/analytics/__init__.py
 """
 
+import time
 import unittest
 
+import mock
+
 from nose.tools import *  # flake8: noqa  (PEP8 asserts)
 from flask import Flask
 
 from datetime import datetime
 
 from framework import analytics, sessions
+from framework.analytics.buffer import CounterBuffer, write_counters
 from framework.sessions import session
 
 from tests.base import OsfTestCase
@@ -40,6 +44,65 @@ class TestAnalytics(OsfTestCase):
         assert_equal(user.get_activity_points(db=self.db), 1)
 
 
+class TestCounterBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.writes = []
+        self.buffer = CounterBuffer(max_keys=2, interval=3600, writer=self.writes.append)
+
+    def test_add_merges_increments_per_page(self):
+        self.buffer.add('node:abc', {'total': 1, 'unique': 1})
+        self.buffer.add('node:abc', {'total': 1})
+        assert_equal(self.writes, [])
+        self.buffer.flush()
+        assert_equal(self.writes, [{'node:abc': {'total': 2, 'unique': 1}}])
+
+    def test_add_flushes_at_max_keys(self):
+        self.buffer.add('node:abc', {'total': 1})
+        self.buffer.add('node:def', {'total': 1})
+        assert_equal(len(self.writes), 1)
+        assert_equal(len(self.buffer), 0)
+
+    def test_add_flushes_after_interval(self):
+        buffer = CounterBuffer(max_keys=100, interval=0, writer=self.writes.append)
+        buffer.add('node:abc', {'total': 1})
+        assert_equal(self.writes, [{'node:abc': {'total': 1}}])
+
+    def test_stats_report_writes_saved(self):
+        for _ in range(5):
+            self.buffer.add('node:abc', {'total': 1})
+        self.buffer.flush()
+        stats = self.buffer.stats()
+        assert_equal(stats['received'], 5)
+        assert_equal(stats['written'], 1)
+        assert_equal(stats['writes_saved'], 4)
+
+    def test_failed_flush_keeps_increments(self):
+        def fail(pending):
+            raise ValueError
+        self.buffer.add('node:abc', {'total': 1})
+        with assert_raises(ValueError):
+            self.buffer.flush(writer=fail)
+        self.buffer.flush()
+        assert_equal(self.writes, [{'node:abc': {'total': 1}}])
+
+    def test_failed_write_keeps_unwritten_keys(self):
+        collection = mock.Mock()
+        collection.update.side_effect = [None, ValueError]
+        pending = {'node:abc': {'total': 1}, 'node:def': {'total': 1}}
+        with assert_raises(ValueError):
+            write_counters(pending, db={'pagecounters': collection})
+        assert_equal(len(pending), 1)
+        written = collection.update.call_args_list[0][0][0]['_id']
+        assert_not_in(written, pending)
+
+    def test_periodic_flush(self):
+        buffer = CounterBuffer(max_keys=100, interval=0.05, writer=self.writes.append, periodic=True)
+        buffer.add('node:abc', {'total': 1})
+        time.sleep(0.3)
+        assert_equal(self.writes, [{'node:abc': {'total': 1}}])
+
+
 class UpdateCountersTestCase(OsfTestCase):
 
     def setUp(self):
@@ -116,6 +179,23 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters(page, db=self.db)
         assert_equal(count, (3, 5))
 
+    def test_get_basic_counters_many(self):
+        page = 'node:' + str(self.node._id)
+        missing = 'node:missing'
+
+        collection = self.db['pagecounters']
+        collection.update({'_id': page}, {'$inc': {'total': 5, 'unique': 3}}, True, False)
+        counts = analytics.get_basic_counters_many([page, missing], db=self.db)
+        assert_equal(counts, {page: (3, 5), missing: (None, None)})
+
+    def test_get_basic_counters_many_cleans_pages(self):
+        page = 'download:{0}:file.txt'.format(self.node._id)
+
+        collection = self.db['pagecounters']
+        collection.update({'_id': analytics.clean_page(page)}, {'$inc': {'total': 2, 'unique': 1}}, True, False)
+        counts = analytics.get_basic_counters_many([page], db=self.db)
+        assert_equal(counts[page], (1, 2))
+
     @unittest.skip('Reverted the fix for #2281. Unskip this once we use GUIDs for keys in the download counts collection')
     def test_update_counters_different_files(self):
         # Regression test for https://github.com/CenterForOpenScience/osf.io/issues/2281
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for in-process caches in framework/cache.py
+"""
+
+import mock
+import unittest
+
+from nose.tools import *  # flake8: noqa  (PEP8 asserts)
+
+from framework.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(max_size=2, ttl=60)
+
+    def test_get_missing(self):
+        assert_is(self.cache.get('missing'), None)
+        assert_equal(self.cache.get('missing', 'default'), 'default')
+
+    def test_set_and_get(self):
+        self.cache.set('key', 'value')
+        assert_equal(self.cache.get('key'), 'value')
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        assert_equal(self.cache.get('a'), 1)
+        assert_is(self.cache.get('b'), None)
+        assert_equal(self.cache.get('c'), 3)
+
+    @mock.patch('framework.cache.time.time')
+    def test_entries_expire(self, mock_time):
+        mock_time.return_value = 100
+        self.cache.set('key', 'value')
+        mock_time.return_value = 161
+        assert_is(self.cache.get('key'), None)
+
+    @mock.patch('framework.cache.time.time')
+    def test_zero_ttl_never_expires(self, mock_time):
+        mock_time.return_value = 100
+        self.cache.set('key', 'value', ttl=0)
+        mock_time.return_value = 10 ** 9
+        assert_equal(self.cache.get('key'), 'value')
+
+    def test_delete_matching(self):
+        self.cache.set(('node', 'a'), 1)
+        self.cache.set(('other', 'b'), 2)
+        assert_equal(self.cache.delete_matching(lambda key: key[0] == 'node'), 1)
+        assert_is(self.cache.get(('node', 'a')), None)
+        assert_equal(self.cache.get(('other', 'b')), 2)
+
+    def test_stats(self):
+        self.cache.set('key', 'value')
+        self.cache.get('key')
+        self.cache.get('missing')
+        stats = self.cache.stats()
+        assert_equal(stats['hits'], 1)
+        assert_equal(stats['misses'], 1)
+        assert_equal(stats['hit_rate'], 0.5)
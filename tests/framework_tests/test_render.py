@@ -1,43 +1,18 @@
+import os
 import mock
-import time
+import shutil
+import tempfile
 import unittest
 from nose.tools import *  # noqa
 
 from framework.render import core
+from framework.render import cache
+from framework.render import locks
+from framework.render import tasks
+from website import settings
 from framework.render import exceptions
 
 
-class TestRenderIsHappening(unittest.TestCase):
-
-    @mock.patch('framework.render.core.os.path.isfile')
-    def test_cache_exists_is_true(self, mock_isfile):
-        mock_isfile.return_value = True
-        assert_true(core.render_is_done_or_happening('path', 'path'))
-
-    @mock.patch('framework.render.core.os.path.isfile')
-    def test_nothing_exists(self, mock_isfile):
-        mock_isfile.return_value = False
-        assert_false(core.render_is_done_or_happening('path', 'path'))
-
-    @mock.patch('framework.render.core.os.remove')
-    @mock.patch('framework.render.core.os.path.isfile')
-    @mock.patch('framework.render.core.os.path.getmtime')
-    def test_old_temp(self, mockmtime, mock_isfile, mock_remove):
-        mockmtime.return_value = 0
-        mock_isfile.side_effect = [False, True]
-
-        assert_false(core.render_is_done_or_happening('path', 'path'))
-
-    @mock.patch('framework.render.core.os.remove')
-    @mock.patch('framework.render.core.os.path.isfile')
-    @mock.patch('framework.render.core.os.path.getmtime')
-    def test_temp_newish(self, mockmtime, mock_isfile, mock_remove):
-        mockmtime.return_value = time.time()
-        mock_isfile.side_effect = [False, True]
-
-        assert_true(core.render_is_done_or_happening('path', 'path'))
-
-
 @mock.patch('__builtin__.open')
 @mock.patch('framework.render.core.requests.get')
 class TestSaveOrError(unittest.TestCase):
@@ -60,6 +35,15 @@ class TestSaveOrError(unittest.TestCase):
         assert_false(mock_eme.called)
         mock_request.assert_called_once_with('test', stream=True)
 
+    @mock.patch('framework.render.core.error_message_or_exception')
+    def test_good_response_uses_large_chunks(self, mock_eme, mock_request, mock_file):
+        response = mock.MagicMock(ok=True, headers={'Content-Length': str(100 * 1024 * 1024)})
+        mock_request.return_value = response
+
+        core.save_to_file_or_error('test', 'test')
+
+        response.iter_content.assert_called_once_with(settings.MFR_MAX_CHUNK_SIZE)
+
     def test_bad_response_raises(self, mock_request, mock_file):
         mock_request.return_value = mock.Mock(ok=False, status_code=418)
 
@@ -67,3 +51,124 @@ class TestSaveOrError(unittest.TestCase):
             core.save_to_file_or_error('test', 'test')
 
         mock_request.assert_called_once_with('test', stream=True)
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = cache.RenderCache(self.root, max_bytes=1024, renderer_version='1.0')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_miss(self):
+        assert_is(self.cache.read('sha256:abc', '.txt', 'http://osf.io/abcde/'), None)
+        assert_equal(self.cache.stats()['misses'], 1)
+
+    def test_publish_and_read(self):
+        self.cache.publish('sha256:abc', '.txt', u'<p>rendered</p>', 'http://osf.io/abcde/')
+        assert_equal(self.cache.read('sha256:abc', '.txt', 'http://osf.io/abcde/'), u'<p>rendered</p>')
+        assert_equal(self.cache.stats()['hits'], 1)
+
+    def test_source_url_substituted(self):
+        self.cache.publish('sha256:abc', '.txt', u'<img src="http://osf.io/abcde/?a=1&b=2">', 'http://osf.io/abcde/?a=1&b=2')
+        assert_equal(
+            self.cache.read('sha256:abc', '.txt', 'http://osf.io/fghij/?a=1&b=2'),
+            u'<img src="http://osf.io/fghij/?a=1&b=2">',
+        )
+
+    def test_key_includes_renderer_version(self):
+        other = cache.RenderCache(self.root, max_bytes=1024, renderer_version='2.0')
+        assert_not_equal(self.cache.path_for('sha256:abc', '.txt'), other.path_for('sha256:abc', '.txt'))
+
+    def test_key_includes_extension(self):
+        self.cache.publish('sha256:abc', '.txt', u'<pre>text</pre>', 'url')
+        assert_is(self.cache.read('sha256:abc', '.py', 'url'), None)
+        assert_not_equal(self.cache.path_for('sha256:abc', '.txt'), self.cache.path_for('sha256:abc', '.py'))
+
+    def test_publish_leaves_no_temp_files(self):
+        path = self.cache.publish('sha256:abc', '.txt', u'content', 'url')
+        assert_equal(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+
+    def test_evict_removes_least_recently_used(self):
+        old = self.cache.publish('sha256:old', '.txt', u'x' * 600, 'url')
+        os.utime(old, (0, 0))
+        new = self.cache.publish('sha256:new', '.txt', u'x' * 600, 'url')
+        self.cache.evict()
+        assert_false(os.path.exists(old))
+        assert_true(os.path.exists(new))
+
+    def test_should_evict_only_over_budget(self):
+        self.cache.publish('sha256:a', '.txt', u'x' * 600, 'url')
+        assert_false(self.cache.should_evict())
+        self.cache.publish('sha256:b', '.txt', u'x' * 600, 'url')
+        assert_true(self.cache.should_evict())
+        self.cache.evict()
+        assert_false(self.cache.should_evict())
+
+
+class TestLocalLeaseLock(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = locks.LocalLeaseLock()
+
+    def test_single_owner(self):
+        token = self.lock.acquire('path', 60)
+        assert_true(token)
+        assert_is(self.lock.acquire('path', 60), None)
+        assert_true(self.lock.is_held('path'))
+
+    def test_release_allows_acquire(self):
+        token = self.lock.acquire('path', 60)
+        self.lock.release('path', token)
+        assert_false(self.lock.is_held('path'))
+        assert_true(self.lock.acquire('path', 60))
+
+    def test_release_requires_owner(self):
+        self.lock.acquire('path', 60)
+        self.lock.release('path', 'not-the-owner')
+        assert_true(self.lock.is_held('path'))
+
+    def test_expired_lease_can_be_taken(self):
+        self.lock.acquire('path', -1)
+        assert_true(self.lock.acquire('path', 60))
+
+
+class TestRenderQueue(unittest.TestCase):
+
+    def test_small_file_queue(self):
+        assert_equal(tasks.get_render_queue(10), settings.MFR_SMALL_RENDER_QUEUE)
+
+    def test_large_file_queue(self):
+        assert_equal(
+            tasks.get_render_queue(settings.MFR_SMALL_FILE_SIZE + 1),
+            settings.MFR_LARGE_RENDER_QUEUE,
+        )
+
+    def test_unknown_size_queue(self):
+        assert_equal(tasks.get_render_queue(None), settings.MFR_LARGE_RENDER_QUEUE)
+
+
+class TestChunkSize(unittest.TestCase):
+
+    def test_unknown_length(self):
+        response = mock.Mock(headers={})
+        assert_equal(core.get_chunk_size(response), settings.MFR_MIN_CHUNK_SIZE)
+
+    def test_small_file(self):
+        response = mock.Mock(headers={'Content-Length': '100'})
+        assert_equal(core.get_chunk_size(response), settings.MFR_MIN_CHUNK_SIZE)
+
+    def test_large_file(self):
+        response = mock.Mock(headers={'Content-Length': str(10 ** 10)})
+        assert_equal(core.get_chunk_size(response), settings.MFR_MAX_CHUNK_SIZE)
+
+
+class TestRestoreSourceUrlChunks(unittest.TestCase):
+
+    def test_placeholder_split_across_chunks(self):
+        content = cache.strip_source_url(u'<img src="http://osf.io/a/">' * 3, 'http://osf.io/a/')
+        chunks = [content[idx:idx + 7] for idx in range(0, len(content), 7)]
+        restored = u''.join(cache.restore_source_url_chunks(chunks, 'http://osf.io/b/'))
+        assert_equal(restored, u'<img src="http://osf.io/b/">' * 3)
@@ -19,10 +19,13 @@ from framework.mongo import set_up_storage
 from website import settings
 from website.util import api_url_for, rubeus
 from website.addons.base import exceptions, GuidFile
+from website.addons.base import metadata_cache, invalidate_metadata_cache
+from website.addons.base import auth_cache
 from website.project import new_private_link
 from website.project.utils import serialize_node
 from website.addons.base import AddonConfig, AddonNodeSettingsBase, views
-from website.addons.osfstorage.model import OsfStorageFileRecord
+from website.addons.osfstorage.model import OsfStorageFileRecord, OsfStorageGuidFile
+from website.addons.dataverse.model import DataverseFile
 from website.addons.github.model import AddonGitHubOauthSettings
 from tests.base import OsfTestCase
 from tests.factories import AuthUserFactory, ProjectFactory
@@ -108,6 +111,11 @@ class TestAddonAuth(OsfTestCase):
         self.session.save()
         self.cookie = itsdangerous.Signer(settings.SECRET_KEY).sign(self.session._id)
         self.configure_addon()
+        auth_cache.clear()
+
+    def tearDown(self):
+        super(TestAddonAuth, self).tearDown()
+        auth_cache.clear()
 
     def configure_addon(self):
         self.user.add_addon('github')
@@ -167,6 +175,41 @@ class TestAddonAuth(OsfTestCase):
         res = test_app.get(url, expect_errors=True)
         assert_equal(res.status_code, 403)
 
+    def test_auth_cached(self):
+        url = self.build_url()
+        expected = self.test_app.get(url).json
+        with mock.patch('website.addons.base.views.Node.load') as mock_load:
+            res = self.test_app.get(url)
+        assert_false(mock_load.called)
+        assert_equal(res.json, expected)
+
+    def test_auth_cache_per_permission(self):
+        self.test_app.get(self.build_url())
+        with mock.patch('website.addons.base.views.Node.load') as mock_load:
+            mock_load.return_value = self.node
+            self.test_app.get(self.build_url(action='upload'))
+        assert_true(mock_load.called)
+
+    def test_auth_cache_invalidated_on_remove_contributor(self):
+        contrib = AuthUserFactory()
+        self.node.add_contributor(contrib, auth=self.auth_obj, save=True)
+        session = Session(data={'auth_user_id': contrib._id})
+        session.save()
+        cookie = itsdangerous.Signer(settings.SECRET_KEY).sign(session._id)
+        url = self.build_url(cookie=cookie)
+        self.test_app.get(url)
+        self.node.remove_contributor(contrib, auth=self.auth_obj)
+        res = self.test_app.get(url, expect_errors=True)
+        assert_equal(res.status_code, 403)
+
+    def test_auth_cache_invalidated_on_addon_change(self):
+        url = self.build_url()
+        self.test_app.get(url)
+        self.node_addon.repo = 'youre-my-worst-friend'
+        self.node_addon.save()
+        res = self.test_app.get(url)
+        assert_equal(res.json['settings'], self.node_addon.serialize_waterbutler_settings())
+
 
 class TestAddonLogs(OsfTestCase):
 
@@ -226,6 +269,41 @@ class TestAddonLogs(OsfTestCase):
         self.node.reload()
         assert_equal(len(self.node.logs), nlogs + 1)
 
+    def test_add_logs_merged(self):
+        url = self.node.api_url_for('create_waterbutler_log')
+        nlogs = len(self.node.logs)
+        for path in ['pizza', 'pasta', 'salad']:
+            payload = self.build_payload(metadata={'path': path})
+            self.test_app.put_json(url, payload, headers={'Content-Type': 'application/json'})
+        self.node.reload()
+        assert_equal(len(self.node.logs), nlogs + 1)
+        log = self.node.logs[-1]
+        assert_equal(log.params['path'], 'pizza')
+        assert_equal(
+            [each['path'] for each in log.params['files']],
+            ['pasta', 'salad'],
+        )
+        assert_not_in('node', log.params['files'][0])
+
+    def test_add_logs_not_merged_across_actions(self):
+        url = self.node.api_url_for('create_waterbutler_log')
+        nlogs = len(self.node.logs)
+        for action in ['create', 'delete']:
+            payload = self.build_payload(metadata={'path': 'pizza'}, action=action)
+            self.test_app.put_json(url, payload, headers={'Content-Type': 'application/json'})
+        self.node.reload()
+        assert_equal(len(self.node.logs), nlogs + 2)
+
+    @mock.patch('website.project.model.settings.FILE_LOG_COALESCE_WINDOW', -1)
+    def test_add_logs_not_merged_after_window(self):
+        url = self.node.api_url_for('create_waterbutler_log')
+        nlogs = len(self.node.logs)
+        for path in ['pizza', 'pasta']:
+            payload = self.build_payload(metadata={'path': path})
+            self.test_app.put_json(url, payload, headers={'Content-Type': 'application/json'})
+        self.node.reload()
+        assert_equal(len(self.node.logs), nlogs + 2)
+
     def test_add_log_missing_args(self):
         path = 'pizza'
         url = self.node.api_url_for('create_waterbutler_log')
@@ -342,25 +420,29 @@ class TestAddonFileViewHelpers(OsfFileTestCase):
             file_guid.mfr_download_url,
             file_guid.mfr_cache_path,
             file_guid.mfr_temp_path,
-            file_guid.public_download_url
+            file_guid.public_download_url,
+            content_hash=None,
+            size=None,
         )
 
     # TODO: Use DummyGuidFile for the below tests instead of Mock
-    @mock.patch('website.addons.base.views.codecs.open')
+    @mock.patch('website.addons.base.views.os.path.isfile')
     @mock.patch('website.addons.base.views.build_rendered_html')
-    def test_get_or_start_respects_start_render(self, mock_render, mock_open):
+    def test_get_or_start_respects_start_render(self, mock_render, mock_isfile):
         file_guid = mock.Mock()
-        mock_open.side_effect = IOError
+        mock_isfile.return_value = False
 
         views.get_or_start_render(file_guid, start_render=False)
 
         assert_false(mock_render.called)
 
+    @mock.patch('website.addons.base.views.os.path.isfile')
     @mock.patch('website.addons.base.views.codecs.open')
     @mock.patch('website.addons.base.views.build_rendered_html')
-    def test_get_or_start_returns_found(self, mock_render, mock_open):
+    def test_get_or_start_returns_found(self, mock_render, mock_open, mock_isfile):
         file_guid = mock.Mock()
         mock_file = mock.Mock()
+        mock_isfile.return_value = True
 
         mock_file.read.return_value = 'Look at me, I\'m mr meseeks'
         mock_open.return_value = mock_file
@@ -372,6 +454,17 @@ class TestAddonFileViewHelpers(OsfFileTestCase):
 
         assert_false(mock_render.called)
 
+    @mock.patch('website.addons.base.views.os.path.getsize')
+    @mock.patch('website.addons.base.views.os.path.isfile')
+    @mock.patch('website.addons.base.views.codecs.open')
+    def test_get_or_start_skips_large_output(self, mock_open, mock_isfile, mock_getsize):
+        file_guid = mock.Mock()
+        mock_isfile.return_value = True
+        mock_getsize.return_value = 2048
+
+        assert_is(views.get_or_start_render(file_guid, max_size=1024), None)
+        assert_false(mock_open.called)
+
     def test_get_or_start_returns_error(self):
         class MyException(exceptions.AddonEnrichmentError):
 
@@ -408,6 +501,65 @@ class TestAddonFileViewHelpers(OsfFileTestCase):
         assert_equals(getattr(guid, 'name', 'foo'), 'test')
 
 
+@mock.patch('website.util.transport.requests.Session.get')
+@mock.patch.object(DummyGuidFile, 'metadata_url', new_callable=mock.PropertyMock)
+class TestGuidFileMetadataCache(OsfFileTestCase):
+
+    def setUp(self):
+        super(TestGuidFileMetadataCache, self).setUp()
+        metadata_cache.clear()
+        self.file_guid = DummyGuidFile(node=ProjectFactory())
+        self.file_guid.save()
+
+    def tearDown(self):
+        super(TestGuidFileMetadataCache, self).tearDown()
+        metadata_cache.clear()
+
+    def mock_response(self, mock_get, data):
+        mock_get.return_value = mock.Mock(ok=True, json=lambda: {'data': data})
+
+    def test_fetch_metadata_cached(self, mock_url, mock_get):
+        self.mock_response(mock_get, {'name': 'bar.md'})
+        self.file_guid._fetch_metadata()
+        self.file_guid._fetch_metadata()
+        assert_equal(mock_get.call_count, 1)
+        assert_equal(self.file_guid._metadata_cache, {'name': 'bar.md'})
+
+    def test_fetch_metadata_keyed_by_revision(self, mock_url, mock_get):
+        self.mock_response(mock_get, {'name': 'bar.md'})
+        self.file_guid._fetch_metadata()
+        self.file_guid.maybe_set_version(versionidentifier='2')
+        self.file_guid._fetch_metadata()
+        assert_equal(mock_get.call_count, 2)
+
+    def test_revisions_mutable_by_default(self, mock_url, mock_get):
+        self.file_guid.maybe_set_version(versionidentifier='2')
+        assert_false(self.file_guid.has_immutable_revision)
+
+    def test_dataverse_revisions_mutable(self, mock_url, mock_get):
+        file_guid = DataverseFile(node=self.file_guid.node, file_id='12345')
+        file_guid.maybe_set_version(version='latest-published')
+        assert_false(file_guid.has_immutable_revision)
+
+    def test_osfstorage_revisions_immutable(self, mock_url, mock_get):
+        file_guid = OsfStorageGuidFile(node=self.file_guid.node, path='file')
+        file_guid.maybe_set_version(version='2')
+        assert_true(file_guid.has_immutable_revision)
+
+    def test_fetch_metadata_error_not_cached(self, mock_url, mock_get):
+        mock_get.return_value = mock.Mock(ok=False, json=lambda: {'data': None})
+        self.file_guid._fetch_metadata()
+        self.file_guid._fetch_metadata()
+        assert_equal(mock_get.call_count, 2)
+
+    def test_invalidate(self, mock_url, mock_get):
+        self.mock_response(mock_get, {'name': 'bar.md'})
+        self.file_guid._fetch_metadata()
+        invalidate_metadata_cache(self.file_guid.node, 'dummy', 'path/to/file/')
+        self.file_guid._fetch_metadata()
+        assert_equal(mock_get.call_count, 2)
+
+
 def assert_urls_equal(url1, url2):
     furl1 = furl.furl(url1)
     furl2 = furl.furl(url2)
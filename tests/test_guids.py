@@ -4,14 +4,17 @@ import mock
 from nose.tools import *  # noqa
 
 from tests.base import OsfTestCase
-from tests.factories import NodeFactory
+from tests.factories import NodeFactory, ProjectFactory
 
 from modularodm import Q
 from modularodm import fields
+from modularodm.storage.base import KeyExistsException
 from modularodm.storage.mongostorage import MongoStorage
 
+from framework.auth import Auth
 from framework.mongo import database
-from framework.guid.model import GuidStoredObject
+from framework.guid.model import GuidStoredObject, GuidBlock, guid_block
+from framework.guid.model import guid_cache, MISSING_GUID
 
 from website import models
 
@@ -32,13 +35,70 @@ class TestGuidStoredObject(OsfTestCase):
         assert_equal(guids[0].referent, fake_guid)
         assert_equal(guids[0]._id, fake_guid._id)
 
+    def test_new_object_inserts_guid_once(self):
+        with mock.patch.object(MongoStorage, 'insert', autospec=True, side_effect=MongoStorage.insert) as mock_insert:
+            with mock.patch.object(MongoStorage, 'update', autospec=True, side_effect=MongoStorage.update) as mock_update:
+                node = NodeFactory()
+        guid_storage = models.Guid._storage[0]
+        guid_inserts = [call for call in mock_insert.call_args_list if call[0][0] is guid_storage]
+        guid_updates = [call for call in mock_update.call_args_list if call[0][0] is guid_storage]
+        assert_equal(len(guid_inserts), 1)
+        assert_equal(guid_updates, [])
+        guid = models.Guid.load(node._id)
+        assert_equal(guid.referent, node)
+
+    def test_resave_skips_guid_lookup(self):
+        node = NodeFactory()
+        with mock.patch.object(models.Guid, 'load') as mock_load:
+            node.title = 'Changed'
+            node.save()
+        assert_false(mock_load.called)
+
+    def test_loaded_object_looks_up_guid_once(self):
+        node = NodeFactory()
+        node._guid_key = None
+        with mock.patch.object(models.Guid, 'load', wraps=models.Guid.load) as mock_load:
+            node.save()
+            node.save()
+        assert_equal(mock_load.call_count, 1)
+
+    def test_taken_key_is_skipped(self):
+        taken = NodeFactory()._id
+        guid_block.clear()
+        with mock.patch.object(guid_block, 'pop', side_effect=[taken, 'fresh']):
+            node = NodeFactory()
+        assert_equal(node._id, 'fresh')
+        assert_equal(models.Guid.load(taken).referent._id, taken)
+
+
+class TestGuidBlock(OsfTestCase):
+
+    def test_pop_fills_block(self):
+        block = GuidBlock(5)
+        key = block.pop()
+        assert_equal(len(block._keys), 4)
+        assert_not_in(key, block._keys)
+
+    def test_fill_excludes_existing_keys(self):
+        node = NodeFactory()
+        block = GuidBlock(2)
+        storage = models.Guid._storage[0]
+        with mock.patch.object(storage, '_generate_random_id', side_effect=[node._id, 'abcde']):
+            block._fill()
+        assert_equal(list(block._keys), ['abcde'])
+
 
 class TestResolveGuid(OsfTestCase):
 
     def setUp(self):
         super(TestResolveGuid, self).setUp()
+        guid_cache.clear()
         self.node = NodeFactory()
 
+    def tearDown(self):
+        super(TestResolveGuid, self).tearDown()
+        guid_cache.clear()
+
     def test_resolve_guid(self):
         res_guid = self.app.get(self.node.web_url_for('node_setting', _guid=True), auth=self.node.creator.auth)
         res_full = self.app.get(self.node.web_url_for('node_setting'), auth=self.node.creator.auth)
@@ -63,3 +123,52 @@ class TestResolveGuid(OsfTestCase):
             expect_errors=True,
         )
         assert_equal(res.status_code, 404)
+
+    def test_resolve_guid_cached(self):
+        url = self.node.web_url_for('node_setting', _guid=True)
+        self.app.get(url, auth=self.node.creator.auth)
+        assert_equal(guid_cache.get(self.node._id), ('node', self.node.deep_url))
+        with mock.patch.object(models.Guid, 'load') as mock_load:
+            res = self.app.get(url, auth=self.node.creator.auth)
+        assert_false(mock_load.called)
+        assert_equal(res.status_code, 200)
+
+    def test_resolve_guid_miss_cached(self):
+        res = self.app.get('/notaguid/', expect_errors=True)
+        assert_equal(res.status_code, 404)
+        assert_equal(guid_cache.get('notaguid'), MISSING_GUID)
+        with mock.patch.object(models.Guid, 'load') as mock_load:
+            res = self.app.get('/notaguid/', expect_errors=True)
+        assert_false(mock_load.called)
+        assert_equal(res.status_code, 404)
+
+    def test_resolve_guid_lower_case_redirect(self):
+        res = self.app.get('/{0}/'.format(self.node._id.upper()))
+        assert_equal(res.status_code, 302)
+        assert_in('/{0}/'.format(self.node._id), res.location)
+
+    def test_guid_creation_clears_miss(self):
+        guid_cache.set('newguid', MISSING_GUID)
+        models.Guid(_id='newguid', referent=self.node).save()
+        assert_not_in('newguid', guid_cache)
+
+    def test_delete_invalidates_cache(self):
+        self.app.get(self.node.web_url_for('node_setting', _guid=True), auth=self.node.creator.auth)
+        assert_in(self.node._id, guid_cache)
+        self.node.remove_node(auth=Auth(self.node.creator))
+        assert_not_in(self.node._id, guid_cache)
+
+    def test_move_invalidates_cache(self):
+        project = ProjectFactory(creator=self.node.creator)
+        component = NodeFactory(parent=project, creator=self.node.creator)
+        self.app.get(component.web_url_for('node_setting', _guid=True), auth=component.creator.auth)
+        assert_in(component._id, guid_cache)
+        component.category = 'project'
+        component.save()
+        assert_not_in(component._id, guid_cache)
+
+    def test_unrelated_save_keeps_cache(self):
+        self.app.get(self.node.web_url_for('node_setting', _guid=True), auth=self.node.creator.auth)
+        self.node.title = 'Changed'
+        self.node.save()
+        assert_in(self.node._id, guid_cache)
@@ -12,6 +12,7 @@ from dateutil import parser
 from modularodm.exceptions import ValidationError, ValidationValueError, ValidationTypeError
 
 
+from framework.addons import load_addons
 from framework.analytics import get_total_activity_count
 from framework.exceptions import PermissionsError
 from framework.auth import User, Auth
@@ -23,11 +24,13 @@ from website import filters, language, settings
 from website.exceptions import NodeStateError
 from website.profile.utils import serialize_user
 from website.project.model import (
-    ApiKey, Comment, Node, NodeLog, Pointer, ensure_schemas, has_anonymous_link,
-    get_pointer_parent,
+    ApiKey, Comment, Node, NodeLog, Pointer, ForkJob, RegistrationJob,
+    ensure_schemas, has_anonymous_link, get_pointer_parent,
 )
 from website.util.permissions import CREATOR_PERMISSIONS
 from website.util import web_url_for, api_url_for
+from website.addons.wiki.model import AddonWikiNodeSettings
+from website.addons.github.model import AddonGitHubNodeSettings
 from website.addons.wiki.exceptions import (
     NameEmptyError,
     NameInvalidError,
@@ -329,6 +332,28 @@ class TestUser(OsfTestCase):
         u.add_unconfirmed_email("test@osf.io")
         assert_is_instance(u.email_verifications[token]['expiration'], datetime.datetime)
 
+    def test_normalized_emails_updated_on_save(self):
+        u = UserFactory()
+        u.emails = [' Fred@Example.com', 'fred@example.com', 'freddie@example.com']
+        u.save()
+        assert_equal(u.normalized_emails, ['fred@example.com', 'freddie@example.com'])
+        assert_equal(User.find_by_email('FRED@example.com '), [u])
+
+        u.emails = ['freddie@example.com']
+        u.save()
+        assert_equal(u.normalized_emails, ['freddie@example.com'])
+        assert_equal(User.find_by_email('fred@example.com'), [])
+
+    def test_merged_user_not_found_by_email(self):
+        u = UserFactory()
+        merged = UserFactory()
+        merged.emails = ['merged@example.com']
+        merged.save()
+        u.merge_user(merged)
+        u.save()
+        assert_equal(merged.normalized_emails, [])
+        assert_equal(User.find_by_email('Merged@example.com'), [u])
+
     def test_add_blank_unconfirmed_email(self):
         with assert_raises(ValidationError) as exc_info:
             self.user.add_unconfirmed_email('')
@@ -734,6 +759,40 @@ class TestUser(OsfTestCase):
         assert_equal(self.user.n_projects_in_common(user2), 1)
         assert_equal(self.user.n_projects_in_common(user3), 0)
 
+    def test_cocontributor_counts_updated_on_add_and_remove(self):
+        user2 = UserFactory()
+        user3 = UserFactory()
+        # Initialize counts before contributors change
+        assert_equal(user2.get_cocontributor_counts(), {})
+        project = ProjectFactory(creator=self.user)
+        project.add_contributor(contributor=user2, auth=self.consolidate_auth)
+        project.add_contributor(contributor=user3, auth=self.consolidate_auth)
+        project.save()
+        project2 = ProjectFactory(creator=self.user)
+        project2.add_contributor(contributor=user2, auth=self.consolidate_auth)
+        project2.save()
+
+        assert_equal(self.user.n_projects_in_common(user2), 2)
+        assert_equal(user2.get_cocontributor_counts(), {self.user._id: 2, user3._id: 1})
+        assert_equal(user3.n_projects_in_common(user2), 1)
+
+        project.remove_contributor(user2, auth=self.consolidate_auth)
+        assert_equal(user2.get_cocontributor_counts(), {self.user._id: 1})
+        assert_equal(user3.n_projects_in_common(user2), 0)
+        assert_equal(self.user.get_cocontributor_counts(), {user2._id: 1, user3._id: 1})
+
+    def test_cocontributor_counts_match_projects_in_common(self):
+        user2 = UserFactory()
+        project = ProjectFactory(creator=self.user)
+        project.add_contributor(contributor=user2, auth=self.consolidate_auth)
+        project.save()
+        NodeFactory(creator=self.user, project=project)
+
+        assert_equal(
+            self.user.n_projects_in_common(user2),
+            len(self.user.get_projects_in_common(user2)),
+        )
+
 
 class TestUserParse(unittest.TestCase):
 
@@ -1355,6 +1414,31 @@ class TestNode(OsfTestCase):
             addon_count
         )
 
+    def test_get_addons_cached_on_instance(self):
+        self.node.get_addons()
+        with mock.patch.object(AddonWikiNodeSettings, 'load') as mock_load:
+            assert_true(self.node.get_addon('wiki'))
+        assert_false(mock_load.called)
+
+    def test_get_addons_sees_new_settings(self):
+        assert_not_in('github', self.node.get_addon_names())
+        AddonGitHubNodeSettings(owner=self.node).save()
+        assert_in('github', self.node.get_addon_names())
+
+    def test_load_addons_queries_each_collection_once(self):
+        nodes = [NodeFactory(), NodeFactory(), NodeFactory()]
+        Node._clear_caches()
+        AddonWikiNodeSettings._clear_caches()
+        nodes = [Node.load(node._id) for node in nodes]
+        with mock.patch.object(AddonWikiNodeSettings, 'find', wraps=AddonWikiNodeSettings.find) as mock_find:
+            load_addons(nodes)
+        assert_equal(mock_find.call_count, 1)
+        storage = AddonWikiNodeSettings._storage[0]
+        with mock.patch.object(storage, 'get') as mock_get:
+            for node in nodes:
+                assert_true(node.get_addon('wiki'))
+        assert_false(mock_get.called)
+
     def test_cant_add_component_to_component(self):
         with assert_raises(ValueError):
             NodeFactory(project=self.node)
@@ -2743,6 +2827,76 @@ class TestForkNode(OsfTestCase):
             self.registration,
         )
 
+    def test_fork_adds_backrefs_to_logs_and_tags(self):
+        self.project.add_tag('cats', auth=self.consolidate_auth)
+        fork = self.project.fork_node(self.consolidate_auth)
+
+        for log in self.project.logs:
+            assert_in(fork, log.node__logged)
+        assert_in(fork, self.project.tags[0].node__tagged)
+
+    def test_fork_job_reports_progress(self):
+        NodeFactory(creator=self.user, project=self.project)
+        NodeFactory(creator=self.user, project=self.project)
+        job = ForkJob(node=self.project, user=self.user)
+        job.save()
+
+        job.run()
+
+        assert_equal(job.status, ForkJob.COMPLETE)
+        assert_equal(job.total, 3)
+        assert_equal(job.completed, 3)
+        assert_equal(job.fork_ids[-1], job.fork._id)
+        self._cmp_fork_original(
+            self.user, datetime.datetime.utcnow(), job.fork, self.project,
+        )
+
+    def test_fork_job_total_omits_private_children(self):
+        self.project.set_privacy('public')
+        NodeFactory(creator=self.user, project=self.project, is_public=True)
+        NodeFactory(creator=self.user, project=self.project)
+        job = ForkJob(node=self.project, user=UserFactory())
+        job.save()
+
+        job.run()
+
+        assert_equal(job.total, 2)
+        assert_equal(len(job.fork.nodes), 1)
+
+    def test_fork_job_failure_deletes_partial_fork(self):
+        component = NodeFactory(creator=self.user, project=self.project)
+        job = ForkJob(node=self.project, user=self.user)
+        job.save()
+
+        copy_references = Node._copy_references
+
+        def copy_then_fail(node, original):
+            if original == self.project:
+                raise Exception('Fork failed')
+            return copy_references(node, original)
+
+        with mock.patch.object(Node, '_copy_references', autospec=True,
+                               side_effect=copy_then_fail):
+            job.run()
+
+        assert_equal(job.status, ForkJob.FAILED)
+        assert_equal(job.fork, None)
+        assert_equal(len(job.fork_ids), 2)
+        forked_component, forked_project = [Node.load(_id) for _id in job.fork_ids]
+        assert_equal(forked_component.forked_from, component)
+        assert_equal(forked_project.forked_from, self.project)
+        assert_true(forked_component.is_deleted)
+        assert_true(forked_project.is_deleted)
+
+    def test_fork_job_without_permission_fails(self):
+        job = ForkJob(node=self.project, user=UserFactory())
+        job.save()
+
+        job.run()
+
+        assert_equal(job.status, ForkJob.FAILED)
+        assert_equal(job.fork_ids, [])
+
 
 class TestRegisterNode(OsfTestCase):
 
@@ -2941,6 +3095,76 @@ class TestRegisterNode(OsfTestCase):
         assert_in(self.registration._id, self.project.node__registrations)
 
 
+class TestRegistrationJob(OsfTestCase):
+
+    def setUp(self):
+        super(TestRegistrationJob, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(user=self.user)
+        self.project = ProjectFactory(creator=self.user)
+        self.component = NodeFactory(creator=self.user, project=self.project)
+
+    def test_snapshot_defers_addons(self):
+        job = self.project.snapshot_registration(None, self.auth, 'Template1', '')
+
+        assert_equal(job.status, RegistrationJob.PENDING)
+        registration = job.registration
+        assert_true(registration.is_registration)
+        assert_equal(registration.registered_from, self.project)
+        assert_equal(registration.nodes[0].registered_from, self.component)
+        assert_equal(
+            [entry['original'] for entry in job.nodes],
+            [self.project._id, self.component._id],
+        )
+        assert_false(registration.has_addon('wiki'))
+        assert_equal(self.project.logs[-1].action, NodeLog.PROJECT_REGISTERED)
+        assert_equal(registration.logs, self.project.logs[:-1])
+
+    def test_run_copies_addons(self):
+        job = self.project.snapshot_registration(None, self.auth, 'Template1', '')
+        job.run()
+
+        assert_equal(job.status, RegistrationJob.COMPLETE)
+        assert_true(job.registration.has_addon('wiki'))
+        assert_true(job.registration.nodes[0].has_addon('wiki'))
+        for stage in RegistrationJob.STAGES:
+            assert_equal(job.stages[stage]['attempts'], 1)
+
+    def test_find_for_registration(self):
+        job = self.project.snapshot_registration(None, self.auth, 'Template1', '')
+        assert_equal(RegistrationJob.find_for_registration(job.registration), job)
+        assert_equal(RegistrationJob.find_for_registration(job.registration.nodes[0]), job)
+        assert_is_none(RegistrationJob.find_for_registration(self.project))
+
+    @mock.patch('website.search.search.update_node')
+    def test_failed_stage_resumes(self, mock_update_node):
+        mock_update_node.side_effect = [Exception('Search unavailable'), None, None, None]
+        job = self.project.snapshot_registration(None, self.auth, 'Template1', '')
+
+        with assert_raises(Exception):
+            job.run()
+        assert_equal(job.status, RegistrationJob.FAILED)
+        assert_equal(job.stages['addons']['status'], RegistrationJob.COMPLETE)
+        assert_equal(job.stages['search']['status'], RegistrationJob.FAILED)
+
+        job.run()
+        assert_equal(job.status, RegistrationJob.COMPLETE)
+        assert_equal(job.stages['addons']['attempts'], 1)
+        assert_equal(job.stages['search']['attempts'], 2)
+        assert_equal(len(job.registration.get_addons()), len(self.project.get_addons()))
+
+    def test_failed_addon_not_copied_twice(self):
+        job = self.project.snapshot_registration(None, self.auth, 'Template1', '')
+        addon_names = [addon.config.short_name for addon in self.project.get_addons()]
+        job.nodes[0]['copied'] = addon_names[:1]
+        job.save()
+
+        job.run()
+
+        assert_equal(job.nodes[0]['copied'], addon_names)
+        assert_false(job.registration.has_addon(addon_names[0]))
+
+
 class TestNodeLog(OsfTestCase):
 
     def setUp(self):
@@ -3454,6 +3678,77 @@ class TestComments(OsfTestCase):
         with assert_raises(ValidationValueError):
             self.comment.save()
 
+    def test_thread_position(self):
+        reply = CommentFactory(node=self.comment.node, target=self.comment)
+        nested = CommentFactory(node=self.comment.node, target=reply)
+        assert_equal(self.comment.root_target, self.comment.node._id)
+        assert_equal(self.comment.depth, 0)
+        assert_equal(reply.root_target, self.comment.node._id)
+        assert_equal(reply.depth, 1)
+        assert_equal(nested.depth, 2)
+
+    def test_find_page(self):
+        node = self.comment.node
+        comments = [self.comment] + [CommentFactory(node=node) for _ in range(4)]
+        CommentFactory(node=node, target=self.comment)
+        first, cursor = Comment.find_page(node, size=3)
+        assert_equal(len(first), 3)
+        assert_equal(cursor, first[-1])
+        second, cursor = Comment.find_page(node, cursor=cursor, size=3)
+        assert_equal(len(second), 2)
+        assert_is_none(cursor)
+        assert_equal(set(first + second), set(comments))
+        assert_equal(Comment.find_page(node)[0], first + second)
+
+    def test_find_page_replies(self):
+        reply = CommentFactory(node=self.comment.node, target=self.comment)
+        other = CommentFactory(node=self.comment.node)
+        CommentFactory(node=self.comment.node, target=other)
+        assert_equal(Comment.find_page(self.comment)[0], [reply])
+
+    def test_find_parents(self):
+        reply = CommentFactory(node=self.comment.node, target=self.comment)
+        other = CommentFactory(node=self.comment.node)
+        assert_equal(
+            Comment.find_parents([self.comment, reply, other]),
+            {self.comment._id},
+        )
+
+    def test_unread_counts(self):
+        node = self.comment.node
+        reader = UserFactory()
+        newcomer = UserFactory()
+        node.add_contributor(reader, auth=self.consolidated_auth)
+        node.add_contributor(newcomer, auth=self.consolidated_auth)
+        node.save()
+        Comment.set_unread_count(node, reader, 0)
+        Comment.set_unread_count(node, self.comment.user, 0)
+        CommentFactory(node=node, user=self.comment.user)
+        assert_equal(Comment.get_unread_count(node, reader), 1)
+        # Authors do not count their own comments
+        assert_equal(Comment.get_unread_count(node, self.comment.user), 0)
+        # Counters are only kept once initialized
+        assert_is_none(Comment.get_unread_count(node, newcomer))
+
+    def test_user_counts(self):
+        node = self.comment.node
+        user = UserFactory()
+        comment = CommentFactory(node=node, user=user)
+        CommentFactory(node=node, user=user)
+        assert_equal(
+            Comment.get_user_counts(node),
+            {self.comment.user._id: 1, user._id: 2},
+        )
+        comment.delete(auth=Auth(user=user), save=True)
+        self.comment.delete(auth=self.consolidated_auth, save=True)
+        self.comment.delete(auth=self.consolidated_auth, save=True)
+        assert_equal(Comment.get_user_counts(node), {user._id: 1})
+        self.comment.undelete(auth=self.consolidated_auth, save=True)
+        assert_equal(
+            Comment.get_user_counts(node),
+            {self.comment.user._id: 1, user._id: 1},
+        )
+
 
 class TestPrivateLink(OsfTestCase):
 
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import mock
 from nose.tools import *  # noqa (PEP8 asserts)
 
 from tests.factories import (
@@ -17,7 +18,7 @@ from framework import utils as framework_utils
 from website.project.views.node import _get_summary, _view_project, _serialize_node_search
 from website.views import _render_node
 from website.profile import utils
-from website.views import serialize_log
+from website.views import serialize_log, serialize_logs, load_log_references
 from website.util import permissions
 
 
@@ -174,6 +175,44 @@ class TestNodeLogSerializers(OsfTestCase):
         assert_equal(d['params'], log.params)
         assert_equal(d['node']['title'], log.node.title)
 
+    def test_serialize_logs(self):
+        node = NodeFactory(category='hypothesis')
+        contributor = UserFactory()
+        unclaimed = node.add_unregistered_contributor(
+            fullname='Unclaimed Name', email='unclaimed@example.com',
+            auth=Auth(node.creator),
+        )
+        node.save()
+        logs = [
+            NodeLogFactory(params={'node': node._id, 'contributors': [contributor._id, unclaimed._id]}),
+            NodeLogFactory(params={'project': node.parent_id}),
+        ]
+        expected = [serialize_log(log) for log in logs]
+        serialized = serialize_logs(logs, anonymous=[False, True])
+        assert_equal(serialized[0], expected[0])
+        assert_equal(serialized[1]['node'], expected[1]['node'])
+        assert_true(serialized[1]['anonymous'])
+        assert_equal(
+            [c['fullname'] for c in serialized[0]['contributors']],
+            [contributor.fullname, 'Unclaimed Name'],
+        )
+
+    def test_serialize_logs_loads_references_in_bulk(self):
+        node = NodeFactory()
+        logs = [
+            NodeLogFactory(params={'node': node._id, 'contributors': [UserFactory()._id]})
+            for _ in range(5)
+        ]
+        users, nodes = load_log_references(logs)
+        assert_equal(set(nodes.keys()), {node._id})
+        assert_equal(len(users), 10)
+        with mock.patch('website.views.load_log_references') as mock_load:
+            mock_load.return_value = users, nodes
+            with mock.patch('website.project.model.User.load') as mock_user_load:
+                serialize_logs(logs)
+        assert_equal(mock_load.call_count, 1)
+        assert_false(mock_user_load.called)
+
     def test_serialize_node_for_logs(self):
         node = NodeFactory()
         d = node.serialize()
@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 import os
+import mock
 import unittest
+import requests
 from flask import Flask
+from requests.adapters import HTTPAdapter
 from nose.tools import *  # noqa (PEP8 asserts)
 
 from framework.routing import Rule, json_renderer
 from framework.utils import secure_filename
 from website.routes import process_rules, OsfWebRenderer
+from website import settings
 from website.util import paths
+from website.util import transport
 from website.util.mimetype import get_mimetype
 from website.util import web_url_for, api_url_for, is_json_request
 
@@ -219,3 +224,50 @@ class TestWebpackFilter(unittest.TestCase):
     def test_resolve_asset_not_found_and_not_in_debug_mode(self):
         with assert_raises(KeyError):
             paths.webpack_asset('bundle.js', self.asset_paths, debug=False)
+
+
+class TestTransport(unittest.TestCase):
+
+    def setUp(self):
+        transport.metrics.clear()
+
+    def tearDown(self):
+        transport.metrics.clear()
+
+    def test_session_shared_per_provider(self):
+        assert_is(transport.get_session('figshare'), transport.get_session('figshare'))
+        assert_is_not(transport.get_session('figshare'), transport.get_session('mendeley'))
+
+    def test_mount_shares_pool(self):
+        session = transport.mount(requests.Session(), 'figshare')
+        adapter = session.get_adapter('https://api.figshare.com/v1/')
+        assert_is(adapter, transport.get_adapter('figshare'))
+        assert_is(adapter, transport.get_session('figshare').get_adapter('https://api.figshare.com/'))
+
+    def test_shared_session_refuses_cookies(self):
+        session = transport.get_session('figshare')
+        assert_false(session.cookies.get_policy().set_ok(mock.Mock(), mock.Mock()))
+
+    @mock.patch.object(HTTPAdapter, 'send')
+    def test_default_timeout_and_metrics(self, mock_send):
+        mock_send.return_value = mock.Mock(status_code=200)
+        adapter = transport.get_adapter('figshare')
+        adapter.send(mock.Mock(), timeout=None)
+        assert_equal(mock_send.call_args[1]['timeout'], settings.EXTERNAL_HTTP_TIMEOUT)
+        adapter.send(mock.Mock(), timeout=3)
+        assert_equal(mock_send.call_args[1]['timeout'], 3)
+        stats = transport.metrics.stats()['figshare']
+        assert_equal(stats['requests'], 2)
+        assert_equal(stats['errors'], 0)
+
+    @mock.patch.object(HTTPAdapter, 'send')
+    def test_metrics_count_errors(self, mock_send):
+        adapter = transport.get_adapter('figshare')
+        mock_send.return_value = mock.Mock(status_code=503)
+        adapter.send(mock.Mock())
+        mock_send.side_effect = requests.ConnectionError
+        with assert_raises(requests.ConnectionError):
+            adapter.send(mock.Mock())
+        stats = transport.metrics.stats()['figshare']
+        assert_equal(stats['requests'], 2)
+        assert_equal(stats['errors'], 2)
@@ -22,7 +22,7 @@ from framework.auth.utils import impute_names_model
 from website import mailchimp_utils
 from website.views import _rescale_ratio
 from website.util import permissions
-from website.models import Node, Pointer, NodeLog
+from website.models import Node, Pointer, NodeLog, ForkJob, RegistrationJob
 from website.project.model import ensure_schemas, has_anonymous_link
 from website.project.views.contributor import (
     send_claim_email,
@@ -466,6 +466,44 @@ class TestProjectViews(OsfTestCase):
         reg = Node.load(self.project.node__registrations[-1])
         assert_true(reg.is_registration)
 
+    @unittest.skipIf(settings.USE_CELERY, 'Registration must complete synchronously for this test')
+    def test_registration_status(self):
+        url = "/api/v1/project/{0}/register/Replication_Recipe_(Brandt_et_al.,_2013):_Post-Completion/".format(
+            self.project._primary_key)
+        self.app.post_json(url, {}, auth=self.auth)
+        self.project.reload()
+        reg = Node.load(self.project.node__registrations[-1])
+
+        res = self.app.get(reg.api_url_for('node_registration_status'), auth=self.auth)
+        assert_equal(res.json['status'], 'complete')
+        assert_equal(res.json['url'], reg.url)
+        assert_equal(res.json['stages']['addons']['status'], 'complete')
+        assert_equal(res.json['stages']['search']['status'], 'complete')
+
+    @unittest.skipIf(settings.USE_CELERY, 'Registration must complete synchronously for this test')
+    def test_registration_status_shows_addon_messages_once(self):
+        url = "/api/v1/project/{0}/register/Replication_Recipe_(Brandt_et_al.,_2013):_Post-Completion/".format(
+            self.project._primary_key)
+        res = self.app.post_json(url, {}, auth=self.auth)
+        self.project.reload()
+        reg = Node.load(self.project.node__registrations[-1])
+        assert_equal(res.json['status_url'], reg.api_url_for('node_registration_status'))
+        job = RegistrationJob.find_for_registration(reg)
+        job.messages = ['Add-on message']
+        job.save()
+
+        with mock.patch('website.project.views.register.status.push_status_message') as mock_push:
+            self.app.get(res.json['status_url'], auth=self.auth)
+            self.app.get(res.json['status_url'], auth=self.auth)
+        mock_push.assert_called_once_with('Add-on message')
+        job.reload()
+        assert_equal(job.messages, [])
+
+    def test_registration_status_not_registration(self):
+        url = self.project.api_url_for('node_registration_status')
+        res = self.app.get(url, auth=self.auth, expect_errors=True)
+        assert_equal(res.status_code, 404)
+
     def test_register_template_page_with_invalid_template_name(self):
         url = self.project.web_url_for('node_register_template_page', template='invalid')
         res = self.app.get(url, expect_errors=True, auth=self.auth)
@@ -3132,6 +3170,42 @@ class TestComments(OsfTestCase):
 
         assert_equal(len(res.json['comments']), 1)
 
+    def test_view_comments_paginated(self):
+        self._configure_project(self.project, 'public')
+        comments = [CommentFactory(node=self.project) for _ in range(3)]
+        CommentFactory(node=self.project, target=comments[0])
+
+        url = self.project.api_url + 'comments/'
+        res = self.app.get(url, {'size': 2}, auth=self.project.creator.auth)
+        first = res.json['comments']
+        assert_equal(len(first), 2)
+        assert_equal(res.json['nextCursor'], first[-1]['id'])
+
+        res = self.app.get(
+            url,
+            {'size': 2, 'cursor': res.json['nextCursor']},
+            auth=self.project.creator.auth,
+        )
+        second = res.json['comments']
+        assert_equal(len(second), 1)
+        assert_is_none(res.json['nextCursor'])
+
+        assert_equal(
+            set(comment['id'] for comment in first + second),
+            set(comment._id for comment in comments),
+        )
+        assert_equal(
+            [comment['id'] for comment in first + second if comment['hasChildren']],
+            [comments[0]._id],
+        )
+
+    def test_view_comments_invalid_page_args(self):
+        url = self.project.api_url + 'comments/'
+        res = self.app.get(url, {'size': 0}, auth=self.project.creator.auth, expect_errors=True)
+        assert_equal(res.status_code, http.BAD_REQUEST)
+        res = self.app.get(url, {'cursor': 'nope'}, auth=self.project.creator.auth, expect_errors=True)
+        assert_equal(res.status_code, http.BAD_REQUEST)
+
     def test_view_comments_with_anonymous_link(self):
         self.project.set_privacy('private')
         self.project.save()
@@ -3258,6 +3332,32 @@ class TestComments(OsfTestCase):
         res = self.app.get(url, auth=self.project.creator.auth)
         assert_equal(res.json.get('nUnread'), 0)
 
+    def test_n_unread_comments_counted_incrementally(self):
+        url = self.project.api_url_for('view_unread_comments')
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['nUnread'], 0)
+
+        self._add_comment(self.project, auth=self.project.creator.auth)
+        self._add_comment(self.project, auth=self.project.creator.auth)
+        self._add_comment(self.project, auth=self.user.auth)
+        with mock.patch('website.project.views.comment.Comment.find') as mock_find:
+            res = self.app.get(url, auth=self.user.auth)
+            assert_false(mock_find.called)
+        assert_equal(res.json['nUnread'], 2)
+
+        self.app.put_json(
+            self.project.api_url_for('update_comments_timestamp'),
+            auth=self.user.auth,
+        )
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['nUnread'], 0)
+
+    def test_view_unread_comments_non_contributor(self):
+        self._add_comment(self.project, auth=self.project.creator.auth)
+        url = self.project.api_url_for('view_unread_comments')
+        res = self.app.get(url, auth=self.non_contributor.auth)
+        assert_equal(res.json['nUnread'], 0)
+
 
 class TestTagViews(OsfTestCase):
 
@@ -3764,6 +3864,34 @@ class TestForkViews(OsfTestCase):
         res = self.app.post_json(url, auth=contributor.auth)
         assert_equal(res.status_code, 200)
 
+    @unittest.skipIf(settings.USE_CELERY, 'Fork must happen synchronously for this test')
+    def test_fork_returns_job_status(self):
+        url = self.project.api_url_for('node_fork_page')
+        res = self.app.post_json(url, auth=self.user.auth)
+        assert_equal(res.json['status'], 'complete')
+        assert_equal(res.json['total'], 1)
+        assert_equal(res.json['completed'], 1)
+        fork = self.project.node__forked[0]
+        assert_equal(res.json['url'], fork.url)
+
+        res = self.app.get(res.json['status_url'], auth=self.user.auth)
+        assert_equal(res.json['status'], 'complete')
+        assert_equal(res.json['url'], fork.url)
+
+    def test_fork_status_other_user(self):
+        job = ForkJob(node=self.project, user=self.user)
+        job.save()
+        url = self.project.api_url_for('node_fork_status', job_id=job._id)
+        res = self.app.get(url, auth=AuthUserFactory().auth, expect_errors=True)
+        assert_equal(res.status_code, http.FORBIDDEN)
+
+    def test_fork_status_wrong_node(self):
+        job = ForkJob(node=ProjectFactory(creator=self.user), user=self.user)
+        job.save()
+        url = self.project.api_url_for('node_fork_status', job_id=job._id)
+        res = self.app.get(url, auth=self.user.auth, expect_errors=True)
+        assert_equal(res.status_code, http.NOT_FOUND)
+
     def test_registered_forks_dont_show_in_fork_list(self):
         fork = self.project.fork_node(self.consolidated_auth)
         RegistrationFactory(project=fork)
@@ -10,7 +10,7 @@ from nose.tools import *  # PEP8 asserts
 from framework.auth import Auth
 from tests.base import OsfTestCase
 from tests.factories import (UserFactory, ProjectFactory, ApiKeyFactory,
-                             WatchConfigFactory)
+                             WatchConfigFactory, NodeFactory)
 from website.views import paginate
 import math
 
@@ -83,6 +83,29 @@ class TestWatching(OsfTestCase):
         log_ids = list(self.user.get_recent_log_ids(since=since))
         assert_equal(len(log_ids), 2)
 
+    def test_get_recent_logs_uses_log_date(self):
+        self._watch_project(self.project)
+        logs = list(self.user.get_recent_logs())
+        assert_equal([log._id for log in logs], [self.last_log._id])
+
+    def test_get_recent_logs_shared_between_watched_nodes(self):
+        component = NodeFactory(project=self.project, creator=self.user)
+        self._watch_project(self.project)
+        self._watch_project(component)
+        log = component.add_log(
+            'tag_added',
+            params={'node': component._primary_key},
+            auth=self.consolidate_auth,
+        )
+        log_ids = list(self.user.get_recent_log_ids())
+        assert_equal(log_ids.count(log._id), 1)
+        assert_equal(log_ids[0], log._id)
+        assert_equal(self.user.get_recent_logs().count(), len(log_ids))
+
+    def test_get_recent_logs_no_watched_nodes(self):
+        assert_equal(self.user.get_watched_node_ids(), [])
+        assert_equal(list(self.user.get_recent_logs()), [])
+
     def test_get_daily_digest_log_ids(self):
         self._watch_project(self.project)
         day_log_ids = list(self.user.get_daily_digest_log_ids())
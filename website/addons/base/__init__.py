@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import copy
 import glob
 import importlib
 import mimetypes
@@ -10,16 +11,17 @@ from modularodm import fields
 from mako.lookup import TemplateLookup
 
 import furl
-import requests
 from modularodm import Q
 from modularodm.storage.base import KeyExistsException
 
+from framework.cache import LRUCache
 from framework.exceptions import PermissionsError
 from framework.mongo import StoredObject
 from framework.routing import process_rules
 from framework.guid.model import GuidStoredObject
 
 from website import settings
+from website.util import transport
 from website.addons.base import exceptions
 from website.addons.base import serializer
 from website.project.model import Node
@@ -52,6 +54,54 @@ STATUS_EXCEPTIONS = {
 }
 
 
+# WaterButler metadata keyed by (node, provider, path, revision). Metadata for
+# mutable files expires quickly; immutable revisions are kept until evicted
+metadata_cache = LRUCache(
+    max_size=settings.WATERBUTLER_METADATA_CACHE_SIZE,
+    ttl=settings.WATERBUTLER_METADATA_TTL,
+)
+
+
+# Responses of the WaterButler auth view keyed by (session, node, provider,
+# permission, view-only key)
+auth_cache = LRUCache(
+    max_size=settings.WATERBUTLER_AUTH_CACHE_SIZE,
+    ttl=settings.WATERBUTLER_AUTH_CACHE_TTL,
+)
+
+
+def invalidate_auth_cache(node=None, session_id=None):
+    """Remove cached WaterButler auth responses for a node or a session, or
+    all responses if neither is given. Changes to permissions may affect the
+    components of a node, so they should clear the whole cache.
+
+    :return: Number of entries removed
+    """
+    if node is None and session_id is None:
+        count = len(auth_cache)
+        auth_cache.clear()
+        return count
+    return auth_cache.delete_matching(
+        lambda key: (
+            (node is not None and key[1] == node._id) or
+            (session_id is not None and key[0] == session_id)
+        )
+    )
+
+
+def invalidate_metadata_cache(node, provider, path):
+    """Remove cached metadata for all revisions of a file.
+
+    :param Node node: Node the file belongs to
+    :param str provider: Add-on short name
+    :param str path: WaterButler path of the file
+    """
+    path = '/' + path.lstrip('/')
+    return metadata_cache.delete_matching(
+        lambda key: key[:3] == (node._id, provider, path)
+    )
+
+
 def _is_image(filename):
     mtype, _ = mimetypes.guess_type(filename)
     return mtype and mtype.startswith('image')
@@ -205,6 +255,9 @@ class AddonConfig(object):
 class GuidFile(GuidStoredObject):
 
     _metadata_cache = None
+    # Whether the provider's revisions identify fixed file contents rather
+    # than movable labels such as branch names
+    immutable_revisions = False
     _id = fields.StringField(primary=True)
     node = fields.ForeignField('node', required=True, index=True)
 
@@ -239,6 +292,29 @@ class GuidFile(GuidStoredObject):
     def unique_identifier(self):
         raise NotImplementedError
 
+    @property
+    def size(self):
+        """Size of the file in bytes from provider metadata, or `None`."""
+        try:
+            return int(self._metadata_cache['size'])
+        except (TypeError, KeyError, ValueError):
+            return None
+
+    @property
+    def content_hash(self):
+        """Hash of the file contents from provider metadata, prefixed with the
+        algorithm name, or `None` if the provider does not report one. Used to
+        share rendered output between files with identical contents.
+        """
+        try:
+            hashes = self._metadata_cache['extra']['hashes']
+        except (TypeError, KeyError):
+            return None
+        for algorithm in ('sha256', 'md5'):
+            if hashes.get(algorithm):
+                return u'{0}:{1}'.format(algorithm, hashes[algorithm])
+        return None
+
     @property
     def waterbutler_path(self):
         '''The waterbutler formatted path of the specified file.
@@ -371,6 +447,22 @@ class GuidFile(GuidStoredObject):
     def revision(self):
         return getattr(self, '_revision', None)
 
+    @property
+    def has_immutable_revision(self):
+        """Whether `revision` always refers to the same file contents, so that
+        its metadata can be cached indefinitely.
+        """
+        return self.immutable_revisions and self.revision is not None
+
+    @property
+    def metadata_cache_key(self):
+        return (
+            self.node._id,
+            self.provider,
+            '/' + self.waterbutler_path.lstrip('/'),
+            self.revision,
+        )
+
     def maybe_set_version(self, **kwargs):
         self._revision = kwargs.get(self.version_identifier)
 
@@ -388,14 +480,23 @@ class GuidFile(GuidStoredObject):
         raise exceptions.AddonEnrichmentError(response.status_code)
 
     def _fetch_metadata(self, should_raise=False):
-        # Note: We should look into caching this at some point
-        # Some attributes may change however.
-        resp = requests.get(self.metadata_url)
+        key = self.metadata_cache_key
+        cached = metadata_cache.get(key)
+        if cached is not None:
+            self._metadata_cache = copy.deepcopy(cached)
+            return
+
+        resp = transport.get_session('waterbutler').get(self.metadata_url)
 
         if should_raise:
             self._exception_from_response(resp)
         self._metadata_cache = resp.json()['data']
 
+        if resp.ok:
+            # ttl of 0 keeps metadata for immutable revisions until evicted
+            ttl = 0 if self.has_immutable_revision else None
+            metadata_cache.set(key, copy.deepcopy(self._metadata_cache), ttl=ttl)
+
 
 class AddonSettingsBase(StoredObject):
 
@@ -460,6 +561,12 @@ class AddonUserSettingsBase(AddonSettingsBase):
         """Whether the user has added credentials for this addon."""
         return False
 
+    def save(self, *args, **kwargs):
+        saved_fields = super(AddonUserSettingsBase, self).save(*args, **kwargs)
+        # Credentials may be used by any node the user has authorized
+        invalidate_auth_cache()
+        return saved_fields
+
     def get_backref_key(self, schema, backref_name):
         return schema._name + '__' + backref_name
 
@@ -671,6 +778,12 @@ class AddonNodeSettingsBase(AddonSettingsBase):
         """Whether the node has added credentials for this addon."""
         return False
 
+    def save(self, *args, **kwargs):
+        saved_fields = super(AddonNodeSettingsBase, self).save(*args, **kwargs)
+        if self.owner:
+            invalidate_auth_cache(node=self.owner)
+        return saved_fields
+
     def to_json(self, user):
         ret = super(AddonNodeSettingsBase, self).to_json(user)
         ret.update({
@@ -792,6 +905,17 @@ class AddonNodeSettingsBase(AddonSettingsBase):
         """
         pass
 
+    def snapshot(self):
+        """Capture the state that `after_register` copies. Registrations are
+        created immediately but add-ons are copied in the background; add-ons
+        whose contents may change in the meantime should return a snapshot
+        here and accept it as the `snapshot` argument of `after_register`.
+
+        :returns: JSON-serializable snapshot, or `None`
+
+        """
+        return None
+
     def after_register(self, node, registration, user, save=True):
         """
 
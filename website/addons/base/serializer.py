@@ -1,4 +1,5 @@
 import abc
+import urllib
 
 from framework.auth.decorators import collect_auth
 from website.util import api_url_for, web_url_for
@@ -165,3 +166,13 @@ class CitationsAddonSerializer(OAuthAddonSerializer):
             'kind': 'file',
             'id': citation['id'],
         }
+
+    def serialize_page(self, list_id, page):
+        """Serialize a placeholder folder that fetches a further page of the
+        citations in a folder when opened.
+        """
+        ret = self.serialize_folder({'name': 'More citations', 'id': list_id})
+        ret['id'] = '{0}:{1}'.format(list_id, page)
+        ret['urls']['fetch'] += '?' + urllib.urlencode({'page': page})
+        ret['page'] = page
+        return ret
@@ -16,12 +16,17 @@ from framework.auth import Auth
 from framework.sessions import Session
 from framework.sentry import log_exception
 from framework.exceptions import HTTPError
+from framework.render.cache import file_extension, render_cache
+from framework.render.core import send_rendered_file
+from framework.render.locks import render_lock
 from framework.render.tasks import build_rendered_html
 from framework.auth.decorators import must_be_logged_in, must_be_signed
 
 from website import settings
 from website.project import decorators
 from website.addons.base import exceptions
+from website.addons.base import auth_cache
+from website.addons.base import invalidate_metadata_cache
 from website.models import User, Node, NodeLog
 from website.util import rubeus
 from website.project.utils import serialize_node
@@ -71,13 +76,19 @@ def check_file_guid(guid):
     return None
 
 
-def get_user_from_cookie(cookie):
+def get_session_id_from_cookie(cookie):
     if not cookie:
         return None
     try:
-        token = itsdangerous.Signer(settings.SECRET_KEY).unsign(cookie)
+        return itsdangerous.Signer(settings.SECRET_KEY).unsign(cookie)
     except itsdangerous.BadSignature:
         raise HTTPError(httplib.UNAUTHORIZED)
+
+
+def get_user_from_cookie(cookie):
+    token = get_session_id_from_cookie(cookie)
+    if token is None:
+        return None
     session = Session.load(token)
     if session is None:
         raise HTTPError(httplib.UNAUTHORIZED)
@@ -148,6 +159,16 @@ def get_auth(**kwargs):
 
     view_only = request.args.get('view_only')
 
+    # Bursts of file operations on a node ask for the same decision repeatedly;
+    # only successful responses are cached
+    permission = permission_map.get(action)
+    if permission is None:
+        raise HTTPError(httplib.BAD_REQUEST)
+    key = (get_session_id_from_cookie(cookie), node_id, provider_name, permission, view_only)
+    cached = auth_cache.get(key)
+    if cached is not None:
+        return cached
+
     user = get_user_from_cookie(cookie)
 
     node = Node.load(node_id)
@@ -167,7 +188,7 @@ def get_auth(**kwargs):
         log_exception()
         raise HTTPError(httplib.BAD_REQUEST)
 
-    return {
+    ret = {
         'auth': make_auth(user),
         'credentials': credentials,
         'settings': settings,
@@ -176,6 +197,8 @@ def get_auth(**kwargs):
             _absolute=True,
         ),
     }
+    auth_cache.set(key, ret)
+    return ret
 
 
 LOG_ACTION_MAP = {
@@ -213,27 +236,66 @@ def create_waterbutler_log(payload, **kwargs):
     auth = Auth(user=user)
     node_addon.create_waterbutler_log(auth, osf_action, metadata)
 
+    invalidate_metadata_cache(node, provider, metadata['path'])
+
     return {'status': 'success'}
 
 
-def get_or_start_render(file_guid, start_render=True):
+def get_render_path(file_guid, start_render=True):
+    """Return the path to rendered HTML for a file, or `None` if rendering is
+    pending. Never waits on a render in progress; the client polls instead.
+
+    :param bool start_render: Start a render job on a cache miss
+    :raises: `AddonEnrichmentError` if file metadata cannot be fetched
+    """
+    file_guid.enrich()
+
+    cache_path = file_guid.mfr_cache_path
+
+    if not os.path.isfile(cache_path):
+        # Identical contents may already have been rendered for another file
+        render_cache.copy_to(
+            file_guid.content_hash,
+            file_extension(file_guid.mfr_temp_path),
+            file_guid.public_download_url,
+            cache_path,
+        )
+
+    if os.path.isfile(cache_path):
+        return cache_path
+
+    # Start rendering job if requested and not already in progress
+    if start_render and not render_lock.is_held(cache_path):
+        build_rendered_html(
+            file_guid.mfr_download_url,
+            cache_path,
+            file_guid.mfr_temp_path,
+            file_guid.public_download_url,
+            content_hash=file_guid.content_hash,
+            size=file_guid.size,
+        )
+    return None
+
+
+def get_or_start_render(file_guid, start_render=True, max_size=None):
+    """Return rendered HTML for a file, or `None` if rendering is pending.
+
+    :param int max_size: Return `None` for output larger than this many bytes
+        so that the client loads it from `addon_render_file` instead
+    """
     try:
-        file_guid.enrich()
+        path = get_render_path(file_guid, start_render=start_render)
     except exceptions.AddonEnrichmentError as error:
         return error.as_html()
 
+    if path is None:
+        return None
+    if max_size is not None and os.path.getsize(path) > max_size:
+        return None
     try:
-        return codecs.open(file_guid.mfr_cache_path, 'r', 'utf-8').read()
+        return codecs.open(path, 'r', 'utf-8').read()
     except IOError:
-        if start_render:
-            # Start rendering job if requested
-            build_rendered_html(
-                file_guid.mfr_download_url,
-                file_guid.mfr_cache_path,
-                file_guid.mfr_temp_path,
-                file_guid.public_download_url
-            )
-    return None
+        return None
 
 
 @must_be_valid_project
@@ -345,7 +407,7 @@ def addon_view_file(auth, node, node_addon, file_guid, extras):
         'render_url': render_url,
         'file_path': file_guid.waterbutler_path,
         'files_url': node.web_url_for('collect_file_trees'),
-        'rendered': get_or_start_render(file_guid),
+        'rendered': get_or_start_render(file_guid, max_size=settings.MFR_INLINE_RENDER_MAX_BYTES),
         # Note: must be called after get_or_start_render. This is really only for github
         'extra': json.dumps(getattr(file_guid, 'extra', {})),
         #NOTE: get_or_start_render must be called first to populate name
@@ -391,4 +453,11 @@ def addon_render_file(auth, path, provider, **kwargs):
 
     file_guid.maybe_set_version(**request.args.to_dict())
 
-    return get_or_start_render(file_guid)
+    try:
+        path = get_render_path(file_guid)
+    except exceptions.AddonEnrichmentError as error:
+        return error.as_html()
+
+    if path is None:
+        return None
+    return send_rendered_file(path)
@@ -28,6 +28,9 @@ class BoxFile(GuidFile):
     """A Box file model with a GUID. Created lazily upon viewing a
     file's detail page.
     """
+
+    immutable_revisions = True
+
     __indices__ = [
         {
             'key_or_list': [
@@ -329,7 +332,7 @@ class BoxNodeSettings(AddonNodeSettingsBase):
             full_path = metadata['extra']['fullPath']
         except KeyError:
             full_path = None
-        self.owner.add_log(
+        self.owner.add_file_log(
             'box_{0}'.format(action),
             auth=auth,
             params={
@@ -1,11 +1,29 @@
 import abc
+import json
+import datetime
 import httplib as http
 
+from framework.mongo import database
 from framework.exceptions import HTTPError
 from framework.exceptions import PermissionsError
 
+from website import settings
 from website.oauth.models import ExternalAccount
 
+
+_folder_cache_indexed = False
+def _folder_cache_collection():
+    """Return the folder cache collection, creating a TTL index on first use
+    so that expired entries are removed by MongoDB.
+    """
+    global _folder_cache_indexed
+    collection = database['citationfolders']
+    if not _folder_cache_indexed:
+        collection.ensure_index('expires', expireAfterSeconds=0)
+        _folder_cache_indexed = True
+    return collection
+
+
 class CitationsProvider(object):
 
     __metaclass__ = abc.ABCMeta
@@ -53,6 +71,8 @@ class CitationsProvider(object):
 
     def remove_user_auth(self, node_addon, user):
 
+        if node_addon.external_account:
+            self.clear_folder_cache(node_addon.external_account)
         node_addon.clear_auth()
         node_addon.reload()
         result = self.serializer(
@@ -89,16 +109,60 @@ class CitationsProvider(object):
 
         return None
 
-    def citation_list(self, node_addon, user, list_id, show='all'):
+    def _folder_cache_key(self, external_account):
+        return '{0}:{1}'.format(self.provider_name, external_account._id)
 
-        attached_list_id = self._folder_id(node_addon)
-        account_folders = node_addon.api.citation_lists(self._extract_folder)
+    def account_folders(self, node_addon, refresh=False):
+        """Get the folders of the account connected to `node_addon`. Folder
+        trees are cached per external account for CITATION_FOLDER_CACHE_TTL
+        seconds, in a collection shared by all processes.
+
+        :param bool refresh: Fetch the folders from the provider even if they
+            are cached
+        :return list: Folders, with top-level folders parented to 'ROOT'
+        """
+        key = self._folder_cache_key(node_addon.external_account)
+        now = datetime.datetime.utcnow()
+        if not refresh:
+            record = _folder_cache_collection().find_one({'_id': key, 'expires': {'$gt': now}})
+            if record is not None:
+                return json.loads(record['data'])
+
+        folders = node_addon.api.citation_lists(self._extract_folder)
 
         # Folders with 'parent_list_id'==None are children of 'All Documents'
-        for folder in account_folders:
+        for folder in folders:
             if folder.get('parent_list_id') is None:
                 folder['parent_list_id'] = 'ROOT'
 
+        _folder_cache_collection().update(
+            {'_id': key},
+            {'$set': {
+                'data': json.dumps(folders),
+                'expires': now + datetime.timedelta(seconds=settings.CITATION_FOLDER_CACHE_TTL),
+            }},
+            upsert=True,
+        )
+        return folders
+
+    def clear_folder_cache(self, external_account):
+        """Drop the cached folder tree of `external_account`, e.g. when it is
+        deauthorized or disconnected.
+        """
+        _folder_cache_collection().remove({'_id': self._folder_cache_key(external_account)})
+
+    def citation_list(self, node_addon, user, list_id, show='all', page=1, refresh=False):
+        """List the folders and citations in a folder. Citations are listed
+        CITATION_PAGE_SIZE at a time; folders are only listed on the first page,
+        and each page that is followed by another ends with a placeholder
+        folder that fetches the next page.
+
+        :param int page: Page of citations, starting from 1
+        :param bool refresh: Refresh the cached folder tree of the account
+        """
+        attached_list_id = self._folder_id(node_addon)
+        account_folders = self.account_folders(node_addon, refresh=refresh)
+
         node_account = node_addon.external_account
         user_accounts = [
             account for account in user.external_accounts
@@ -127,24 +191,31 @@ class CitationsProvider(object):
             contents = [node_addon.root_folder]
         else:
             user_settings = user.get_addon(self.provider_name) if user else None
-            if show in ('all', 'folders'):
+            serializer = self.serializer(
+                node_settings=node_addon,
+                user_settings=user_settings,
+            )
+            if show in ('all', 'folders') and page == 1:
                 contents += [
-                    self.serializer(
-                        node_settings=node_addon,
-                        user_settings=user_settings,
-                    ).serialize_folder(each)
+                    serializer.serialize_folder(each)
                     for each in account_folders
                     if each.get('parent_list_id') == list_id
                 ]
 
             if show in ('all', 'citations'):
+                page_size = settings.CITATION_PAGE_SIZE
+                # Fetch one extra citation to find out whether there is a next page
+                citations = node_addon.api.get_list(
+                    list_id,
+                    offset=(page - 1) * page_size,
+                    limit=page_size + 1,
+                )
                 contents += [
-                    self.serializer(
-                        node_settings=node_addon,
-                        user_settings=user_settings,
-                    ).serialize_citation(each)
-                    for each in node_addon.api.get_list(list_id)
+                    serializer.serialize_citation(each)
+                    for each in citations[:page_size]
                 ]
+                if len(citations) > page_size:
+                    contents.append(serializer.serialize_page(list_id, page + 1))
 
         return {
             'contents': contents
@@ -203,7 +203,7 @@ class AddonDataverseNodeSettings(AddonNodeSettingsBase):
             name = urlparse.parse_qs(query_string).get('name')
 
         url = self.owner.web_url_for('addon_view_or_download_file', path=path, provider='dataverse')
-        self.owner.add_log(
+        self.owner.add_file_log(
             'dataverse_{0}'.format(action),
             auth=auth,
             params={
@@ -20,6 +20,9 @@ class DropboxFile(GuidFile):
     """A Dropbox file model with a GUID. Created lazily upon viewing a
     file's detail page.
     """
+
+    immutable_revisions = True
+
     __indices__ = [
         {
             'key_or_list': [
@@ -183,7 +186,7 @@ class DropboxNodeSettings(AddonNodeSettingsBase):
     def create_waterbutler_log(self, auth, action, metadata):
         cleaned_path = clean_path(os.path.join(self.folder, metadata['path']))
         url = self.owner.web_url_for('addon_view_or_download_file', path=cleaned_path, provider='dropbox')
-        self.owner.add_log(
+        self.owner.add_file_log(
             'dropbox_{0}'.format(action),
             auth=auth,
             params={
@@ -53,7 +53,7 @@ class TestFileGuid(OsfTestCase):
         assert_true(guid.path)
         assert_true(guid.waterbutler_path)
 
-    @mock.patch('website.addons.base.requests.get')
+    @mock.patch('website.util.transport.requests.Session.get')
     def test_unique_identifier(self, mock_get):
         mock_response = mock.Mock(ok=True, status_code=200)
         mock_get.return_value = mock_response
@@ -1,9 +1,9 @@
 import os
 import json
 
-import requests
 from requests_oauthlib import OAuth1Session
 
+from website.util import transport
 from website.util.sanitize import escape_html
 
 from . import settings as figshare_settings
@@ -17,19 +17,22 @@ class Figshare(object):
     def __init__(self, client_token=None, client_secret=None, owner_token=None, owner_secret=None):
         # if no OAuth
         if owner_token is None:
-            self.session = requests
+            self.session = transport.get_session('figshare')
         else:
             self.client_token = client_token
             self.client_secret = client_secret
             self.owner_token = owner_token
             self.owner_secret = owner_secret
 
-            self.session = OAuth1Session(
-                client_token,
-                client_secret=client_secret,
-                resource_owner_key=owner_token,
-                resource_owner_secret=owner_secret,
-                signature_type='auth_header'
+            self.session = transport.mount(
+                OAuth1Session(
+                    client_token,
+                    client_secret=client_secret,
+                    resource_owner_key=owner_token,
+                    resource_owner_secret=owner_secret,
+                    signature_type='auth_header'
+                ),
+                'figshare',
             )
         self.last_error = None
 
@@ -131,7 +134,7 @@ class Figshare(object):
         return articles, 200
 
     def article_is_public(self, article):
-        res = requests.get(os.path.join(figshare_settings.API_URL, 'articles', str(article)))
+        res = transport.get_session('figshare').get(os.path.join(figshare_settings.API_URL, 'articles', str(article)))
         if res.status_code == 200:
             data = json.loads(res.content)
             if data['count'] == 0:
@@ -205,7 +205,7 @@ class AddonFigShareNodeSettings(AddonNodeSettingsBase):
         elif action == NodeLog.FILE_REMOVED:
             name = metadata['path']
             urls = {}
-        self.owner.add_log(
+        self.owner.add_file_log(
             'figshare_{0}'.format(action),
             auth=auth,
             params={
@@ -51,6 +51,11 @@ class GithubGuidFile(GuidFile):
     def waterbutler_path(self):
         return self.path
 
+    @property
+    def has_immutable_revision(self):
+        # Branch names move; only commit shas are immutable
+        return bool(self.revision and utils.is_sha(self.revision))
+
     @property
     def provider(self):
         return 'github'
@@ -347,7 +352,7 @@ class AddonGitHubNodeSettings(AddonNodeSettingsBase):
                 'download': '{0}?action=download&ref={1}'.format(url, sha)
             }
 
-        self.owner.add_log(
+        self.owner.add_file_log(
             'github_{0}'.format(action),
             auth=auth,
             params={
@@ -391,7 +396,7 @@ class AddonGitHubNodeSettings(AddonNodeSettingsBase):
         connect = GitHub.from_settings(self.user_settings)
 
         try:
-            repo = connect.repo(self.user, self.repo)
+            repo = utils.get_repo(self, connect)
         except (ApiError, GitHubError):
             return
 
@@ -492,6 +497,7 @@ class AddonGitHubNodeSettings(AddonNodeSettingsBase):
         data = connect.set_privacy(
             self.user, self.repo, permissions == 'private'
         )
+        utils.invalidate_repo_cache(self.user, self.repo)
         if data is None or 'errors' in data:
             repo = connect.repo(self.user, self.repo)
             if repo is not None:
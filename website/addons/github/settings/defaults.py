@@ -16,3 +16,10 @@ HOOK_CONTENT_TYPE = 'json'
 MAX_RENDER_SIZE = None
 
 CACHE = False
+
+# Repo metadata and branch heads are cached per node; push hooks drop the
+# cached data of their repo. Entries expire after REPO_CACHE_HOOK_TTL seconds
+# for repos with a hook (to pick up changes that send no push event, such as
+# privacy changes), or after REPO_CACHE_TTL seconds otherwise
+REPO_CACHE_TTL = 60
+REPO_CACHE_HOOK_TTL = 60 * 60
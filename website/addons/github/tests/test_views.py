@@ -11,6 +11,7 @@ from github3.repos.branch import Branch
 
 from framework.exceptions import HTTPError
 from framework.auth import Auth
+from framework.mongo import database
 
 from website.util import api_url_for
 from website.addons.github import views, utils
@@ -89,8 +90,8 @@ class TestGithubViews(OsfTestCase):
         )
         assert_equal(sha, self._get_sha_for_branch(branch=None))  # Get refs for default branch
         assert_equal(
-            branches,
-            github_mock.branches.return_value
+            [each.to_json() for each in branches],
+            [each.to_json() for each in github_mock.branches.return_value]
         )
 
     @mock.patch('website.addons.github.api.GitHub.branches')
@@ -104,10 +105,48 @@ class TestGithubViews(OsfTestCase):
         branch_sha = self._get_sha_for_branch('master')
         assert_equal(sha, branch_sha)
         assert_equal(
-            branches,
-            github_mock.branches.return_value
+            [each.to_json() for each in branches],
+            [each.to_json() for each in github_mock.branches.return_value]
         )
 
+    @mock.patch('website.addons.github.api.GitHub.branches')
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_get_refs_cached(self, mock_repo, mock_branches):
+        mock_repo.return_value = self.github.repo.return_value
+        mock_branches.return_value = self.github.branches.return_value
+        first = utils.get_refs(self.node_settings)
+        second = utils.get_refs(self.node_settings)
+        assert_equal(mock_repo.call_count, 1)
+        assert_equal(mock_branches.call_count, 1)
+        assert_equal(first[:2], second[:2])
+
+    @mock.patch('website.addons.github.utils._cache_indexed', False)
+    @mock.patch('website.addons.github.api.GitHub.branches')
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_repo_cache_indices(self, mock_repo, mock_branches):
+        mock_repo.return_value = self.github.repo.return_value
+        mock_branches.return_value = self.github.branches.return_value
+        utils.get_refs(self.node_settings)
+        indices = database['githubcache'].index_information()
+        keys = dict((tuple(index['key']), index) for index in indices.values())
+        assert_in((('repo', 1),), keys)
+        assert_equal(keys[(('expires', 1),)]['expireAfterSeconds'], 0)
+
+    @mock.patch('website.addons.github.views.hooks.utils.verify_hook_signature')
+    @mock.patch('website.addons.github.api.GitHub.branches')
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_hook_callback_invalidates_cache(self, mock_repo, mock_branches, mock_verify):
+        mock_repo.return_value = self.github.repo.return_value
+        mock_branches.return_value = self.github.branches.return_value
+        utils.get_refs(self.node_settings)
+        self.app.post_json(
+            '/api/v1/project/{0}/github/hook/'.format(self.project._id),
+            {'test': True, 'commits': []},
+        ).maybe_follow()
+        utils.get_refs(self.node_settings)
+        assert_equal(mock_repo.call_count, 2)
+        assert_equal(mock_branches.call_count, 2)
+
     def test_before_remove_contributor_authenticator(self):
         url = self.project.api_url + 'beforeremovecontributors/'
         res = self.app.post_json(
@@ -1,14 +1,20 @@
+import re
 import hmac
+import json
 import uuid
 import urllib
 import hashlib
+import datetime
 import httplib as http
 from github3.repos.branch import Branch
+from github3.repos.repo import Repository
 
+from framework.mongo import database
 from framework.exceptions import HTTPError
 from website.addons.base.exceptions import HookError
 
 from website.addons.github.api import GitHub
+from website.addons.github import settings as github_settings
 
 MESSAGE_BASE = 'via the Open Science Framework'
 MESSAGES = {
@@ -18,6 +24,12 @@ MESSAGES = {
 }
 
 
+SHA_REGEX = re.compile(r'^[0-9a-f]{40}$')
+def is_sha(ref):
+    """Whether a ref is a full commit SHA rather than a branch or tag name."""
+    return bool(SHA_REGEX.match(ref.lower()))
+
+
 def make_hook_secret():
     return str(uuid.uuid4()).replace('-', '')
 
@@ -42,6 +54,99 @@ def verify_hook_signature(node_settings, data, headers):
         raise HookError('Invalid signature')
 
 
+def _repo_name(node_settings):
+    return '{0}/{1}'.format(node_settings.user, node_settings.repo)
+
+
+_cache_indexed = False
+def _cache_collection():
+    """Return the repo cache collection, creating its indices on first use:
+    `repo` for invalidation and a TTL index so that expired entries are
+    removed by MongoDB.
+    """
+    global _cache_indexed
+    collection = database['githubcache']
+    if not _cache_indexed:
+        collection.ensure_index('repo')
+        collection.ensure_index('expires', expireAfterSeconds=0)
+        _cache_indexed = True
+    return collection
+
+
+def _get_cached(node_settings, kind, fetch):
+    """Get data about the repo linked to `node_settings` from the repo cache,
+    calling `fetch` on a miss. Entries are specific to the node and its
+    authorizer, since repo data include the authorizer's permissions.
+
+    :param str kind: Kind of data, e.g. "repo" or "branches"
+    :param fetch: Function returning JSON-serializable data from GitHub
+    """
+    key = ':'.join([
+        node_settings._id,
+        node_settings.user_settings._id if node_settings.user_settings else '',
+        _repo_name(node_settings),
+        kind,
+    ])
+    now = datetime.datetime.utcnow()
+    collection = _cache_collection()
+    record = collection.find_one({'_id': key, 'expires': {'$gt': now}})
+    if record is not None:
+        return json.loads(record['data'])
+    data = fetch()
+    ttl = (
+        github_settings.REPO_CACHE_HOOK_TTL
+        if node_settings.hook_id
+        else github_settings.REPO_CACHE_TTL
+    )
+    collection.update(
+        {'_id': key},
+        {'$set': {
+            'repo': _repo_name(node_settings),
+            'data': json.dumps(data),
+            'expires': now + datetime.timedelta(seconds=ttl),
+        }},
+        upsert=True,
+    )
+    return data
+
+
+def get_repo(node_settings, connection=None):
+    """Get the repo linked to `node_settings`, using the repo cache.
+
+    :raises: NotFoundError if the repo does not exist
+    """
+    connection = connection or GitHub.from_settings(node_settings.user_settings)
+    data = _get_cached(
+        node_settings, 'repo',
+        lambda: connection.repo(node_settings.user, node_settings.repo).to_json(),
+    )
+    return Repository.from_json(data)
+
+
+def get_branches(node_settings, connection=None):
+    """Get the branches of the repo linked to `node_settings`, using the repo
+    cache.
+    """
+    connection = connection or GitHub.from_settings(node_settings.user_settings)
+    data = _get_cached(
+        node_settings, 'branches',
+        lambda: [
+            each.to_json()
+            for each in connection.branches(node_settings.user, node_settings.repo)
+        ],
+    )
+    return [Branch.from_json(each) for each in data]
+
+
+def invalidate_repo_cache(user, repo):
+    """Remove cached data about a repo for all nodes linked to it.
+
+    :param str user: GitHub user name
+    :param str repo: GitHub repo name
+    """
+    _cache_collection().remove({'repo': '{0}/{1}'.format(user, repo)})
+
+
 def get_path(kwargs, required=True):
     path = kwargs.get('path')
     if path:
@@ -66,7 +171,7 @@ def get_refs(addon, branch=None, sha=None, connection=None):
 
     # Get default branch if not provided
     if not branch:
-        repo = connection.repo(addon.user, addon.repo)
+        repo = get_repo(addon, connection)
         if repo is None:
             return None, None, None
         branch = repo.default_branch
@@ -86,7 +191,7 @@ def get_refs(addon, branch=None, sha=None, connection=None):
         raise HTTPError(http.BAD_REQUEST)
 
     # Get data from GitHub API if not registered
-    branches = registered_branches or connection.branches(addon.user, addon.repo)
+    branches = registered_branches or get_branches(addon, connection)
 
     # Use registered SHA if provided
     for each in branches:
@@ -103,9 +208,7 @@ def check_permissions(node_settings, auth, connection, branch, sha=None, repo=No
 
     has_auth = bool(user_settings and user_settings.has_auth)
     if has_auth:
-        repo = repo or connection.repo(
-            node_settings.user, node_settings.repo
-        )
+        repo = repo or get_repo(node_settings, connection)
 
         has_access = (
             repo is not None and (
@@ -115,9 +218,10 @@ def check_permissions(node_settings, auth, connection, branch, sha=None, repo=No
         )
 
     if sha:
-        branches = connection.branches(
-            node_settings.user, node_settings.repo, branch
-        )
+        branches = [
+            each for each in get_branches(node_settings, connection)
+            if each.name == branch
+        ]
         # TODO Will I ever return false?
         is_head = next((True for branch in branches if sha == branch.commit.sha), None)
     else:
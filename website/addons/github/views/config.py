@@ -12,6 +12,7 @@ from website.project.decorators import must_not_be_registration
 from website.project.decorators import must_have_addon
 
 from ..api import GitHub
+from .. import utils
 
 
 @must_be_logged_in
@@ -108,3 +109,4 @@ def github_set_privacy(**kwargs):
     connection = GitHub.from_settings(github.user_settings)
 
     connection.set_privacy(github.user, github.repo, private)
+    utils.invalidate_repo_cache(github.user, github.repo)
@@ -9,7 +9,7 @@ from website.project.decorators import must_have_addon
 from website.util import rubeus
 
 from website.addons.github.api import GitHub, ref_to_params
-from website.addons.github.utils import get_refs, check_permissions
+from website.addons.github.utils import get_refs, get_repo, check_permissions
 from website.addons.github.exceptions import NotFoundError
 
 
@@ -40,7 +40,7 @@ def github_hgrid_data(node_settings, auth, **kwargs):
     node = node_settings.owner
     if node.is_public and not node.is_contributor(auth.user):
         try:
-            repo = connection.repo(node_settings.user, node_settings.repo)
+            repo = get_repo(node_settings, connection)
         except NotFoundError:
             # TODO: Test me @jmcarp
             # TODO: Add warning message
@@ -81,6 +81,9 @@ def github_hook_callback(node_addon, **kwargs):
 
     payload = request.json
 
+    # Drop cached branch heads, including for pushes made through OSF
+    utils.invalidate_repo_cache(node_addon.user, node_addon.repo)
+
     for commit in payload.get('commits', []):
 
         # TODO: Look up OSF user by commit
@@ -23,6 +23,8 @@ from website.addons.googledrive.utils import GoogleDriveNodeLogger
 
 
 class GoogleDriveGuidFile(GuidFile):
+    immutable_revisions = True
+
     __indices__ = [
         {
             'key_or_list': [
@@ -326,7 +328,7 @@ class GoogleDriveNodeSettings(AddonNodeSettingsBase):
         # cleaned_path = clean_path(metadata['path'])
         url = self.owner.web_url_for('addon_view_or_download_file', path=metadata['path'], provider='googledrive')
 
-        self.owner.add_log(
+        self.owner.add_file_log(
             'googledrive_{0}'.format(action),
             auth=auth,
             params={
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import time
+import itertools
 
 import mendeley
 from modularodm import fields
@@ -10,8 +11,10 @@ from website.addons.base import AddonOAuthUserSettingsBase
 from website.addons.citations.utils import serialize_folder
 from website.addons.mendeley import serializer
 from website.addons.mendeley import settings
+from website.addons.mendeley.provider import MendeleyCitationsProvider
 from website.addons.mendeley.api import APISession
 from website.oauth.models import ExternalProvider
+from website.util import transport
 from website.util import web_url_for
 
 
@@ -49,7 +52,7 @@ class Mendeley(ExternalProvider):
                                          service_name='mendeley',
                                          _absolute=True),
             )
-            self._client = APISession(partial, credentials)
+            self._client = transport.mount(APISession(partial, credentials), 'mendeley')
 
         return self._client
 
@@ -88,9 +91,12 @@ class Mendeley(ExternalProvider):
         ]
         return [all_documents] + serialized_folders
 
-    def get_list(self, list_id='ROOT'):
+    def get_list(self, list_id='ROOT', offset=0, limit=None):
         """Get a single CitationList
         :param str list_id: ID for a Mendeley folder. Optional.
+        :param int offset: Number of citations to skip
+        :param int limit: Maximum number of citations to return; all remaining
+            citations if `None`
         :return CitationList: CitationList for the folder, or for all documents
         """
         if list_id == 'ROOT':
@@ -98,29 +104,52 @@ class Mendeley(ExternalProvider):
         else:
             folder = self.client.folders.get(list_id)
 
+        stop = offset + limit if limit is not None else None
         if folder:
-            return self._citations_for_mendeley_folder(folder)
-        return self._citations_for_mendeley_user()
+            return self._citations_for_mendeley_folder(folder, offset, stop)
+        return self._citations_for_mendeley_user(offset, stop)
 
     def _folder_metadata(self, folder_id):
         folder = self.client.folders.get(folder_id)
         return folder
 
-    def _citations_for_mendeley_folder(self, folder):
+    def _page_size(self, stop):
+        # Request no more documents than needed for short pages
+        return min(500, stop) if stop else 500
 
-        document_ids = [
+    def _citations_for_mendeley_folder(self, folder, start=0, stop=None):
+
+        # Folder listings only include document IDs. Read the library in
+        # large pages and keep the documents on this page, rather than
+        # requesting each document by ID
+        ids = [
             document.id
-            for document in folder.documents.iter(page_size=500)
+            for document in itertools.islice(
+                folder.documents.iter(page_size=self._page_size(stop)),
+                start, stop,
+            )
+        ]
+        documents = {}
+        wanted = set(ids)
+        if wanted:
+            for document in self.client.documents.iter(page_size=self._page_size(None)):
+                if document.id in wanted:
+                    documents[document.id] = document
+                    if len(documents) == len(wanted):
+                        break
+        return [
+            self._citation_for_mendeley_document(
+                documents.get(document_id) or self.client.documents.get(document_id)
+            )
+            for document_id in ids
         ]
-        citations = {
-            citation['id']: citation
-            for citation in self._citations_for_mendeley_user()
-        }
-        return map(lambda id: citations[id], document_ids)
 
-    def _citations_for_mendeley_user(self):
+    def _citations_for_mendeley_user(self, start=0, stop=None):
 
-        documents = self.client.documents.iter(page_size=500)
+        documents = itertools.islice(
+            self.client.documents.iter(page_size=self._page_size(stop)),
+            start, stop,
+        )
         return [
             self._citation_for_mendeley_document(document)
             for document in documents
@@ -177,6 +206,11 @@ class MendeleyUserSettings(AddonOAuthUserSettingsBase):
     oauth_provider = Mendeley
     serializer = serializer.MendeleySerializer
 
+    def revoke_oauth_access(self, external_account):
+        super(MendeleyUserSettings, self).revoke_oauth_access(external_account)
+        if external_account.provider == self.oauth_provider.short_name:
+            MendeleyCitationsProvider().clear_folder_cache(external_account)
+
 
 class MendeleyNodeSettings(AddonOAuthNodeSettingsBase):
     oauth_provider = Mendeley
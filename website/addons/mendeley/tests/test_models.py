@@ -79,6 +79,26 @@ class MendeleyProviderTestCase(OsfTestCase):
         assert_equal(res[1]['name'], mock_folders[0].name)
         assert_equal(res[1]['id'], mock_folders[0].json['id'])
 
+    def test_folder_documents_read_from_library(self):
+        mock_client = mock.Mock()
+        library = [
+            mock.Mock(id=each, json={'id': each, 'type': 'book'}, title=each, year=None)
+            for each in ['a', 'b', 'c', 'd']
+        ]
+        mock_client.documents.iter.return_value = iter(library)
+        mock_client.documents.get.side_effect = lambda document_id: mock.Mock(
+            id=document_id, json={'id': document_id, 'type': 'book'}, title=document_id, year=None,
+        )
+        folder = mock.Mock()
+        folder.documents.iter.return_value = iter(
+            [mock.Mock(id=each) for each in ['d', 'b', 'z']]
+        )
+        self.provider._client = mock_client
+        res = self.provider._citations_for_mendeley_folder(folder)
+        assert_equal([each['id'] for each in res], ['d', 'b', 'z'])
+        # Only documents missing from the library are requested by ID
+        mock_client.documents.get.assert_called_once_with('z')
+
 class MendeleyNodeSettingsTestCase(OsfTestCase):
 
     def setUp(self):
@@ -160,6 +160,20 @@ class MendeleyViewsTestCase(OsfTestCase):
         assert_is_none(self.node_addon.user_settings)
         assert_is_none(self.node_addon.external_account)
 
+    @mock.patch('website.addons.citations.provider.CitationsProvider.clear_folder_cache')
+    def test_remove_user_auth_clears_folder_cache(self, mock_clear):
+        self.node_addon.set_auth(self.account, self.user)
+
+        self.app.delete_json(
+            self.project.api_url_for('mendeley_remove_user_auth'),
+            {
+                'external_account_id': self.account._id,
+            },
+            auth=self.user.auth,
+        )
+
+        mock_clear.assert_called_once_with(self.account)
+
     @mock.patch('website.addons.mendeley.model.Mendeley._folder_metadata')
     def test_set_config_owner(self, mock_metadata):
         mock_metadata.return_value = MockFolder(name='Fake Folder')
@@ -308,3 +322,34 @@ class MendeleyViewsTestCase(OsfTestCase):
             expect_errors=True
         )
         assert_equal(res.status_code, 403)
+
+    @httpretty.activate
+    @mock.patch('website.addons.citations.provider.settings.CITATION_PAGE_SIZE', 3)
+    def test_mendeley_citation_list_paginated(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            urlparse.urljoin(API_URL, 'folders'),
+            body=mock_responses['folders'],
+            content_type='application/json'
+        )
+
+        httpretty.register_uri(
+            httpretty.GET,
+            urlparse.urljoin(API_URL, 'documents'),
+            body=mock_responses['documents'],
+            content_type='application/json'
+        )
+
+        res = self.app.get(
+            self.project.api_url_for('mendeley_citation_list', mendeley_list_id='ROOT'),
+            auth=self.user.auth
+        )
+        children = res.json['contents']
+        assert_equal(len(children), 5)
+        assert_equal([each['kind'] for each in children[1:4]], ['file'] * 3)
+        assert_in('page=2', children[4]['urls']['fetch'])
+
+        res = self.app.get(children[4]['urls']['fetch'], auth=self.user.auth)
+        children = res.json['contents']
+        assert_equal([each['kind'] for each in children], ['file'] * 3)
@@ -22,12 +22,16 @@ class OsfStorageNodeLogger(object):
         self.path = path
 
     def log(self, action, extra=None, save=False):
-        """Log an event. Wraps the Node#add_log method, automatically adding
-        relevant parameters and prefixing log events with `"osf_storage_"`.
+        """Log an event, automatically adding relevant parameters and prefixing
+        log events with `"osf_storage_"`. File-related events go through
+        Node#add_file_log, which may merge them into the previous log; other
+        events go through Node#add_log.
 
         :param str action: Log action. Should be a class constant from NodeLog.
         :param dict extra: Extra parameters to add to the ``params`` dict of the
             new NodeLog.
+        :param bool save: Save the node afterwards, whether or not the event
+            was merged into an existing log
         """
         params = {
             'project': self.node.parent_id,
@@ -42,10 +46,14 @@ class OsfStorageNodeLogger(object):
         if extra:
             params.update(extra)
         # Prefix the action with osf_storage_
-        self.node.add_log(
-            action='osf_storage_{0}'.format(action),
-            params=params,
-            auth=self.auth,
-        )
+        action = 'osf_storage_{0}'.format(action)
+        if self.path:
+            self.node.add_file_log(action, params=params, auth=self.auth)
+        else:
+            self.node.add_log(
+                action=action,
+                params=params,
+                auth=self.auth,
+            )
         if save:
             self.node.save()
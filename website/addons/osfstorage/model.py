@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 import os
 import bson
 import logging
+import collections
 
 import furl
 
@@ -13,7 +14,7 @@ from dateutil.parser import parse as parse_date
 
 from framework.auth import Auth
 from framework.mongo import StoredObject
-from framework.mongo.utils import unique_on
+from framework.mongo.utils import unique_on, bulk_insert
 from framework.analytics import get_basic_counters
 
 from website.models import NodeLog
@@ -32,13 +33,38 @@ oid_primary_key = fields.StringField(
 )
 
 
-def copy_file_tree(tree, node_settings):
+def snapshot_file_tree(tree):
+    """Recursively capture the contents of a file tree.
+
+    :param OsfStorageFileTree tree: Tree to capture
+    :return: Dict mapping the IDs of trees to `None` and the IDs of records to
+        dicts of their version count and deletion status
+    """
+    snapshot = {tree._id: None}
+    for child in tree.children:
+        if isinstance(child, OsfStorageFileTree):
+            snapshot.update(snapshot_file_tree(child))
+        else:
+            snapshot[child._id] = {
+                'versions': len(child.versions),
+                'is_deleted': child.is_deleted,
+            }
+    return snapshot
+
+
+def copy_file_tree(tree, node_settings, snapshot=None):
     """Recursively copy file tree.
 
     :param OsfStorageFileTree tree: Tree to copy
     :param node_settings: Root node settings record
+    :param dict snapshot: Optional result of `snapshot_file_tree`; files and
+        versions added since the snapshot was taken are not copied
     """
-    children = [copy_files(child, node_settings) for child in tree.children]
+    children = [
+        copy_files(child, node_settings, snapshot)
+        for child in tree.children
+        if snapshot is None or child._id in snapshot
+    ]
     clone = tree.clone()
     clone.children = children
     clone.node_settings = node_settings
@@ -46,25 +72,31 @@ def copy_file_tree(tree, node_settings):
     return clone
 
 
-def copy_file_record(record, node_settings):
+def copy_file_record(record, node_settings, snapshot=None):
     """Copy versions of an `OsfStorageFileRecord`. Versions are copied
     by primary key and will not be duplicated in the database.
 
     :param OsfStorageFileRecord record: Record to copy
     :param node_settings: Root node settings record
+    :param dict snapshot: Optional result of `snapshot_file_tree`
     """
     clone = record.clone()
-    clone.versions = record.versions
+    if snapshot is None:
+        clone.versions = record.versions
+    else:
+        state = snapshot[record._id]
+        clone.versions = record.versions[:state['versions']]
+        clone.is_deleted = state['is_deleted']
     clone.node_settings = node_settings
     clone.save()
     return clone
 
 
-def copy_files(files, node_settings):
+def copy_files(files, node_settings, snapshot=None):
     if isinstance(files, OsfStorageFileTree):
-        return copy_file_tree(files, node_settings)
+        return copy_file_tree(files, node_settings, snapshot)
     if isinstance(files, OsfStorageFileRecord):
-        return copy_file_record(files, node_settings)
+        return copy_file_record(files, node_settings, snapshot)
     raise TypeError('Input must be `OsfStorageFileTree` or `OsfStorageFileRecord`')
 
 
@@ -98,17 +130,23 @@ class OsfStorageNodeSettings(AddonNodeSettingsBase):
     def find_or_create_file_guid(self, path):
         return OsfStorageGuidFile.get_or_create(node=self.owner, path=path.lstrip('/'))
 
-    def copy_contents_to(self, dest):
+    def copy_contents_to(self, dest, snapshot=None):
         """Copy file tree and contents to destination. Note: destination must be
         saved before copying so that copied items can refer to it.
 
         :param OsfStorageNodeSettings dest: Destination settings object
+        :param dict snapshot: Optional result of `snapshot_file_tree`
         """
         dest.save()
         if self.file_tree:
-            dest.file_tree = copy_file_tree(self.file_tree, dest)
+            dest.file_tree = copy_file_tree(self.file_tree, dest, snapshot)
             dest.save()
 
+    def snapshot(self):
+        if self.file_tree:
+            return snapshot_file_tree(self.file_tree)
+        return None
+
     def after_fork(self, node, fork, user, save=True):
         clone, message = super(OsfStorageNodeSettings, self).after_fork(
             node=node, fork=fork, user=user, save=False
@@ -116,10 +154,10 @@ class OsfStorageNodeSettings(AddonNodeSettingsBase):
         self.copy_contents_to(clone)
         return clone, message
 
-    def after_register(self, node, registration, user, save=True):
+    def after_register(self, node, registration, user, save=True, snapshot=None):
         clone = self.clone()
         clone.owner = registration
-        self.copy_contents_to(clone)
+        self.copy_contents_to(clone, snapshot)
         if save:
             clone.save()
         return clone, None
@@ -230,6 +268,75 @@ class BaseFileObject(StoredObject):
 
         return obj, True
 
+    @classmethod
+    def get_or_create_many(cls, paths, node_settings):
+        """Get or create many records by path and root settings record. Unlike
+        calling `get_or_create` per path, existing records are fetched in one
+        query, each intermediate folder is resolved once, and new children are
+        appended to each parent folder in a single update.
+
+        :param list paths: Paths to files or directories
+        :param node_settings: Root node settings record
+        :returns: Dict mapping each stripped path to a tuple of (record, created)
+        """
+        paths = [path.rstrip('/') for path in paths]
+        existing = dict(
+            (obj.path, obj)
+            for obj in cls.find(
+                Q('path', 'in', list(set(paths))) &
+                Q('node_settings', 'eq', node_settings._id)
+            )
+        )
+
+        ret = {}
+        new = []
+        for path in paths:
+            if path in ret:
+                continue
+            if path in existing:
+                ret[path] = (existing[path], False)
+            else:
+                obj = cls(path=path, node_settings=node_settings)
+                ret[path] = (obj, True)
+                new.append(obj)
+
+        # Insert new records at once; records created concurrently by other
+        # requests are skipped and fetched instead
+        inserted = bulk_insert(new)
+        lost = [each.path for each in new if each._id not in inserted]
+        if lost:
+            for obj in cls.find(
+                    Q('path', 'in', lost) &
+                    Q('node_settings', 'eq', node_settings._id)):
+                ret[obj.path] = (obj, False)
+
+        new_children = collections.defaultdict(list)
+        for obj in new:
+            if obj._id not in inserted:
+                continue
+            if obj.path:
+                parent_path, _ = os.path.split(obj.path)
+                new_children[parent_path].append(obj)
+            else:
+                node_settings.file_tree = obj
+                node_settings.save()
+
+        # Ensure all intermediate paths
+        if new_children:
+            parent_class = cls.parent_class()
+            parents = parent_class.get_or_create_many(new_children.keys(), node_settings)
+            for parent_path, children in new_children.iteritems():
+                parent_obj, _ = parents[parent_path]
+                parent_obj.append_children(children)
+
+        return ret
+
+    def get_download_count_page(self, version=None):
+        """Return analytics page key for download counts or `None` if this is
+        not a file object (e.g. a folder).
+        """
+        return None
+
     def get_download_count(self, version=None):
         """Return download count or `None` if this is not a file object (e.g. a
         folder).
@@ -258,10 +365,19 @@ class OsfStorageFileTree(BaseFileObject):
         concurrent requests can overwrite previously added items; use the native
         `addToSet` operation instead.
         """
+        self.append_children([child])
+
+    def append_children(self, children):
+        """Append many children with a single `addToSet` update.
+
+        :param list children: File objects to append
+        """
         collection = self._storage[0].store
         collection.update(
             {'_id': self._id},
-            {'$addToSet': {'children': (child._id, child._name)}}
+            {'$addToSet': {'children': {
+                '$each': [(child._id, child._name) for child in children],
+            }}}
         )
         # Updating MongoDB directly means the cache is wrong; reload manually
         self.reload()
@@ -293,13 +409,18 @@ class OsfStorageFileRecord(BaseFileObject):
         more = stop > 0
         return indices, versions, more
 
-    def create_version(self, creator, location, metadata=None):
+    def create_version(self, creator, location, metadata=None, log=True):
+        """Add a version unless it duplicates the latest one.
+
+        :param bool log: Add a log to the node; batch uploads set this to
+            `False` and log once for all files
+        """
         latest_version = self.get_version()
         version = OsfStorageFileVersion(creator=creator, location=location)
 
         if latest_version and latest_version.is_duplicate(version):
             if self.is_deleted:
-                self.undelete(Auth(creator))
+                self.undelete(Auth(creator), log=log)
             return latest_version
 
         if metadata:
@@ -309,12 +430,55 @@ class OsfStorageFileRecord(BaseFileObject):
         self.versions.append(version)
         self.is_deleted = False
         self.save()
-        self.log(
-            Auth(creator),
-            NodeLog.FILE_UPDATED if len(self.versions) > 1 else NodeLog.FILE_ADDED,
-        )
+        if log:
+            self.log(
+                Auth(creator),
+                NodeLog.FILE_UPDATED if len(self.versions) > 1 else NodeLog.FILE_ADDED,
+            )
         return version
 
+    @classmethod
+    def create_versions(cls, creator, uploads):
+        """Add versions to many records, as `create_version` does without
+        logging, with one insert of all new versions and one update per record.
+
+        :param User creator: Uploader of all versions
+        :param list uploads: Tuples of (record, location, metadata)
+        :return: List of tuples of (version, added) in the order of `uploads`;
+            `added` is whether the upload added or restored a file
+        """
+        ret = []
+        latest = {}
+        pending = collections.OrderedDict()
+        for record, location, metadata in uploads:
+            version = OsfStorageFileVersion(creator=creator, location=location)
+            latest_version = latest.get(record._id) or record.get_version()
+            if latest_version and latest_version.is_duplicate(version):
+                added = record.is_deleted and record._id not in pending
+                if added:
+                    record.undelete(Auth(creator), log=False)
+                ret.append((latest_version, added))
+                continue
+            if metadata:
+                version.update_metadata(metadata, save=False)
+            latest[record._id] = version
+            pending.setdefault(record._id, []).append(version)
+            ret.append((version, True))
+
+        bulk_insert([each for versions in pending.values() for each in versions])
+        collection = cls._storage[0].store
+        for record_id, versions in pending.iteritems():
+            collection.update(
+                {'_id': record_id},
+                {
+                    '$push': {'versions': {'$each': [each._id for each in versions]}},
+                    '$set': {'is_deleted': False},
+                },
+            )
+            # Updating MongoDB directly means the cache is wrong
+            cls._clear_caches(record_id)
+        return ret
+
     def update_version_metadata(self, location, metadata):
         for version in reversed(self.versions):
             if version.location == location:
@@ -347,15 +511,20 @@ class OsfStorageFileRecord(BaseFileObject):
         if log:
             self.log(auth, NodeLog.FILE_ADDED)
 
-    def get_download_count(self, version=None):
+    def get_download_count_page(self, version=None):
         """
         :param int version: Optional one-based version index
         """
         parts = ['download', self.node._id, self.path]
         if version is not None:
             parts.append(version)
-        page = ':'.join([format(part) for part in parts])
-        _, count = get_basic_counters(page)
+        return ':'.join([format(part) for part in parts])
+
+    def get_download_count(self, version=None):
+        """
+        :param int version: Optional one-based version index
+        """
+        _, count = get_basic_counters(self.get_download_count_page(version))
         return count or 0
 
 
@@ -407,7 +576,7 @@ class OsfStorageFileVersion(StoredObject):
     def is_duplicate(self, other):
         return self.location_hash == other.location_hash
 
-    def update_metadata(self, metadata):
+    def update_metadata(self, metadata, save=True):
         self.metadata.update(metadata)
         self.content_type = self.metadata.get('contentType', None)
         try:
@@ -415,11 +584,14 @@ class OsfStorageFileVersion(StoredObject):
             self.date_modified = parse_date(self.metadata['modified'], ignoretz=True)
         except KeyError as err:
             raise errors.MissingFieldError(str(err))
-        self.save()
+        if save:
+            self.save()
 
 
 @unique_on(['node', 'path', '_path', 'premigration_path'])
 class OsfStorageGuidFile(GuidFile):
+    immutable_revisions = True
+
     _path = fields.StringField(index=True)
     premigration_path = fields.StringField(index=True)
     path = fields.StringField(required=True, index=True)
@@ -509,13 +681,18 @@ class OsfStorageFileNode(StoredObject):
     def path(self):
         return '/{}{}'.format(self._id, '/' if self.kind == 'folder' else '')
 
-    def get_download_count(self, version=None):
+    def get_download_count_page(self, version=None):
         """
         :param int version: Optional one-based version index
         """
         parts = ['download', self.node_settings.owner._id, self._id]
         if version is not None:
             parts.append(version)
-        page = ':'.join([format(part) for part in parts])
-        _, count = get_basic_counters(page)
+        return ':'.join([format(part) for part in parts])
+
+    def get_download_count(self, version=None):
+        """
+        :param int version: Optional one-based version index
+        """
+        _, count = get_basic_counters(self.get_download_count_page(version))
         return count or 0
@@ -71,6 +71,16 @@ api_routes = {
             views.osf_storage_upload_file_hook,
             json_renderer,
         ),
+
+        Rule(
+            [
+                '/project/<pid>/osfstorage/hooks/crud/batch/',
+                '/project/<pid>/node/<nid>/osfstorage/hooks/crud/batch/',
+            ],
+            'post',
+            views.osf_storage_upload_files_hook,
+            json_renderer,
+        ),
     ],
 
 }
@@ -7,6 +7,9 @@ from website import settings
 
 REVISIONS_PAGE_SIZE = 10
 
+# Maximum number of files accepted by the batch upload hook
+MAX_UPLOAD_BATCH_SIZE = 1000
+
 WATERBUTLER_CREDENTIALS = {
     'storage': {}
 }
@@ -10,6 +10,11 @@ updated file
 <a class="log-node-title-link overflow" data-bind="attr: {href: nodeUrl}">{{ nodeTitle }}</a>
 </script>
 
+<script type="text/html" id="osf_storage_files_added">
+added {{ params.paths.length }} files in {{ nodeType }}
+<a class="log-node-title-link overflow" data-bind="attr: {href: nodeUrl}">{{ nodeTitle }}</a>
+</script>
+
 <script type="text/html" id="osf_storage_file_removed">
 removed file <span class="overflow">{{ params.path }}</span> in {{ nodeType }}
 <a class="log-node-title-link overflow" data-bind="attr: {href: nodeUrl}">{{ nodeTitle }}</a>
@@ -36,7 +36,7 @@ class TestFileGuid(OsfTestCase):
         assert_equals(guid.path, 'baz/foo/bar')
         assert_equals(guid.waterbutler_path, '/baz/foo/bar')
 
-    @mock.patch('website.addons.base.requests.get')
+    @mock.patch('website.util.transport.requests.Session.get')
     def test_unique_identifier(self, mock_get):
         mock_response = mock.Mock(ok=True, status_code=200)
         mock_get.return_value = mock_response
@@ -114,6 +114,27 @@ class TestNodeSettingsModel(StorageTestCase):
         assert_equal(cloned_record.versions, record.versions)
         assert_true(registration_node_settings.file_tree)
 
+    def test_after_register_copies_snapshot(self):
+        path = 'jazz/dreamers-ball.mp3'
+        record, _ = model.OsfStorageFileRecord.get_or_create(path, self.node_settings)
+        record.versions.append(factories.FileVersionFactory())
+        record.save()
+        job = self.project.snapshot_registration(None, self.auth_obj, '', {})
+
+        # Changes made after the snapshot are not registered
+        record.versions.append(factories.FileVersionFactory())
+        record.save()
+        model.OsfStorageFileRecord.get_or_create('jazz/bird.mp3', self.node_settings)
+        job.run()
+
+        registration_node_settings = job.registration.get_addon('osfstorage')
+        registration_node_settings.reload()
+        cloned_record = model.OsfStorageFileRecord.find_by_path(path, registration_node_settings)
+        assert_equal(cloned_record.versions, record.versions[:1])
+        assert_is_none(
+            model.OsfStorageFileRecord.find_by_path('jazz/bird.mp3', registration_node_settings)
+        )
+
 
 class TestOsfStorageFileTree(OsfTestCase):
 
@@ -175,6 +196,25 @@ class TestOsfStorageFileTree(OsfTestCase):
         assert_equal(num_trees, model.OsfStorageFileTree.find().count())
         assert_equal(num_records, model.OsfStorageFileRecord.find().count())
 
+    def test_get_or_create_many_creates_shared_folders_once(self):
+        paths = ['queen/killer', 'queen/bicycle', 'queen/live/wembley']
+        results = model.OsfStorageFileTree.get_or_create_many(paths, self.node_settings)
+        assert_equal(set(results.keys()), set(paths))
+        queen = model.OsfStorageFileTree.find_by_path('queen', self.node_settings)
+        assert_equal(
+            set(child.path for child in queen.children),
+            set(['queen/killer', 'queen/bicycle', 'queen/live']),
+        )
+        assert_equal(
+            self.node_settings.file_tree,
+            model.OsfStorageFileTree.find_by_path('', self.node_settings),
+        )
+
+    def test_get_or_create_many_finds_existing(self):
+        results = model.OsfStorageFileTree.get_or_create_many([self.path, 'new'], self.node_settings)
+        assert_equal(results[self.path], (self.tree, False))
+        assert_true(results['new'][1])
+
 
 class TestOsfStorageFileRecord(StorageTestCase):
 
@@ -3,6 +3,8 @@
 
 from nose.tools import *  # noqa
 
+import mock
+
 from tests.factories import AuthUserFactory
 
 import furl
@@ -10,11 +12,12 @@ import furl
 from framework import sessions
 from framework.flask import request
 
-from website.models import Session
+from website.models import Session, NodeLog
 from website.addons.osfstorage.tests import factories
 from website.addons.osfstorage import model
 from website.addons.osfstorage import views
 from website.addons.osfstorage import utils
+from website.addons.osfstorage import logs
 
 from website.addons.osfstorage.tests.utils import (
     StorageTestCase, Delta, AssertDeltas
@@ -57,6 +60,23 @@ class TestHGridUtils(StorageTestCase):
         assert_equal(serialized['ext'], '.mp3')
         assert_equal(serialized['kind'], 'file')
 
+    def test_serialize_metadata_file_with_download_counts(self):
+        file_record = model.OsfStorageFileRecord(
+            path='magic.mp3',
+            node_settings=self.project.get_addon('osfstorage'),
+        )
+        page = file_record.get_download_count_page()
+        serialized = utils.serialize_metadata_hgrid(
+            file_record,
+            self.project,
+            download_counts={page: 42},
+        )
+        assert_equal(serialized['downloads'], 42)
+
+    def test_get_download_counts_ignores_folders(self):
+        counts = utils.get_download_counts([None, 'download:abcde:missing.txt'])
+        assert_equal(counts, {'download:abcde:missing.txt': 0})
+
     def test_get_item_kind_folder(self):
         assert_equal(
             utils.get_item_kind(model.OsfStorageFileTree()),
@@ -187,3 +207,19 @@ class TestSerializeRevision(StorageTestCase):
         )
         assert_equal(expected, observed)
 
+
+
+class TestNodeLogger(StorageTestCase):
+
+    def test_merged_file_log_saves_node(self):
+        node_logger = logs.OsfStorageNodeLogger(
+            node=self.project,
+            auth=self.auth_obj,
+            path='pizza',
+        )
+        node_logger.log(NodeLog.FILE_ADDED, save=True)
+        nlogs = len(self.project.logs)
+        with mock.patch.object(self.project, 'save') as mock_save:
+            node_logger.log(NodeLog.FILE_ADDED, save=True)
+        assert_equal(len(self.project.logs), nlogs)
+        assert_true(mock_save.called)
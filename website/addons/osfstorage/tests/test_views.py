@@ -174,6 +174,101 @@ class TestUploadFileHook(HookTestCase):
     #     pass
 
 
+class TestUploadFilesHook(HookTestCase):
+
+    def setUp(self):
+        super(TestUploadFilesHook, self).setUp()
+        self.auth = make_auth(self.user)
+
+    def make_file_payload(self, path):
+        return {
+            'path': path,
+            'hashes': {},
+            'worker': '',
+            'settings': {storage_settings.WATERBUTLER_RESOURCE: 'osf'},
+            'metadata': {
+                'provider': 'osfstorage',
+                'service': 'cloud',
+                'name': path,
+                'size': 123,
+                'modified': 'Mon, 16 Feb 2015 18:45:34 GMT'
+            },
+        }
+
+    def send_batch_hook(self, paths, **kwargs):
+        payload = {
+            'auth': self.auth,
+            'files': [self.make_file_payload(path) for path in paths],
+        }
+        return self.send_hook(
+            'osf_storage_upload_files_hook',
+            payload=payload,
+            method='post_json',
+            **kwargs
+        )
+
+    def test_upload_batch_creates_records_and_folders(self):
+        paths = ['batch/one.txt', 'batch/nested/two.txt']
+        res = self.send_batch_hook(paths)
+        assert_equal(res.status_code, 201)
+        assert_equal([item['path'] for item in res.json['files']], paths)
+        for path in paths:
+            record = model.OsfStorageFileRecord.find_by_path(path, self.node_settings)
+            assert_equal(len(record.versions), 1)
+        assert_true(model.OsfStorageFileTree.find_by_path('batch/nested', self.node_settings))
+
+    def test_upload_batch_logs_once(self):
+        with AssertDeltas(Delta(lambda: len(self.project.logs), lambda value: value + 1)):
+            self.send_batch_hook(['batch/one.txt', 'batch/two.txt', 'batch/three.txt'])
+            self.project.reload()
+        log = self.project.logs[-1]
+        assert_equal(log.action, 'osf_storage_files_added')
+        assert_equal(len(log.params['paths']), 3)
+
+    def test_upload_batch_inserts_records_and_versions_in_bulk(self):
+        paths = ['batch/one.txt', 'batch/two.txt', 'batch/nested/three.txt']
+        with mock.patch.object(model.OsfStorageFileRecord, 'save') as mock_record_save:
+            with mock.patch.object(model.OsfStorageFileVersion, 'save') as mock_version_save:
+                res = self.send_batch_hook(paths)
+        assert_equal(res.status_code, 201)
+        assert_false(mock_record_save.called)
+        assert_false(mock_version_save.called)
+        for item in res.json['files']:
+            record = model.OsfStorageFileRecord.find_by_path(item['path'], self.node_settings)
+            assert_equal([version._id for version in record.versions], [item['version']])
+
+    def test_upload_batch_appends_to_existing_record(self):
+        self.send_batch_hook(['batch/one.txt'])
+        payload = self.make_file_payload('batch/one.txt')
+        payload['metadata']['name'] = 'batch/one-v2.txt'
+        res = self.send_hook(
+            'osf_storage_upload_files_hook',
+            payload={'auth': self.auth, 'files': [payload]},
+            method='post_json',
+        )
+        assert_false(res.json['files'][0]['created'])
+        record = model.OsfStorageFileRecord.find_by_path('batch/one.txt', self.node_settings)
+        assert_equal(len(record.versions), 2)
+        assert_equal(record.versions[-1]._id, res.json['files'][0]['version'])
+
+    def test_upload_batch_skips_duplicate_version(self):
+        self.send_batch_hook(['batch/one.txt'])
+        with AssertDeltas(Delta(lambda: len(self.project.logs))):
+            self.send_batch_hook(['batch/one.txt'])
+            self.project.reload()
+        record = model.OsfStorageFileRecord.find_by_path('batch/one.txt', self.node_settings)
+        assert_equal(len(record.versions), 1)
+
+    def test_upload_batch_requires_files(self):
+        res = self.send_hook(
+            'osf_storage_upload_files_hook',
+            payload={'auth': self.auth, 'files': []},
+            method='post_json',
+            expect_errors=True,
+        )
+        assert_equal(res.status_code, 400)
+
+
 class TestUpdateMetadataHook(HookTestCase):
 
     def setUp(self):
@@ -10,6 +10,7 @@ from modularodm import Q
 from flask import request
 
 from framework.exceptions import HTTPError
+from framework.analytics import get_basic_counters_many
 
 from website import settings as site_settings
 
@@ -41,20 +42,39 @@ def get_item_kind(item):
     raise TypeError('Value must be instance of `FileTree` or `FileRecord`')
 
 
-def serialize_metadata_hgrid(item, node):
+def get_download_counts(pages):
+    """Fetch download counts for many analytics pages in a single query.
+
+    :param list pages: Page keys from `get_download_count_page`; `None` values
+        (e.g. folders) are ignored
+    :return: Dict mapping each page to its download count
+    """
+    counters = get_basic_counters_many([page for page in pages if page is not None])
+    return dict(
+        (page, total or 0)
+        for page, (_, total) in counters.items()
+    )
+
+
+def serialize_metadata_hgrid(item, node, download_counts=None):
     """Build HGrid JSON for folder or file. Note: include node URLs for client-
     side URL creation for uploaded files.
 
     :param item: `FileTree` or `FileRecord` to serialize
     :param Node node: Root node to which the item is attached
-    :param dict permissions: Permissions data from `get_permissions`
+    :param dict download_counts: Optional counts from `get_download_counts`;
+        if not provided, the count is fetched for this item alone
     """
+    if download_counts is None:
+        downloads = item.get_download_count()
+    else:
+        downloads = download_counts.get(item.get_download_count_page())
     ret = {
         'path': item.path,
         'name': item.name,
         'ext': item.extension,
         rubeus.KIND: get_item_kind(item),
-        'downloads': item.get_download_count(),
+        'downloads': downloads,
     }
 
     if isinstance(item, model.OsfStorageFileRecord):
@@ -63,13 +83,14 @@ def serialize_metadata_hgrid(item, node):
     return ret
 
 
-def serialize_revision(node, record, version, index, anon=False):
+def serialize_revision(node, record, version, index, anon=False, download_counts=None):
     """Serialize revision for use in revisions table.
 
     :param Node node: Root node
     :param FileRecord record: Root file record
     :param FileVersion version: The version to serialize
     :param int index: One-based index of version
+    :param dict download_counts: Optional counts from `get_download_counts`
     """
 
     if anon:
@@ -84,7 +105,11 @@ def serialize_revision(node, record, version, index, anon=False):
         'user': user,
         'index': index,
         'date': version.date_created.isoformat(),
-        'downloads': record.get_download_count(version=index),
+        'downloads': (
+            record.get_download_count(version=index)
+            if download_counts is None
+            else download_counts.get(record.get_download_count_page(version=index), 0)
+        ),
     }
 
 
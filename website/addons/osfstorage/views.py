@@ -4,7 +4,6 @@ import os
 import httplib
 import logging
 
-import requests
 from flask import request, make_response
 
 from framework.auth import Auth
@@ -14,14 +13,16 @@ from framework.analytics import update_counter
 from framework.auth.decorators import must_be_signed
 from framework.transactions.handlers import no_auto_transaction
 
-from website.models import User
+from website.models import User, NodeLog
 from website.project.decorators import (
     must_be_contributor_or_public,
     must_not_be_registration, must_have_addon,
 )
 from website.util import rubeus
+from website.util import transport
 from website.project.model import has_anonymous_link
 
+from website.addons.osfstorage import logs
 from website.addons.osfstorage import model
 from website.addons.osfstorage import utils
 from website.addons.osfstorage import errors
@@ -70,18 +71,36 @@ def osf_storage_download_file_hook(node_addon, payload, **kwargs):
     }
 
 
-def osf_storage_crud_prepare(node_addon, payload):
+def get_upload_user(payload):
     try:
         auth = payload['auth']
+    except KeyError:
+        raise HTTPError(httplib.BAD_REQUEST)
+    user = User.load(auth.get('id'))
+    if user is None:
+        raise HTTPError(httplib.BAD_REQUEST)
+    return user
+
+
+def osf_storage_crud_prepare(node_addon, payload):
+    user = get_upload_user(payload)
+    path, location, metadata = osf_storage_upload_prepare(payload)
+    return path, user, location, metadata
+
+
+def osf_storage_upload_prepare(payload):
+    """Build path, location, and metadata for a single uploaded file.
+
+    :param dict payload: Upload data from WaterButler
+    :return: Tuple of (path, location, metadata)
+    """
+    try:
         settings = payload['settings']
         metadata = payload['metadata']
         hashes = payload['hashes']
         worker = payload['worker']
         path = payload['path'].strip('/')
-    except KeyError:
-        raise HTTPError(httplib.BAD_REQUEST)
-    user = User.load(auth.get('id'))
-    if user is None:
+    except (KeyError, AttributeError):
         raise HTTPError(httplib.BAD_REQUEST)
     location = settings
     location.update({
@@ -91,7 +110,7 @@ def osf_storage_crud_prepare(node_addon, payload):
     # TODO: Migrate existing worker host and URL
     location.update(worker)
     metadata.update(hashes)
-    return path, user, location, metadata
+    return path, location, metadata
 
 
 @must_be_signed
@@ -116,6 +135,72 @@ def osf_storage_upload_file_hook(node_addon, payload, **kwargs):
     }, code
 
 
+@must_be_signed
+@no_auto_transaction
+@must_have_addon('osfstorage', 'node')
+def osf_storage_upload_files_hook(node_addon, payload, **kwargs):
+    """Record metadata for many uploaded files (e.g. a folder upload) in one
+    request. Intermediate folders are created once and a single log is added
+    for the whole batch.
+    """
+    if osf_storage_settings.DISK_SAVING_MODE:
+        raise HTTPError(httplib.METHOD_NOT_ALLOWED)
+
+    user = get_upload_user(payload)
+    files = payload.get('files')
+    if not files or not isinstance(files, list):
+        raise HTTPError(httplib.BAD_REQUEST)
+    if len(files) > osf_storage_settings.MAX_UPLOAD_BATCH_SIZE:
+        raise make_error(httplib.BAD_REQUEST, 'Too many files')
+
+    prepared = [osf_storage_upload_prepare(item) for item in files]
+    records = model.OsfStorageFileRecord.get_or_create_many(
+        [path for path, _, _ in prepared],
+        node_addon,
+    )
+
+    versions = model.OsfStorageFileRecord.create_versions(
+        user,
+        [(records[path][0], location, metadata) for path, location, metadata in prepared],
+    )
+
+    results = []
+    added = []
+    for (path, _, _), (version, was_added) in zip(prepared, versions):
+        if was_added:
+            added.append(path)
+        results.append({
+            'path': path,
+            'version': version._id,
+            'created': records[path][1],
+        })
+
+    if added:
+        node_logger = logs.OsfStorageNodeLogger(
+            auth=Auth(user),
+            node=node_addon.owner,
+        )
+        node_logger.log(
+            NodeLog.FILES_ADDED,
+            extra={'paths': added},
+            save=True,
+        )
+
+    download_counts = utils.get_download_counts(
+        records[path][0].get_download_count_page()
+        for path in set(item['path'] for item in results)
+    )
+    for item in results:
+        item['downloads'] = download_counts.get(
+            records[item['path']][0].get_download_count_page(), 0
+        )
+
+    return {
+        'status': 'success',
+        'files': results,
+    }, httplib.CREATED
+
+
 @must_be_signed
 @must_have_addon('osfstorage', 'node')
 def osf_storage_update_metadata_hook(node_addon, payload, **kwargs):
@@ -217,7 +302,7 @@ def download_file(path, node_addon, version_query, **query):
     # Redirect the user directly to the backend service (CloudFiles or S3) rather than
     # routing through OSF; this saves a request and avoids potential CORS configuration
     # errors in WaterButler.
-    resp = requests.get(url, allow_redirects=False)
+    resp = transport.get_session('waterbutler').get(url, allow_redirects=False)
     if resp.status_code in [301, 302]:
         return redirect(resp.headers['Location'])
     else:
@@ -270,11 +355,17 @@ def osf_storage_get_metadata_hook(node_addon, payload, **kwargs):
                 return []
             raise HTTPError(httplib.NOT_FOUND)
         # TODO: Handle nested folders
-        return [
-            utils.serialize_metadata_hgrid(item, node)
-            for item in list(file_tree.children)
+        children = [
+            item for item in list(file_tree.children)
             if not item.is_deleted
         ]
+        download_counts = utils.get_download_counts(
+            item.get_download_count_page() for item in children
+        )
+        return [
+            utils.serialize_metadata_hgrid(item, node, download_counts=download_counts)
+            for item in children
+        ]
     else:
         file_record = model.OsfStorageFileRecord.find_by_path(path, node_addon)
         if not file_record:
@@ -328,9 +419,16 @@ def osf_storage_get_revisions(payload, node_addon, **kwargs):
         size=osf_storage_settings.REVISIONS_PAGE_SIZE,
     )
 
+    download_counts = utils.get_download_counts(
+        record.get_download_count_page(version=index) for index in indices
+    )
+
     return {
         'revisions': [
-            utils.serialize_revision(node, record, versions[idx], indices[idx], anon=is_anon)
+            utils.serialize_revision(
+                node, record, versions[idx], indices[idx],
+                anon=is_anon, download_counts=download_counts,
+            )
             for idx in range(len(versions))
         ],
         'more': more,
@@ -13,6 +13,8 @@ from website.addons.s3.utils import remove_osf_user
 from website.addons.s3 import api
 
 class S3GuidFile(GuidFile):
+    immutable_revisions = True
+
     __indices__ = [
         {
             'key_or_list': [
@@ -161,7 +163,7 @@ class AddonS3NodeSettings(AddonNodeSettingsBase):
     def create_waterbutler_log(self, auth, action, metadata):
         url = self.owner.web_url_for('addon_view_or_download_file', path=metadata['path'], provider='s3')
 
-        self.owner.add_log(
+        self.owner.add_file_log(
             's3_{0}'.format(action),
             auth=auth,
             params={
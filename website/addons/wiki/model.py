@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import json
+import hashlib
 import datetime
 import functools
 import logging
@@ -11,13 +13,20 @@ import markdown
 from markdown.extensions import codehilite, fenced_code, wikilinks
 from modularodm import fields
 
+from framework.cache import LRUCache
 from framework.forms.utils import sanitize
 from framework.guid.model import GuidStoredObject
 
 from website import settings
 from website.addons.base import AddonNodeSettingsBase
 from website.addons.wiki import utils as wiki_utils
-from website.addons.wiki.settings import WIKI_CHANGE_DATE
+from website.addons.wiki.settings import (
+    WIKI_CHANGE_DATE,
+    WIKI_RENDERER_VERSION,
+    WIKI_KEYFRAME_INTERVAL,
+    WIKI_DELTA_MAX_RATIO,
+    WIKI_CONTENT_CACHE_SIZE,
+)
 from website.project.model import write_permissions_revoked
 
 from .exceptions import (
@@ -91,6 +100,16 @@ def render_content(content, node):
     return sanitized_content
 
 
+# Rendered output is only valid for the renderer that produced it; changing the
+# whitelist or bumping `WIKI_RENDERER_VERSION` invalidates all stored output
+RENDERER_KEY = hashlib.md5(
+    json.dumps([WIKI_RENDERER_VERSION, markdown.version, settings.WIKI_WHITELIST], sort_keys=True)
+).hexdigest()
+
+# Reconstructed content of versions stored as deltas, keyed by page id
+content_cache = LRUCache(WIKI_CONTENT_CACHE_SIZE)
+
+
 class NodeWikiPage(GuidStoredObject):
 
     _id = fields.StringField(primary=True)
@@ -99,10 +118,25 @@ class NodeWikiPage(GuidStoredObject):
     version = fields.IntegerField()
     date = fields.DateTimeField(auto_now_add=datetime.datetime.utcnow)
     is_current = fields.BooleanField()
-    content = fields.StringField(default='')
+
+    # Full text of the page, or `None` for versions stored as a delta; read
+    # through `content`
+    stored_content = fields.StringField(default='')
+    # Reverse delta against the following version of the page:
+    # {'base': <page id>, 'ops': <operations from `generate_delta`>}
+    delta = fields.DictionaryField()
 
     user = fields.ForeignField('user')
     node = fields.ForeignField('node')
+    # Whether a fork or registration of `node` also lists this version. Shared
+    # versions are never rewritten as deltas
+    is_shared = fields.BooleanField(default=False)
+
+    # Rendered HTML and plain text, computed lazily on first use. Versions are
+    # immutable, but pages are shared with forks and registrations and wiki
+    # links depend on the node, so output is stored per node:
+    # {'key': <renderer and content key>, 'nodes': {<node id>: {'html': ..., 'text': ...}}}
+    rendered = fields.DictionaryField()
 
     @property
     def deep_url(self):
@@ -116,22 +150,121 @@ class NodeWikiPage(GuidStoredObject):
     def rendered_before_update(self):
         return self.date < WIKI_CHANGE_DATE
 
-    def html(self, node):
-        """The cleaned HTML of the page"""
+    @property
+    def content(self):
+        if not self.delta:
+            return self.stored_content or ''
+        content = content_cache.get(self._primary_key)
+        if content is None:
+            content = self._reconstruct_content()
+            content_cache.set(self._primary_key, content)
+        return content
+
+    @content.setter
+    def content(self, value):
+        # Also used when loading records saved before `stored_content` existed
+        self.stored_content = value
+        self.delta = {}
+        content_cache.delete(self._primary_key)
+
+    def _reconstruct_content(self):
+        # Follow deltas to the nearest version with known content, then
+        # apply them in reverse
+        chain = []
+        page = self
+        while page.delta:
+            chain.append(page.delta['ops'])
+            base_id = page.delta['base']
+            content = content_cache.get(base_id)
+            if content is not None:
+                break
+            page = NodeWikiPage.load(base_id)
+        else:
+            content = page.stored_content or ''
+        for ops in reversed(chain):
+            content = wiki_utils.apply_delta(content, ops)
+        return content
+
+    def compress(self, base, save=True):
+        """Store this version as a delta against `base`, the following version
+        of the page. Every `WIKI_KEYFRAME_INTERVAL`th version is kept in full
+        to bound reconstruction, as is any version whose delta would not be
+        substantially smaller than its content.
+
+        :param NodeWikiPage base: Next version of the page
+        :return: Number of bytes saved
+        """
+        if self.delta or self.is_shared or not self.version or self.version % WIKI_KEYFRAME_INTERVAL == 0:
+            return 0
+        content = self.content
+        ops = wiki_utils.generate_delta(base.content, content)
+        size = len(content.encode('utf-8'))
+        delta_size = wiki_utils.delta_size(ops)
+        if delta_size >= size * WIKI_DELTA_MAX_RATIO:
+            return 0
+        self.stored_content = None
+        self.delta = {'base': base._primary_key, 'ops': ops}
+        content_cache.set(self._primary_key, content)
+        if save:
+            self.save()
+            # Drop full text left behind by records saved before
+            # `stored_content` existed
+            collection = self._storage[0].store
+            collection.update({'_id': self._primary_key}, {'$unset': {'content': ''}})
+        return size - delta_size
+
+    @property
+    def render_key(self):
+        return hashlib.md5(
+            RENDERER_KEY + (self.content or '').encode('utf-8')
+        ).hexdigest()
+
+    def _render(self, node):
         sanitized_content = render_content(self.content, node=node)
         try:
-            return linkify(
+            html = linkify(
                 sanitized_content,
                 [nofollow, ],
             )
         except TypeError:
             logger.warning('Returning unlinkified content.')
-            return sanitized_content
+            html = sanitized_content
+        return {
+            'html': html,
+            'text': sanitize(html, tags=[], strip=True),
+        }
+
+    def get_rendered(self, node):
+        """Return rendered HTML and text for the page as viewed on `node`,
+        rendering and storing it if missing or stale.
+        """
+        key = self.render_key
+        rendered = self.rendered or {}
+        if rendered.get('key') == key and node._id in rendered.get('nodes', {}):
+            return rendered['nodes'][node._id]
+
+        value = self._render(node)
+        if rendered.get('key') == key:
+            update = {'rendered.nodes.{0}'.format(node._id): value}
+            rendered['nodes'][node._id] = value
+        else:
+            rendered = {'key': key, 'nodes': {node._id: value}}
+            update = {'rendered': rendered}
+        self.rendered = rendered
+        if self._primary_key:
+            # Write directly rather than through `save` to avoid touching the
+            # page's other fields and triggering a search update
+            collection = self._storage[0].store
+            collection.update({'_id': self._primary_key}, {'$set': update})
+        return value
+
+    def html(self, node):
+        """The cleaned HTML of the page"""
+        return self.get_rendered(node)['html']
 
     def raw_text(self, node):
         """ The raw text of the page, suitable for using in a test search"""
-
-        return sanitize(self.html(node), tags=[], strip=True)
+        return self.get_rendered(node)['text']
 
     def get_draft(self, node):
         """
@@ -6,4 +6,15 @@ SHAREJS_PORT = 7007
 SHAREJS_URL = '{}:{}'.format(SHAREJS_HOST, SHAREJS_PORT)
 
 # TODO: Change to release date for wiki change
-WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098)
\ No newline at end of file
+WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098)
+
+# Bump to invalidate stored wiki HTML after changing how wikis are rendered
+WIKI_RENDERER_VERSION = 1
+
+# Older wiki versions are stored as deltas against the following version;
+# every WIKI_KEYFRAME_INTERVAL versions one is kept in full
+WIKI_KEYFRAME_INTERVAL = 10
+# Keep a version in full unless its delta is smaller than this fraction of it
+WIKI_DELTA_MAX_RATIO = 0.5
+# Number of reconstructed versions kept in memory per process
+WIKI_CONTENT_CACHE_SIZE = 500
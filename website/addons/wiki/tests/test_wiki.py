@@ -19,10 +19,10 @@ from tests.factories import (
 from website.addons.wiki import settings
 from website.addons.wiki.exceptions import InvalidVersionError
 from website.addons.wiki.views import _serialize_wiki_toc, _get_wiki_web_urls, _get_wiki_api_urls
-from website.addons.wiki.model import NodeWikiPage, render_content
+from website.addons.wiki.model import NodeWikiPage, render_content, content_cache
 from website.addons.wiki.utils import (
     get_sharejs_uuid, generate_private_uuid, share_db, delete_share_doc,
-    migrate_uuid, format_wiki_version,
+    migrate_uuid, format_wiki_version, generate_delta, apply_delta,
 )
 from website.addons.wiki.tests.config import EXAMPLE_DOCS, EXAMPLE_OPS
 from framework.auth import Auth
@@ -42,6 +42,130 @@ class TestNodeWikiPageModel(OsfTestCase):
             page.save()
 
 
+class TestNodeWikiPageRenderCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestNodeWikiPageRenderCache, self).setUp()
+        self.project = ProjectFactory()
+        self.page = NodeWikiFactory(node=self.project, content='**bold** [[other page]]')
+
+    @mock.patch('website.addons.wiki.model.render_content')
+    def test_html_rendered_once(self, mock_render):
+        mock_render.return_value = '<b>bold</b>'
+        self.page.html(self.project)
+        self.page.raw_text(self.project)
+        NodeWikiPage.load(self.page._id).html(self.project)
+        assert_equal(mock_render.call_count, 1)
+
+    def test_rendered_output_persisted(self):
+        html = self.page.html(self.project)
+        NodeWikiPage._clear_caches()
+        page = NodeWikiPage.load(self.page._id)
+        assert_equal(page.rendered['nodes'][self.project._id]['html'], html)
+        assert_equal(page.raw_text(self.project), 'bold other page')
+
+    def test_rendered_per_node(self):
+        fork = ProjectFactory()
+        assert_in(self.project._id, self.page.html(self.project))
+        assert_in(fork._id, self.page.html(fork))
+        assert_equal(
+            set(self.page.rendered['nodes'].keys()),
+            {self.project._id, fork._id},
+        )
+
+    def test_changed_content_rerenders(self):
+        self.page.html(self.project)
+        self.page.content = 'changed'
+        assert_in('changed', self.page.html(self.project))
+
+    @mock.patch('website.addons.wiki.model.RENDERER_KEY', 'new-renderer')
+    def test_renderer_change_invalidates(self):
+        other = ProjectFactory()
+        self.page.rendered = {
+            'key': 'stale',
+            'nodes': {other._id: {'html': 'stale', 'text': 'stale'}},
+        }
+        assert_not_equal(self.page.html(self.project), 'stale')
+        assert_equal(self.page.rendered['nodes'].keys(), [self.project._id])
+
+
+class TestWikiDeltaStorage(OsfTestCase):
+
+    def setUp(self):
+        super(TestWikiDeltaStorage, self).setUp()
+        self.project = ProjectFactory()
+        self.auth = Auth(user=self.project.creator)
+        self.paragraphs = [fake.paragraph() + '\n' for _ in range(20)]
+
+    def _edit(self, index, text):
+        self.paragraphs[index] = text + '\n'
+        content = ''.join(self.paragraphs)
+        self.project.update_node_wiki('home', content, self.auth)
+        return content
+
+    def _versions(self):
+        return [
+            NodeWikiPage.load(page_id)
+            for page_id in self.project.wiki_pages_versions['home']
+        ]
+
+    def test_delta_round_trip(self):
+        base = u'one\ntwo\nthree\nfour\n'
+        content = u'zero\none\nthree\nfour and more\n'
+        assert_equal(apply_delta(base, generate_delta(base, content)), content)
+        assert_equal(apply_delta(base, generate_delta(base, u'')), u'')
+        assert_equal(apply_delta(u'', generate_delta(u'', content)), content)
+
+    def test_previous_version_stored_as_delta(self):
+        first = self._edit(0, 'first')
+        second = self._edit(1, 'second')
+        old, current = self._versions()
+        assert_is_none(old.stored_content)
+        assert_equal(old.delta['base'], current._id)
+        assert_false(current.delta)
+        assert_equal(current.content, second)
+        content_cache.clear()
+        NodeWikiPage._clear_caches()
+        assert_equal(NodeWikiPage.load(old._id).content, first)
+
+    def test_reconstructs_long_history(self):
+        contents = [self._edit(i % 20, 'edit {0}'.format(i)) for i in range(25)]
+        content_cache.clear()
+        NodeWikiPage._clear_caches()
+        versions = self._versions()
+        assert_equal([page.content for page in versions], contents)
+        keyframes = [page.version for page in versions if not page.delta]
+        assert_equal(keyframes, [10, 20, 25])
+
+    def test_unrelated_version_kept_in_full(self):
+        self._edit(0, 'first')
+        self.project.update_node_wiki('home', 'completely different', self.auth)
+        old, current = self._versions()
+        assert_false(old.delta)
+        assert_equal(old.content, old.stored_content)
+
+    def test_version_shared_with_fork_kept_in_full(self):
+        first = self._edit(0, 'first')
+        fork = self.project.fork_node(self.auth)
+        self._edit(1, 'second')
+        old, current = self._versions()
+        assert_true(old.is_shared)
+        assert_false(current.is_shared)
+        assert_false(old.delta)
+        assert_equal(old.stored_content, first)
+        assert_equal(fork.get_wiki_page('home').content, first)
+
+    def test_legacy_content_field_loaded(self):
+        page = NodeWikiFactory(node=self.project)
+        collection = NodeWikiPage._storage[0].store
+        collection.update(
+            {'_id': page._id},
+            {'$rename': {'stored_content': 'content'}},
+        )
+        NodeWikiPage._clear_caches()
+        assert_equal(NodeWikiPage.load(page._id).content, 'Some content')
+
+
 class TestWikiViews(OsfTestCase):
 
     def setUp(self):
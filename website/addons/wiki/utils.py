@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 import os
+import json
 import urllib
 import uuid
+import difflib
 
 from pymongo import MongoClient
 import requests
@@ -154,3 +156,37 @@ def format_wiki_version(version, num_versions, allow_preview):
         raise InvalidVersionError
 
     return version
+
+
+def generate_delta(base, content):
+    """Compute a line-based delta that rebuilds `content` from `base`.
+
+    :param unicode base: Content of the base version
+    :param unicode content: Content to encode
+    :return: List of operations; a `[start, end]` pair copies lines of `base`,
+        a string is inserted as is
+    """
+    base_lines = base.splitlines(True)
+    lines = content.splitlines(True)
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j1 < j2:
+            ops.append(u''.join(lines[j1:j2]))
+    return ops
+
+
+def apply_delta(base, ops):
+    """Rebuild content from `base` and the output of `generate_delta`."""
+    base_lines = base.splitlines(True)
+    return u''.join(
+        op if isinstance(op, basestring) else u''.join(base_lines[op[0]:op[1]])
+        for op in ops
+    )
+
+
+def delta_size(ops):
+    """Approximate storage size of a delta in bytes."""
+    return len(json.dumps(ops))
@@ -8,12 +8,11 @@ from website.addons.base import AddonOAuthUserSettingsBase
 from website.addons.citations.utils import serialize_folder
 from website.addons.zotero import serializer
 from website.addons.zotero import settings
+from website.addons.zotero.provider import ZoteroCitationsProvider
 from website.oauth.models import ExternalProvider
 
-# TODO: Don't cap at 200 responses. We can only fetch 100 citations at a time. With lots
-# of citations, requesting the citations may take longer than the UWSGI harakiri time.
-# For now, we load 200 citations max and show a message to the user.
-MAX_CITATION_LOAD = 200
+# Zotero returns at most 100 items per request
+MAX_PAGE_SIZE = 100
 
 class Zotero(ExternalProvider):
     name = "Zotero"
@@ -70,50 +69,38 @@ class Zotero(ExternalProvider):
         collection = self.client.collection(folder_id)
         return collection
 
-    def get_list(self, list_id=None):
+    def get_list(self, list_id=None, offset=0, limit=None):
         """Get a single CitationList
 
         :param str list_id: ID for a Zotero collection. Optional.
+        :param int offset: Number of citations to skip
+        :param int limit: Maximum number of citations to return; all remaining
+            citations if `None`
         :return CitationList: CitationList for the collection, or for all documents
         """
         if list_id == 'ROOT':
             list_id = None
 
         if list_id:
-            citations = []
-            more = True
-            offset = 0
-            while more and len(citations) <= MAX_CITATION_LOAD:
-                page = self.client.collection_items(list_id, content='csljson', size=100, start=offset)
-                citations = citations + page
-                if len(page) == 0 or len(page) < 100:
-                    more = False
-                else:
-                    offset = offset + len(page)
-            return self._citations_for_zotero_collection(citations)
+            fetch = lambda **kwargs: self.client.collection_items(list_id, **kwargs)
         else:
-            return self._citations_for_zotero_user()
+            fetch = self.client.items
+        return self._fetch_citations(fetch, offset, limit)
 
-    def _citations_for_zotero_collection(self, collection):
-        """Get all the citations in a specified collection
-
-        :param  csljson collection: list of csljson documents
-        :return list of citation objects representing said dicts of said documents.
+    def _fetch_citations(self, fetch, offset, limit):
+        """Fetch csljson citations from `offset` in requests of at most
+        MAX_PAGE_SIZE items, stopping after `limit` citations.
         """
-        return collection
-
-    def _citations_for_zotero_user(self):
-        """Get all the citations from the user """
         citations = []
-        more = True
-        offset = 0
-        while more and len(citations) <= MAX_CITATION_LOAD:
-            page = self.client.items(content='csljson', limit=100, start=offset)
-            citations = citations + page
-            if len(page) == 0 or len(page) < 100:
-                more = False
-            else:
-                offset = offset + len(page)
+        while limit is None or len(citations) < limit:
+            size = MAX_PAGE_SIZE
+            if limit is not None:
+                size = min(size, limit - len(citations))
+            page = fetch(content='csljson', limit=size, start=offset)
+            citations += page
+            if len(page) < size:
+                break
+            offset += len(page)
         return citations
 
 
@@ -121,6 +108,11 @@ class ZoteroUserSettings(AddonOAuthUserSettingsBase):
     oauth_provider = Zotero
     serializer = serializer.ZoteroSerializer
 
+    def revoke_oauth_access(self, external_account):
+        super(ZoteroUserSettings, self).revoke_oauth_access(external_account)
+        if external_account.provider == self.oauth_provider.short_name:
+            ZoteroCitationsProvider().clear_folder_cache(external_account)
+
 
 class ZoteroNodeSettings(AddonOAuthNodeSettingsBase):
     oauth_provider = Zotero
@@ -303,6 +303,17 @@ class ZoteroUserSettingsTestCase(OsfTestCase):
             }
         )
 
+    @mock.patch('website.addons.zotero.model.ZoteroCitationsProvider.clear_folder_cache')
+    def test_revoke_oauth_access_clears_folder_cache(self, mock_clear):
+        self._prep_oauth_case()
+        account = ZoteroAccountFactory()
+        self.user.external_accounts.append(account)
+        self.user.save()
+
+        self.user_settings.revoke_oauth_access(account)
+
+        mock_clear.assert_called_once_with(account)
+
     def test_verify_oauth_access_no_metadata(self):
         self._prep_oauth_case()
 
@@ -10,6 +10,7 @@ from tests.factories import AuthUserFactory, ProjectFactory
 import urlparse
 
 from framework.auth.core import Auth
+from framework.mongo import database
 
 from website.addons.zotero.tests.factories import (
     ZoteroAccountFactory,
@@ -326,3 +327,90 @@ class ZoteroViewsTestCase(OsfTestCase):
             expect_errors=True
         )
         assert_equal(res.status_code, 403)
+
+    @httpretty.activate
+    @mock.patch('website.addons.citations.provider.settings.CITATION_PAGE_SIZE', 3)
+    def test_zotero_citation_list_paginated(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            urlparse.urljoin(
+                API_URL,
+                'users/{}/collections'.format(self.account.provider_id)
+            ),
+            body=mock_responses['folders'],
+            content_type='application/json'
+        )
+
+        httpretty.register_uri(
+            httpretty.GET,
+            urlparse.urljoin(
+                API_URL,
+                'users/{}/items'.format(self.account.provider_id)
+            ),
+            body=mock_responses['documents'],
+            content_type='application/json'
+        )
+
+        res = self.app.get(
+            self.project.api_url_for('zotero_citation_list', zotero_list_id='ROOT'),
+            auth=self.user.auth
+        )
+        children = res.json['contents']
+        assert_equal(len(children), 5)
+        assert_equal(children[0]['kind'], 'folder')
+        assert_equal([each['kind'] for each in children[1:4]], ['file'] * 3)
+        more = children[4]
+        assert_equal(more['kind'], 'folder')
+        assert_in('page=2', more['urls']['fetch'])
+        assert_equal(more['page'], 2)
+
+        res = self.app.get(more['urls']['fetch'], auth=self.user.auth)
+        assert_equal(
+            [each['kind'] for each in res.json['contents'][:3]],
+            ['file'] * 3
+        )
+
+    @httpretty.activate
+    def test_zotero_citation_list_caches_folders(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            urlparse.urljoin(
+                API_URL,
+                'users/{}/collections'.format(self.account.provider_id)
+            ),
+            body=mock_responses['folders'],
+            content_type='application/json'
+        )
+
+        url = self.project.api_url_for('zotero_citation_list')
+        self.app.get(url, auth=self.user.auth)
+        with mock.patch('website.addons.zotero.model.Zotero.citation_lists') as mock_lists:
+            mock_lists.return_value = []
+            res = self.app.get(url, auth=self.user.auth)
+            assert_equal(res.json['contents'][0]['id'], 'ROOT')
+            assert_false(mock_lists.called)
+
+            self.app.get(url, {'refresh': 'true'}, auth=self.user.auth)
+            assert_true(mock_lists.called)
+
+    @mock.patch('website.addons.citations.provider._folder_cache_indexed', False)
+    @httpretty.activate
+    def test_zotero_folder_cache_expires_index(self):
+
+        httpretty.register_uri(
+            httpretty.GET,
+            urlparse.urljoin(
+                API_URL,
+                'users/{}/collections'.format(self.account.provider_id)
+            ),
+            body=mock_responses['folders'],
+            content_type='application/json'
+        )
+
+        url = self.project.api_url_for('zotero_citation_list')
+        self.app.get(url, auth=self.user.auth)
+        indices = database['citationfolders'].index_information()
+        keys = dict((tuple(index['key']), index) for index in indices.values())
+        assert_equal(keys[(('expires', 1),)]['expireAfterSeconds'], 0)
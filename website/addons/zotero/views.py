@@ -100,4 +100,9 @@ def zotero_citation_list(auth, node_addon, zotero_list_id=None, **kwargs):
 
     provider = ZoteroCitationsProvider()
     show = request.args.get('view', 'all')
-    return provider.citation_list(node_addon, auth.user, zotero_list_id, show)
+    page = request.args.get('page', 1, type=int)
+    refresh = request.args.get('refresh', '').lower() == 'true'
+    return provider.citation_list(
+        node_addon, auth.user, zotero_list_id, show,
+        page=max(page, 1), refresh=refresh,
+    )
@@ -7,6 +7,7 @@ from modularodm import Q
 from modularodm.exceptions import ModularOdmException
 
 from framework.auth import Auth
+from framework.auth.utils import normalize_email
 
 from website import security
 from website import settings
@@ -31,7 +32,7 @@ def get_or_create_user(fullname, address, is_spam):
     :return: Tuple of (user, created)
     """
     try:
-        user = User.find_one(Q('username', 'iexact', address))
+        user = User.find_one(Q('username', 'eq', normalize_email(address)))
         return user, False
     except ModularOdmException:
         password = str(uuid.uuid4())
@@ -9,7 +9,7 @@ from framework.sessions.model import Session
 from website.project.model import (
     ApiKey, Node, NodeLog,
     Tag, WatchConfig, MetaSchema, Pointer,
-    Comment, PrivateLink, MetaData,
+    Comment, PrivateLink, MetaData, ForkJob, RegistrationJob,
 )
 from website.oauth.models import ExternalAccount
 from website.identifiers.model import Identifier
@@ -24,7 +24,7 @@ MODELS = (
     Tag, WatchConfig, Session, Guid, MetaSchema, Pointer,
     MailRecord, Comment, PrivateLink, MetaData, Conference,
     NotificationSubscription, NotificationDigest, CitationStyle,
-    CitationStyle, ExternalAccount, Identifier,
+    CitationStyle, ExternalAccount, Identifier, ForkJob, RegistrationJob,
 )
 
 GUID_MODELS = (User, Node, Comment, MetaData)
@@ -118,10 +118,12 @@ def serialize_contributors(contribs, node, **kwargs):
     ]
 
 
-def add_contributor_json(user, current_user=None):
+def add_contributor_json(user, current_user=None, n_projects_in_common=None):
 
     # get shared projects
-    if current_user:
+    if n_projects_in_common is not None:
+        pass
+    elif current_user:
         n_projects_in_common = current_user.n_projects_in_common(user)
     else:
         n_projects_in_common = 0
@@ -10,6 +10,7 @@ from collections import OrderedDict
 
 import pytz
 import blinker
+import pymongo
 from flask import request
 from HTMLParser import HTMLParser
 
@@ -28,6 +29,7 @@ from framework.auth import signals as auth_signals
 from framework.exceptions import PermissionsError
 from framework.guid.model import GuidStoredObject
 from framework.auth.utils import privacy_info_handle
+from framework.auth.core import update_cocontributor_counts
 from framework.analytics import tasks as piwik_tasks
 from framework.mongo.utils import to_mongo, to_mongo_key
 from framework.analytics import (
@@ -142,12 +144,28 @@ def validate_comment_reports(value, *args, **kwargs):
 
 class Comment(GuidStoredObject):
 
+    __indices__ = [
+        {
+            'key_or_list': [
+                ('root_target', pymongo.ASCENDING),
+                ('depth', pymongo.ASCENDING),
+                ('date_created', pymongo.ASCENDING),
+            ],
+        }
+    ]
+
     _id = fields.StringField(primary=True)
 
     user = fields.ForeignField('user', required=True, backref='commented')
     node = fields.ForeignField('node', required=True, backref='comment_owner')
     target = fields.AbstractForeignField(required=True, backref='commented')
 
+    # Primary key of the record at the top of the thread (e.g. the node), and
+    # the number of comments between this comment and that record; set on
+    # creation so that a level of a thread can be loaded in a single query
+    root_target = fields.StringField()
+    depth = fields.IntegerField(default=0)
+
     date_created = fields.DateTimeField(auto_now_add=datetime.datetime.utcnow)
     date_modified = fields.DateTimeField(auto_now=datetime.datetime.utcnow)
     modified = fields.BooleanField()
@@ -184,6 +202,142 @@ class Comment(GuidStoredObject):
 
         return comment
 
+    def save(self, *args, **kwargs):
+        created = not self._is_loaded
+        if self.root_target is None and self.target is not None:
+            self.root_target, self.depth = self.thread_position(self.target)
+        rv = super(Comment, self).save(*args, **kwargs)
+        if created and not self.is_deleted:
+            self.update_user_count(self.node, self.user, 1)
+            self.increment_unread_counts(self.node, self.user)
+        return rv
+
+    @staticmethod
+    def thread_position(target):
+        """Return the root target primary key and depth of a comment on
+        `target`.
+        """
+        if isinstance(target, Comment):
+            return target.root_target, target.depth + 1
+        return target._primary_key, 0
+
+    @classmethod
+    def find_page(cls, target, cursor=None, size=None):
+        """Load comments posted directly on `target`, oldest first.
+
+        :param target: Node or comment
+        :param Comment cursor: Last comment of the previous page
+        :param int size: Maximum number of comments, or `None` for all
+        :return: Tuple of (list of comments, next cursor or `None`)
+        """
+        root_target, depth = cls.thread_position(target)
+        query = (
+            Q('root_target', 'eq', root_target) &
+            Q('depth', 'eq', depth) &
+            Q('target', 'eq', target)
+        )
+        if cursor is not None:
+            # Compare at the millisecond precision used by MongoDB
+            date = cursor.date_created.replace(
+                microsecond=cursor.date_created.microsecond // 1000 * 1000
+            )
+            query = query & (
+                Q('date_created', 'gt', date) | (
+                    Q('date_created', 'eq', date) &
+                    Q('_id', 'gt', cursor._id)
+                )
+            )
+        comments = cls.find(query).sort('date_created', '_id')
+        if size is None:
+            return list(comments), None
+        comments = list(comments.limit(size + 1))
+        next_cursor = comments[size - 1] if len(comments) > size else None
+        return comments[:size], next_cursor
+
+    @classmethod
+    def find_parents(cls, comments):
+        """Return the primary keys of the given comments that have replies,
+        using a single query.
+        """
+        if not comments:
+            return set()
+        root_targets = set(comment.root_target for comment in comments)
+        depths = set(comment.depth + 1 for comment in comments)
+        replies = cls._storage[0].store.find(
+            {
+                'root_target': {'$in': list(root_targets)},
+                'depth': {'$in': list(depths)},
+                'target': {'$in': [[comment._id, 'comment'] for comment in comments]},
+            },
+            {'target': True},
+        )
+        return set(reply['target'][0] for reply in replies)
+
+    @staticmethod
+    def update_user_count(node, user, increment):
+        """Adjust the number of comments `user` has posted on `node`. Counts
+        are kept in their own collection so that they can be updated
+        atomically without loading or saving the node.
+        """
+        from framework.mongo import database
+        database['commentcounts'].update(
+            {'_id': node._id},
+            {'$inc': {'users.{0}'.format(user._id): increment}},
+            upsert=True,
+        )
+
+    @staticmethod
+    def get_unread_count(node, user):
+        """Return the number of comments on `node` that `user` has not seen,
+        or `None` if no counter has been kept for the user yet.
+        """
+        from framework.mongo import database
+        record = database['commentcounts'].find_one(
+            {'_id': node._id},
+            {'unread.{0}'.format(user._id): True},
+        ) or {}
+        return record.get('unread', {}).get(user._id)
+
+    @staticmethod
+    def set_unread_count(node, user, count):
+        from framework.mongo import database
+        database['commentcounts'].update(
+            {'_id': node._id},
+            {'$set': {'unread.{0}'.format(user._id): count}},
+            upsert=True,
+        )
+
+    @staticmethod
+    def increment_unread_counts(node, author):
+        """Count a new comment by `author` as unread for the other
+        contributors to `node`. Contributors without a counter are skipped;
+        theirs is computed from scratch when first read.
+        """
+        from framework.mongo import database
+        collection = database['commentcounts']
+        record = collection.find_one({'_id': node._id}, {'unread': True}) or {}
+        counted = record.get('unread', {})
+        increments = dict(
+            ('unread.{0}'.format(user_id), 1)
+            for user_id in node.contributors._to_primary_keys()
+            if user_id != author._id and user_id in counted
+        )
+        if increments:
+            collection.update({'_id': node._id}, {'$inc': increments})
+
+    @staticmethod
+    def get_user_counts(node):
+        """Return a dict mapping user IDs to the number of (non-deleted)
+        comments they have posted on `node`.
+        """
+        from framework.mongo import database
+        record = database['commentcounts'].find_one({'_id': node._id}) or {}
+        return dict(
+            (user_id, count)
+            for user_id, count in record.get('users', {}).iteritems()
+            if count > 0
+        )
+
     def edit(self, content, auth, save=False):
         self.content = content
         self.modified = True
@@ -202,6 +356,8 @@ class Comment(GuidStoredObject):
             self.save()
 
     def delete(self, auth, save=False):
+        if not self.is_deleted:
+            self.update_user_count(self.node, self.user, -1)
         self.is_deleted = True
         self.node.add_log(
             NodeLog.COMMENT_REMOVED,
@@ -218,6 +374,8 @@ class Comment(GuidStoredObject):
             self.save()
 
     def undelete(self, auth, save=False):
+        if self.is_deleted:
+            self.update_user_count(self.node, self.user, 1)
         self.is_deleted = False
         self.node.add_log(
             NodeLog.COMMENT_ADDED,
@@ -285,6 +443,17 @@ class ApiKey(StoredObject):
 
 class NodeLog(StoredObject):
 
+    # Supports loading recent logs across watched nodes, which are recorded
+    # as backreferences on each log
+    __indices__ = [
+        {
+            'key_or_list': [
+                ('__backrefs.logged.node.logs', pymongo.ASCENDING),
+                ('date', pymongo.DESCENDING),
+            ],
+        }
+    ]
+
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
 
     date = fields.DateTimeField(default=datetime.datetime.utcnow, index=True)
@@ -335,6 +504,7 @@ class NodeLog(StoredObject):
     FILE_UPDATED = 'file_updated'
     FILE_REMOVED = 'file_removed'
     FILE_RESTORED = 'file_restored'
+    FILES_ADDED = 'files_added'
 
     ADDON_ADDED = 'addon_added'
     ADDON_REMOVED = 'addon_removed'
@@ -359,6 +529,30 @@ class NodeLog(StoredObject):
             Node.load(self.params.get('project'))
         )
 
+    @property
+    def node_ids(self):
+        """Primary keys that `node` may refer to, in order of preference."""
+        return [
+            node_id for node_id in
+            (self.params.get('node'), self.params.get('project'))
+            if node_id
+        ]
+
+    @property
+    def user_id(self):
+        """Primary key of the acting user, read without loading the user."""
+        return self._fields['user']._get_underlying_data(self)
+
+    def get_node(self, nodes):
+        """Like `node`, but looked up in a dict of preloaded nodes.
+
+        :param dict nodes: Dict mapping node IDs to nodes
+        """
+        for node_id in self.node_ids:
+            if nodes.get(node_id):
+                return nodes[node_id]
+        return None
+
     @property
     def tz_date(self):
         '''Return the timezone-aware date.
@@ -401,12 +595,18 @@ class NodeLog(StoredObject):
             return node_to_check.can_view(auth)
         return False
 
-    def _render_log_contributor(self, contributor, anonymous=False):
-        user = User.load(contributor)
+    def _render_log_contributor(self, contributor, anonymous=False, users=None, nodes=None):
+        """Serialize a contributor listed in the log's params.
+
+        :param dict users: Optional dict mapping user IDs to preloaded users
+        :param dict nodes: Optional dict mapping node IDs to preloaded nodes
+        """
+        user = users.get(contributor) if users is not None else User.load(contributor)
         if not user:
             return None
-        if self.node:
-            fullname = user.display_full_name(node=self.node)
+        node = self.get_node(nodes) if nodes is not None else self.node
+        if node:
+            fullname = user.display_full_name(node=node)
         else:
             fullname = user.fullname
         return {
@@ -531,6 +731,16 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         'wiki_pages_current',
     }
 
+    # Node fields that affect who may access the node or its components; saving
+    # any of them drops cached WaterButler auth responses
+    AUTH_CACHE_FIELDS = {
+        'permissions',
+        'contributors',
+        'is_public',
+        'is_deleted',
+        'nodes',
+    }
+
     # Maps category identifier => Human-readable representation for use in
     # titles, menus, etc.
     # Use an OrderedDict so that menu items show in the correct order
@@ -934,6 +1144,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     def save(self, *args, **kwargs):
 
         update_piwik = kwargs.pop('update_piwik', True)
+        index_search = kwargs.pop('index_search', True)
 
         self.adjust_permissions()
 
@@ -999,7 +1210,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if not self.is_public:
             if first_save or 'is_public' not in saved_fields:
                 need_update = False
-        if self.is_folder:
+        if self.is_folder or not index_search:
             need_update = False
         if need_update:
             self.update_search()
@@ -1008,6 +1219,11 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if settings.PIWIK_HOST and update_piwik:
             piwik_tasks.update_node(self._id, saved_fields)
 
+        if not first_save and self.AUTH_CACHE_FIELDS.intersection(saved_fields):
+            # Avoid circular import
+            from website.addons.base import invalidate_auth_cache
+            invalidate_auth_cache()
+
         # Return expected value for StoredObject::save
         return saved_fields
 
@@ -1460,40 +1676,60 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
         return True
 
-    def fork_node(self, auth, title='Fork of '):
+    def can_fork(self, user):
+        """Whether `user` may fork this node. Non-contributors can't fork
+        private nodes.
+        """
+        return self.is_public or self.has_permission(user, 'read')
+
+    def count_forkable(self, user):
+        """Count this node and the descendants that `user` may fork along with
+        it.
+        """
+        return 1 + sum(
+            node.count_forkable(user)
+            for node in self.nodes
+            if node.primary and node.can_fork(user)
+        )
+
+    def fork_node(self, auth, title='Fork of ', job=None):
         """Recursively fork a node.
 
         :param Auth auth: Consolidated authorization
         :param str title: Optional text to prepend to forked title
+        :param ForkJob job: Optional job to report progress to
         :return: Forked node
         """
         user = auth.user
 
-        # Non-contributors can't fork private nodes
-        if not (self.is_public or self.has_permission(user, 'read')):
+        if not self.can_fork(user):
             raise PermissionsError('{0!r} does not have permission to fork node {1!r}'.format(user, self._id))
 
-        when = datetime.datetime.utcnow()
-
         original = self.load(self._primary_key)
+        if job is not None:
+            job.total = original.count_forkable(user)
+            job.save()
+
+        return original._fork_tree(auth, title, datetime.datetime.utcnow(), job)
+
+    def _fork_tree(self, auth, title, when, job=None):
+        user = auth.user
 
         # Note: Cloning a node copies its `wiki_pages_current` and
         # `wiki_pages_versions` fields, but does not clone the underlying
         # database objects to which these dictionaries refer. This means that
         # the cloned node must pass itself to its wiki objects to build the
         # correct URLs to that content.
-        forked = original.clone()
-
-        forked.logs = self.logs
-        forked.tags = self.tags
+        forked = self.clone()
 
         # Recursively fork child nodes
-        for node_contained in original.nodes:
+        for node_contained in self.nodes:
             forked_node = None
-            try:  # Catch the potential PermissionsError above
+            if not node_contained.primary:
                 forked_node = node_contained.fork_node(auth=auth, title='')
-            except PermissionsError:
-                pass  # If this exception is thrown omit the node from the result set
+            elif node_contained.can_fork(user):
+                # Nodes the user can't fork are omitted from the result set
+                forked_node = node_contained._fork_tree(auth, '', when, job)
             if forked_node is not None:
                 forked.nodes.append(forked_node)
 
@@ -1501,7 +1737,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         forked.is_fork = True
         forked.is_registration = False
         forked.forked_date = when
-        forked.forked_from = original
+        forked.forked_from = self
         forked.creator = user
         forked.piwik_site_id = None
 
@@ -1517,8 +1753,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         forked.add_log(
             action=NodeLog.NODE_FORKED,
             params={
-                'project': original.parent_id,
-                'node': original._primary_key,
+                'project': self.parent_id,
+                'node': self._primary_key,
                 'registration': forked._primary_key,
             },
             auth=auth,
@@ -1526,24 +1762,110 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             save=False,
         )
 
+        # Each fork is saved individually: `save` also creates its guid and
+        # records back-references, which a bulk insert would skip
         forked.save()
+        if job is not None:
+            job.add_fork(forked)
+        forked = forked._copy_references(self)
 
         # After fork callback
-        for addon in original.get_addons():
-            _, message = addon.after_fork(original, forked, user)
+        for addon in self.get_addons():
+            _, message = addon.after_fork(self, forked, user)
             if message:
-                status.push_status_message(message)
+                if job is not None:
+                    job.messages.append(message)
+                else:
+                    status.push_status_message(message)
 
         return forked
 
+    def _copy_references(self, original):
+        """Copy the logs and tags of `original` to this fork or registration,
+        and mark the wiki versions it now shares with `original`. Each
+        collection is written once, rather than saving every log and tag to
+        record its back-reference.
+
+        :return: Node reloaded from the database
+        """
+        from website.addons.wiki.model import NodeWikiPage
+
+        page_ids = [
+            page_id
+            for versions in original.wiki_pages_versions.values()
+            for page_id in versions
+        ]
+        if page_ids:
+            NodeWikiPage._storage[0].store.update(
+                {'_id': {'$in': page_ids}},
+                {'$set': {'is_shared': True}},
+                multi=True,
+            )
+            NodeWikiPage._clear_caches()
+
+        log_ids = original.logs._to_primary_keys()
+        tag_ids = original.tags._to_primary_keys()
+        self._storage[0].store.update(
+            {'_id': self._id},
+            {'$set': {
+                'logs': log_ids + self.logs._to_primary_keys(),
+                'tags': tag_ids,
+            }},
+        )
+        for schema, ids, backref in [
+                (NodeLog, log_ids, '__backrefs.logged.node.logs'),
+                (Tag, tag_ids, '__backrefs.tagged.node.tags')]:
+            if ids:
+                schema._storage[0].store.update(
+                    {'_id': {'$in': ids}},
+                    {'$addToSet': {backref: self._id}},
+                    multi=True,
+                )
+                schema._clear_caches()
+        self._clear_caches(self._id)
+        return self.load(self._id)
+
     def register_node(self, schema, auth, template, data):
-        """Make a frozen copy of a node.
+        """Make a frozen copy of a node, copying add-ons and updating search
+        immediately.
 
         :param schema: Schema object
         :param auth: All the auth information including user, API key.
         :template: Template name
         :data: Form data
         """
+        job = self.snapshot_registration(schema, auth, template, data)
+        job.run()
+        for message in job.messages:
+            status.push_status_message(message)
+        return job.registration
+
+    def snapshot_registration(self, schema, auth, template, data):
+        """Make a frozen copy of a node and its components. Add-on settings
+        and files are not copied and search is not updated; instead, the
+        state of each add-on is captured so that a `RegistrationJob` can copy
+        it later.
+
+        :param schema: Schema object
+        :param auth: All the auth information including user, API key.
+        :template: Template name
+        :data: Form data
+        :return: Pending `RegistrationJob`
+        """
+        template = to_mongo(urllib.unquote_plus(template))
+        snapshots = []
+        registered = self._snapshot_registration(
+            schema, auth, template, data, datetime.datetime.utcnow(), snapshots,
+        )
+        job = RegistrationJob(
+            registration=registered,
+            user=auth.user,
+            nodes=snapshots,
+        )
+        job.save()
+        return job
+
+    def _snapshot_registration(self, schema, auth, template, data, when, snapshots):
         # NOTE: Admins can register child nodes even if they don't have write access them
         if not self.can_edit(auth=auth) and not self.is_admin_parent(user=auth.user):
             raise PermissionsError(
@@ -1553,25 +1875,18 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if self.is_folder:
             raise NodeStateError("Folders may not be registered")
 
-        template = urllib.unquote_plus(template)
-        template = to_mongo(template)
-
-        when = datetime.datetime.utcnow()
-
-        original = self.load(self._primary_key)
-
         # Note: Cloning a node copies its `wiki_pages_current` and
         # `wiki_pages_versions` fields, but does not clone the underlying
         # database objects to which these dictionaries refer. This means that
         # the cloned node must pass itself to its wiki objects to build the
         # correct URLs to that content.
-        registered = original.clone()
+        registered = self.clone()
 
         registered.is_registration = True
         registered.registered_date = when
         registered.registered_user = auth.user
         registered.registered_schema = schema
-        registered.registered_from = original
+        registered.registered_from = self
         if not registered.registered_meta:
             registered.registered_meta = {}
         registered.registered_meta[template] = data
@@ -1579,43 +1894,47 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         registered.contributors = self.contributors
         registered.forked_from = self.forked_from
         registered.creator = self.creator
-        registered.logs = self.logs
-        registered.tags = self.tags
         registered.piwik_site_id = None
 
-        registered.save()
-
-        # After register callback
-        for addon in original.get_addons():
-            _, message = addon.after_register(original, registered, auth.user)
-            if message:
-                status.push_status_message(message)
-
-        registered.nodes = []
-
-        for node_contained in original.nodes:
-            registered_node = node_contained.register_node(
-                schema, auth, template, data
-            )
+        registered.save(index_search=False)
+        registered = registered._copy_references(self)
+
+        snapshots.append({
+            'registration': registered._id,
+            'original': self._id,
+            'addons': dict(
+                (addon.config.short_name, addon.snapshot())
+                for addon in self.get_addons()
+            ),
+            'copied': [],
+        })
+
+        for node_contained in self.nodes:
+            if node_contained.primary:
+                registered_node = node_contained._snapshot_registration(
+                    schema, auth, template, data, when, snapshots,
+                )
+            else:
+                registered_node = node_contained.register_node(
+                    schema, auth, template, data
+                )
             if registered_node is not None:
                 registered.nodes.append(registered_node)
 
-        original.add_log(
+        self.add_log(
             action=NodeLog.PROJECT_REGISTERED,
             params={
-                'project': original.parent_id,
-                'node': original._primary_key,
+                'project': self.parent_id,
+                'node': self._primary_key,
                 'registration': registered._primary_key,
             },
             auth=auth,
             log_date=when,
             save=False,
         )
-        original.save()
+        self.save()
 
-        registered.save()
-        for node in registered.nodes:
-            node.update_search()
+        registered.save(index_search=False)
 
         return registered
 
@@ -1679,6 +1998,49 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             parent.save()
         return log
 
+    def add_file_log(self, action, params, auth):
+        """Add a log for an action on a file by a storage add-on. Consecutive
+        logs of the same action on this node by the same user, each within
+        FILE_LOG_COALESCE_WINDOW seconds of the previous one, are merged into
+        the first log of the series: the parameters of each further file are
+        appended to its `files` parameter without saving the node.
+
+        :return: The new or merged log
+        """
+        log = self.logs[-1] if self.logs else None
+        now = datetime.datetime.utcnow()
+        window = datetime.timedelta(seconds=settings.FILE_LOG_COALESCE_WINDOW)
+        user = auth.user if auth else None
+        coalesce = (
+            log is not None and
+            user is not None and
+            log.action == action and
+            log.user is not None and log.user._id == user._id and
+            log.params.get('node') == self._id and
+            now - log.date <= window and
+            len(log.params.get('files', [])) < settings.FILE_LOG_COALESCE_MAX_FILES
+        )
+        if not coalesce:
+            return self.add_log(action, params=params, auth=auth)
+
+        entry = {
+            key: value
+            for key, value in params.iteritems()
+            if key not in ('project', 'node')
+        }
+        # Push atomically, since callbacks for a batch of files arrive at
+        # several processes at once
+        NodeLog._storage[0].store.update(
+            {'_id': log._id},
+            {
+                '$push': {'params.files': entry},
+                '$set': {'date': now},
+            },
+        )
+        NodeLog._clear_caches(log._id)
+        increment_user_activity_counters(user._primary_key, action, now)
+        return NodeLog.load(log._id)
+
     @property
     def url(self):
         return '/{}/'.format(self._primary_key)
@@ -2279,6 +2641,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         name = (name or '').strip()
         key = to_mongo_key(name)
 
+        current = None
         if key not in self.wiki_pages_current:
             if key in self.wiki_pages_versions:
                 version = len(self.wiki_pages_versions[key]) + 1
@@ -2288,7 +2651,6 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             current = NodeWikiPage.load(self.wiki_pages_current[key])
             current.is_current = False
             version = current.version + 1
-            current.save()
 
         new_page = NodeWikiPage(
             page_name=name,
@@ -2300,6 +2662,10 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         )
         new_page.save()
 
+        # Versions shared with forks and registrations are kept in full
+        if current and not current.compress(new_page):
+            current.save()
+
         # check if the wiki page already exists in versions (existed once and is now deleted)
         if key not in self.wiki_pages_versions:
             self.wiki_pages_versions[key] = []
@@ -2476,6 +2842,19 @@ def validate_visible_contributors(schema, instance):
             )
 
 
+@Node.subscribe('save')
+def update_cocontributors(schema, instance, fields_changed, cached_data):
+    """Keep co-contributor counts in sync with the contributors of a node.
+
+    """
+    if 'contributors' not in fields_changed:
+        return
+    update_cocontributor_counts(
+        set(cached_data.get('contributors') or []),
+        set(instance.contributors._to_primary_keys()),
+    )
+
+
 class WatchConfig(StoredObject):
 
     _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
@@ -2519,6 +2898,14 @@ class PrivateLink(StoredObject):
             node_type = "reg-component" if node.is_registration else "component"
         return "/static/img/hgrid/{0}.png".format(node_type)
 
+    def save(self, *args, **kwargs):
+        saved_fields = super(PrivateLink, self).save(*args, **kwargs)
+        if {'is_deleted', 'key', 'nodes'}.intersection(saved_fields):
+            # Avoid circular import
+            from website.addons.base import invalidate_auth_cache
+            invalidate_auth_cache()
+        return saved_fields
+
     def to_json(self):
         return {
             "id": self._id,
@@ -2530,3 +2917,208 @@ class PrivateLink(StoredObject):
                       for x in self.nodes if not x.is_deleted],
             "anonymous": self.anonymous
         }
+
+
+class ForkJob(StoredObject):
+    """Progress of a fork running in the background. Forks are created
+    bottom-up, so `fork_ids` lists the forks saved so far, components first.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+
+    _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
+    date_created = fields.DateTimeField(auto_now_add=datetime.datetime.utcnow)
+    date_modified = fields.DateTimeField(auto_now=datetime.datetime.utcnow)
+
+    node = fields.ForeignField('node')
+    user = fields.ForeignField('user')
+    fork = fields.ForeignField('node')
+
+    status = fields.StringField(default=PENDING)
+    total = fields.IntegerField(default=0)
+    fork_ids = fields.StringField(list=True)
+    # Status messages from add-ons, shown once the fork is complete
+    messages = fields.StringField(list=True)
+    error = fields.StringField()
+
+    @property
+    def completed(self):
+        return len(self.fork_ids)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.COMPLETE, self.FAILED)
+
+    def add_fork(self, forked):
+        self.fork_ids.append(forked._id)
+        self.save()
+
+    def run(self):
+        """Fork the node. On failure, forks already saved are deleted so that
+        a partial tree is never shown.
+        """
+        if self.status != self.PENDING:
+            return
+        self.status = self.RUNNING
+        self.save()
+        try:
+            fork = self.node.fork_node(Auth(user=self.user), job=self)
+        except Exception as error:
+            log_exception()
+            self.fail(error)
+            return
+        self.fork = fork
+        self.status = self.COMPLETE
+        self.save()
+
+    def fail(self, error):
+        if self.fork_ids:
+            Node._storage[0].store.update(
+                {'_id': {'$in': list(self.fork_ids)}},
+                {'$set': {'is_deleted': True}},
+                multi=True,
+            )
+            Node._clear_caches()
+        self.status = self.FAILED
+        if isinstance(error, PermissionsError):
+            self.error = 'You do not have permission to fork this project'
+        else:
+            self.error = 'Forking failed'
+        self.save()
+
+    def to_json(self):
+        return {
+            'id': self._id,
+            'status': self.status,
+            'total': self.total,
+            'completed': self.completed,
+            'url': self.fork.url if self.fork else None,
+            'error': self.error,
+        }
+
+
+class RegistrationJob(StoredObject):
+    """Copies add-ons to a registration and indexes it for search, after
+    `Node.snapshot_registration` has created the registration. Each stage is
+    retried independently; work completed by an earlier attempt is skipped.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+
+    STAGES = ('addons', 'search')
+
+    __indices__ = [
+        {
+            'key_or_list': [
+                ('nodes.registration', pymongo.ASCENDING),
+            ],
+        },
+    ]
+
+    _id = fields.StringField(primary=True, default=lambda: str(ObjectId()))
+    date_created = fields.DateTimeField(auto_now_add=datetime.datetime.utcnow)
+    date_modified = fields.DateTimeField(auto_now=datetime.datetime.utcnow)
+
+    registration = fields.ForeignField('node')
+    user = fields.ForeignField('user')
+
+    # One entry per registered node, parents first: the IDs of the
+    # registration and its original, snapshots of the original's add-ons
+    # keyed by short name, and the add-ons copied so far
+    nodes = fields.DictionaryField(list=True)
+    # Maps stage names to dicts with `status`, `attempts` and `error`
+    stages = fields.DictionaryField()
+    messages = fields.StringField(list=True)
+
+    @property
+    def status(self):
+        statuses = [
+            self.stages.get(stage, {}).get('status', self.PENDING)
+            for stage in self.STAGES
+        ]
+        if self.FAILED in statuses:
+            return self.FAILED
+        if all(each == self.COMPLETE for each in statuses):
+            return self.COMPLETE
+        if all(each == self.PENDING for each in statuses):
+            return self.PENDING
+        return self.RUNNING
+
+    def run(self):
+        """Run each stage that has not completed.
+
+        :raises: Error raised by a stage; the stage is marked as failed
+        """
+        for stage in self.STAGES:
+            state = self.stages.setdefault(stage, {'status': self.PENDING, 'attempts': 0})
+            if state['status'] == self.COMPLETE:
+                continue
+            state['status'] = self.RUNNING
+            state['attempts'] += 1
+            state['error'] = None
+            self.save()
+            try:
+                getattr(self, '_run_{0}'.format(stage))()
+            except Exception as error:
+                state['status'] = self.FAILED
+                state['error'] = repr(error)
+                self.save()
+                raise
+            state['status'] = self.COMPLETE
+            self.save()
+
+    def _run_addons(self):
+        user = self.user
+        for entry in self.nodes:
+            original = Node.load(entry['original'])
+            registered = Node.load(entry['registration'])
+            for addon in original.get_addons():
+                short_name = addon.config.short_name
+                if short_name in entry['copied']:
+                    continue
+                snapshot = entry['addons'].get(short_name)
+                if snapshot is None:
+                    _, message = addon.after_register(original, registered, user)
+                else:
+                    _, message = addon.after_register(
+                        original, registered, user, snapshot=snapshot,
+                    )
+                if message:
+                    self.messages.append(message)
+                # Record progress so that a retry does not copy twice
+                entry['copied'].append(short_name)
+                self.save()
+
+    def _run_search(self):
+        from website.search import search
+        for entry in self.nodes:
+            search.update_node(Node.load(entry['registration']))
+
+    @classmethod
+    def find_for_registration(cls, node):
+        """Find the job for a registration or one of its components.
+
+        :return: `RegistrationJob` or `None`
+        """
+        record = cls._storage[0].store.find_one(
+            {'nodes.registration': node._id},
+            {'_id': True},
+        )
+        return cls.load(record['_id']) if record else None
+
+    def to_json(self):
+        return {
+            'id': self._id,
+            'status': self.status,
+            'stages': dict(
+                (stage, self.stages.get(stage, {'status': self.PENDING, 'attempts': 0}))
+                for stage in self.STAGES
+            ),
+            'url': self.registration.url,
+        }
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+from framework.tasks import app
+from framework.tasks.handlers import queued_task
+
+
+@queued_task
+@app.task(bind=True, max_retries=5, default_retry_delay=5)
+def fork_node(self, job_id):
+    """Run a fork in the background; see `ForkJob`. Each node is saved as it
+    is forked, so that progress is visible while the job runs.
+    """
+    # Avoid circular imports
+    from website.project.model import ForkJob
+    job = ForkJob.load(job_id)
+    if job is None:
+        # The request that created the job may not have committed yet
+        raise self.retry()
+    job.run()
+
+
+@queued_task
+@app.task(bind=True, max_retries=5, default_retry_delay=60)
+def complete_registration(self, job_id):
+    """Copy add-ons to a registration and index it for search; see
+    `RegistrationJob`. Failed stages are retried, resuming where the previous
+    attempt stopped.
+    """
+    # Avoid circular imports
+    from website.project.model import RegistrationJob
+    job = RegistrationJob.load(job_id)
+    if job is None:
+        # The request that created the job may not have committed yet
+        raise self.retry()
+    try:
+        job.run()
+    except Exception as error:
+        raise self.retry(exc=error)
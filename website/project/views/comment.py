@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
-import collections
 import httplib as http
 import pytz
 
 from flask import request
 from modularodm import Q
 
+from framework.auth import User
 from framework.exceptions import HTTPError
 from framework.auth.decorators import must_be_logged_in
 from framework.auth.utils import privacy_info_handle
@@ -30,28 +30,18 @@ def resolve_target(node, guid):
     return target.referent
 
 
-def collect_discussion(target, users=None):
-
-    users = users or collections.defaultdict(list)
-    for comment in getattr(target, 'commented', []):
-        if not comment.is_deleted:
-            users[comment.user].append(comment)
-        collect_discussion(comment, users=users)
-    return users
-
-
 @must_be_contributor_or_public
 def comment_discussion(**kwargs):
 
     node = kwargs['node'] or kwargs['project']
     auth = kwargs['auth']
-    users = collect_discussion(node)
+    counts = Comment.get_user_counts(node)
     anonymous = has_anonymous_link(node, auth)
     # Sort users by comment frequency
     # TODO: Allow sorting by recency, combination of frequency and recency
     sorted_users = sorted(
-        users.keys(),
-        key=lambda item: len(users[item]),
+        User.find(Q('_id', 'in', counts.keys())),
+        key=lambda item: counts[item._id],
         reverse=True,
     )
 
@@ -75,7 +65,9 @@ def comment_discussion(**kwargs):
     }
 
 
-def serialize_comment(comment, auth, anonymous=False):
+def serialize_comment(comment, auth, anonymous=False, has_children=None):
+    if has_children is None:
+        has_children = bool(getattr(comment, 'commented', []))
     return {
         'id': comment._id,
         'author': {
@@ -95,7 +87,7 @@ def serialize_comment(comment, auth, anonymous=False):
         'dateCreated': comment.date_created.isoformat(),
         'dateModified': comment.date_modified.isoformat(),
         'content': comment.content,
-        'hasChildren': bool(getattr(comment, 'commented', [])),
+        'hasChildren': has_children,
         'canEdit': comment.user == auth.user,
         'modified': comment.modified,
         'isDeleted': comment.is_deleted,
@@ -103,12 +95,17 @@ def serialize_comment(comment, auth, anonymous=False):
     }
 
 
-def serialize_comments(record, auth, anonymous=False):
+def serialize_comments(record, auth, anonymous=False, cursor=None, size=None):
+    """Serialize a page of the comments posted on `record`.
 
+    :return: Tuple of (list of serialized comments, next cursor or `None`)
+    """
+    comments, next_cursor = Comment.find_page(record, cursor=cursor, size=size)
+    parents = Comment.find_parents(comments)
     return [
-        serialize_comment(comment, auth, anonymous)
-        for comment in getattr(record, 'commented', [])
-    ]
+        serialize_comment(comment, auth, anonymous, has_children=comment._id in parents)
+        for comment in comments
+    ], next_cursor
 
 
 def kwargs_to_comment(kwargs, owner=False):
@@ -200,28 +197,70 @@ def list_comments(auth, **kwargs):
     anonymous = has_anonymous_link(node, auth)
     guid = request.args.get('target')
     target = resolve_target(node, guid)
-    serialized_comments = serialize_comments(target, auth, anonymous)
+    cursor, size = get_page_args(request.args)
+    serialized_comments, next_cursor = serialize_comments(
+        target, auth, anonymous, cursor=cursor, size=size,
+    )
     n_unread = 0
 
-    if node.is_contributor(auth.user):
-        if auth.user.comments_viewed_timestamp is None:
-            auth.user.comments_viewed_timestamp = {}
-            auth.user.save()
+    if node.is_contributor(auth.user) and not is_reply(target):
         n_unread = n_unread_comments(target, auth.user)
     return {
         'comments': serialized_comments,
+        'nextCursor': next_cursor._id if next_cursor else None,
         'nUnread': n_unread
     }
 
 
+def get_page_args(args):
+    """Parse the optional `cursor` and `size` pagination arguments. Without
+    `size`, all comments are returned.
+    """
+    cursor = None
+    if args.get('cursor'):
+        cursor = Comment.load(args['cursor'])
+        if cursor is None:
+            raise HTTPError(http.BAD_REQUEST)
+    size = args.get('size')
+    if size is not None:
+        try:
+            size = int(size)
+        except ValueError:
+            raise HTTPError(http.BAD_REQUEST)
+        if size < 1:
+            raise HTTPError(http.BAD_REQUEST)
+        size = min(size, settings.COMMENT_MAX_PAGE_SIZE)
+    return cursor, size
+
+
 def n_unread_comments(node, user):
-    """Return the number of unread comments on a node for a user."""
-    default_timestamp = datetime(1970, 1, 1, 12, 0, 0)
-    view_timestamp = user.comments_viewed_timestamp.get(node._id, default_timestamp)
-    return Comment.find(Q('node', 'eq', node) &
-                        Q('user', 'ne', user) &
-                        Q('date_created', 'gt', view_timestamp) &
-                        Q('date_modified', 'gt', view_timestamp)).count()
+    """Return the number of unread comments on a node for a user. Counters
+    are kept up to date as comments are added; a user's counter is computed
+    from their view timestamp the first time it is read.
+    """
+    n_unread = Comment.get_unread_count(node, user)
+    if n_unread is None:
+        default_timestamp = datetime(1970, 1, 1, 12, 0, 0)
+        view_timestamp = (user.comments_viewed_timestamp or {}).get(node._id, default_timestamp)
+        n_unread = Comment.find(Q('node', 'eq', node) &
+                                Q('user', 'ne', user) &
+                                Q('date_created', 'gt', view_timestamp) &
+                                Q('date_modified', 'gt', view_timestamp)).count()
+        Comment.set_unread_count(node, user, n_unread)
+    return n_unread
+
+
+@must_be_logged_in
+@must_be_contributor_or_public
+def view_unread_comments(auth, **kwargs):
+    """Return the number of unread comments on a node without loading any
+    comments, e.g. for polling.
+    """
+    node = kwargs['node'] or kwargs['project']
+    n_unread = 0
+    if node.is_contributor(auth.user):
+        n_unread = n_unread_comments(node, auth.user)
+    return {'nUnread': n_unread}
 
 
 @must_be_logged_in
@@ -276,9 +315,11 @@ def update_comments_timestamp(auth, **kwargs):
     node = kwargs['node'] or kwargs['project']
 
     if node.is_contributor(auth.user):
+        if auth.user.comments_viewed_timestamp is None:
+            auth.user.comments_viewed_timestamp = {}
         auth.user.comments_viewed_timestamp[node._id] = datetime.utcnow()
         auth.user.save()
-        list_comments(**kwargs)
+        Comment.set_unread_count(node, auth.user, 0)
         return {node._id: auth.user.comments_viewed_timestamp[node._id].isoformat()}
     else:
         return {}
@@ -2,9 +2,9 @@
 import time
 import itertools
 import httplib as http
-from collections import Counter
 
 from flask import request
+from modularodm import Q
 from modularodm.exceptions import ValidationValueError
 
 from framework import forms
@@ -150,22 +150,33 @@ def get_most_in_common_contributors(auth, **kwargs):
     except (TypeError, ValueError):
         n_contribs = settings.MAX_MOST_IN_COMMON_LENGTH
 
-    contrib_counts = Counter(contrib_id
-        for node in auth.user.node__contributed
-        for contrib_id in node.contributors._to_primary_keys()
-        if contrib_id not in node_contrib_ids)
-
-    active_contribs = itertools.ifilter(
-        lambda c: User.load(c[0]).is_active,
-        contrib_counts.most_common()
+    contrib_counts = sorted(
+        (
+            (contrib_id, count)
+            for contrib_id, count in auth.user.get_cocontributor_counts().iteritems()
+            if contrib_id not in node_contrib_ids
+        ),
+        key=lambda item: -item[1],
     )
 
-    limited = itertools.islice(active_contribs, n_contribs)
-
-    contrib_objs = [(User.load(_id), count) for _id, count in limited]
+    # Load candidates in batches until enough active users are found
+    contrib_objs = []
+    batch_size = max(n_contribs, 1) * 2
+    for start in xrange(0, len(contrib_counts), batch_size):
+        batch = dict(contrib_counts[start:start + batch_size])
+        users = User.find(Q('_id', 'in', batch.keys()))
+        contrib_objs.extend(
+            sorted(
+                ((user, batch[user._id]) for user in users if user.is_active),
+                key=lambda t: -t[1],
+            )
+        )
+        if len(contrib_objs) >= n_contribs:
+            break
+    contrib_objs = contrib_objs[:n_contribs]
 
     contribs = [
-        utils.add_contributor_json(most_contrib, auth.user)
+        utils.add_contributor_json(most_contrib, auth.user, n_projects_in_common=count)
         for most_contrib, count in sorted(contrib_objs, key=lambda t: (-t[1], t[0].fullname))
     ]
     return {'contributors': contribs}
@@ -9,7 +9,9 @@ from framework.auth.decorators import collect_auth
 from framework.transactions.handlers import no_auto_transaction
 
 
-from website.views import serialize_log, paginate
+from modularodm import Q
+
+from website.views import serialize_log, serialize_logs, paginate
 from website.project.model import NodeLog
 from website.project.model import has_anonymous_link
 from website.project.decorators import must_be_valid_project
@@ -40,8 +42,11 @@ def _get_logs(node, count, auth, link=None, page=0):
             boolean: if there are more logs
 
     """
-    logs = []
-    total = 0
+    log_ids = node.logs._to_primary_keys()
+    # Load all of the node's logs in one query; later lookups by id are
+    # served from the ODM cache
+    list(NodeLog.find(Q('_id', 'in', log_ids)))
+    visible = []
     for log in reversed(node.logs):
         # A number of errors due to database inconsistency can arise here. The
         # log can be None; its `node__logged` back-ref can be empty, and the
@@ -49,15 +54,20 @@ def _get_logs(node, count, auth, link=None, page=0):
         if log:
             log_node = log.resolve_node(node)
             if log.can_view(node, auth):
-                total += 1
-                anonymous = has_anonymous_link(log_node, auth)
-                logs.append(serialize_log(log, anonymous))
+                visible.append((log, has_anonymous_link(log_node, auth)))
         else:
             logger.warn('Log on node {} is None'.format(node._id))
 
-    paginated_logs, pages = paginate(logs, total, page, count)
+    total = len(visible)
+    paginated, pages = paginate(visible, total, page, count)
+    paginated = list(paginated)
+    # Only the requested page is serialized
+    paginated_logs = serialize_logs(
+        [log for log, _ in paginated],
+        anonymous=[anonymous for _, anonymous in paginated],
+    )
 
-    return list(paginated_logs), total, pages
+    return paginated_logs, total, pages
 
 
 @no_auto_transaction
@@ -12,7 +12,7 @@ from framework import status
 from framework.utils import iso8601format
 from framework.mongo import StoredObject
 from framework.auth.decorators import must_be_logged_in, collect_auth
-from framework.exceptions import HTTPError, PermissionsError
+from framework.exceptions import HTTPError
 from framework.mongo.utils import from_mongo
 
 from website import language
@@ -31,11 +31,12 @@ from website.project.decorators import (
 from website.util.rubeus import collect_addon_js
 from website.project.model import has_anonymous_link, get_pointer_parent
 from website.project.forms import NewNodeForm
-from website.models import Node, Pointer, WatchConfig, PrivateLink
+from website.models import Node, Pointer, WatchConfig, PrivateLink, ForkJob
 from website import settings
 from website.views import _render_nodes, find_dashboard
 from website.profile import utils
 from website.project import new_folder
+from website.project import tasks
 from website.util.sanitize import strip_html
 
 logger = logging.getLogger(__name__)
@@ -265,15 +266,47 @@ def node_fork_page(**kwargs):
             http.METHOD_NOT_ALLOWED,
             redirect_url=node_to_use.url
         )
-    try:
-        fork = node_to_use.fork_node(auth)
-    except PermissionsError:
+    if not node_to_use.can_fork(auth.user):
         raise HTTPError(
             http.FORBIDDEN,
             redirect_url=node_to_use.url
         )
 
-    return fork.url
+    # Fork in the background; the client polls `status_url` until the job
+    # is finished
+    job = ForkJob(node=node_to_use, user=auth.user)
+    job.save()
+    tasks.fork_node(job._id)
+
+    return _serialize_fork_job(job, node_to_use)
+
+
+def _serialize_fork_job(job, node):
+    ret = job.to_json()
+    ret['status_url'] = node.api_url_for('node_fork_status', job_id=job._id)
+    return ret
+
+
+@must_be_logged_in
+@must_be_valid_project
+def node_fork_status(job_id, **kwargs):
+    node = kwargs['node'] or kwargs['project']
+    auth = kwargs['auth']
+
+    job = ForkJob.load(job_id)
+    if job is None or job.node != node:
+        raise HTTPError(http.NOT_FOUND)
+    if job.user != auth.user:
+        raise HTTPError(http.FORBIDDEN)
+
+    # Show add-on messages on the page the user is redirected to
+    if job.status == ForkJob.COMPLETE and job.messages:
+        for message in job.messages:
+            status.push_status_message(message)
+        job.messages = []
+        job.save()
+
+    return _serialize_fork_job(job, node)
 
 
 @must_be_valid_project
@@ -7,6 +7,7 @@ from flask import redirect
 from modularodm import Q
 from modularodm.exceptions import NoResultsFound
 
+from framework import status
 from framework.exceptions import HTTPError
 from framework.mongo.utils import to_mongo
 from framework.forms.utils import process_payload, unprocess_payload
@@ -19,9 +20,11 @@ from website.project.decorators import (
 from website.identifiers.model import Identifier
 from website.identifiers.metadata import datacite_metadata_for_node
 from website.project.metadata.schemas import OSF_META_SCHEMAS
+from website.project import tasks
 from website.util.permissions import ADMIN
 from website.models import MetaSchema
 from website.models import NodeLog
+from website.models import RegistrationJob
 from website import language
 
 from website.identifiers.client import EzidClient
@@ -157,16 +160,39 @@ def node_register_template_page_post(auth, **kwargs):
     schema = MetaSchema.find(
         Q('name', 'eq', template)
     ).sort('-schema_version')[0]
-    register = node.register_node(
+    # Create the registration now; copy add-ons and update search later
+    job = node.snapshot_registration(
         schema, auth, template, json.dumps(clean_data),
     )
+    tasks.complete_registration(job._id)
 
+    # The client polls `status_url` until add-ons have been copied
     return {
         'status': 'success',
-        'result': register.url,
+        'result': job.registration.url,
+        'status_url': job.registration.api_url_for('node_registration_status'),
     }, http.CREATED
 
 
+@must_be_valid_project
+@must_be_contributor_or_public
+def node_registration_status(auth, **kwargs):
+    node = kwargs['node'] or kwargs['project']
+    job = RegistrationJob.find_for_registration(node)
+    if job is None:
+        raise HTTPError(http.NOT_FOUND)
+
+    # Show add-on messages to the registering user on the page they are
+    # redirected to
+    if job.status == RegistrationJob.COMPLETE and job.messages and job.user == auth.user:
+        for message in job.messages:
+            status.push_status_message(message)
+        job.messages = []
+        job.save()
+
+    return job.to_json()
+
+
 def _build_ezid_metadata(node):
     """Build metadata for submission to EZID using the DataCite profile. See
     http://ezid.cdlib.org/doc/apidoc.html for details.
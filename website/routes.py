@@ -348,6 +348,16 @@ def make_url_map(app):
             json_renderer,
         ),
 
+        Rule(
+            [
+                '/project/<pid>/comments/unread/',
+                '/project/<pid>/node/<nid>/comments/unread/',
+            ],
+            'get',
+            project_views.comment.view_unread_comments,
+            json_renderer,
+        ),
+
         Rule(
             [
                 '/project/<pid>/comment/<cid>/report/',
@@ -1141,6 +1151,12 @@ def make_url_map(app):
                 '/project/<pid>/node/<nid>/fork/',
             ], 'post', project_views.node.node_fork_page, json_renderer,
         ),
+        Rule(
+            [
+                '/project/<pid>/fork/<job_id>/',
+                '/project/<pid>/node/<nid>/fork/<job_id>/',
+            ], 'get', project_views.node.node_fork_status, json_renderer,
+        ),
         Rule(
             [
                 '/project/<pid>/pointer/fork/',
@@ -1169,6 +1185,11 @@ def make_url_map(app):
             '/project/<pid>/node/<nid>/register/<template>/',
         ], 'post', project_views.register.node_register_template_page_post, json_renderer),
 
+        Rule([
+            '/project/<pid>/registration/status/',
+            '/project/<pid>/node/<nid>/registration/status/',
+        ], 'get', project_views.register.node_registration_status, json_renderer),
+
         Rule(
             [
                 '/project/<pid>/identifiers/',
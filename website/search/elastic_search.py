@@ -10,6 +10,8 @@ import unicodedata
 
 import six
 
+from modularodm import Q
+
 from elasticsearch import (
     Elasticsearch,
     RequestError,
@@ -364,19 +366,26 @@ def search_contributor(query, page=0, size=10, exclude=[], current_user=None):
     docs = results['results']
     pages = math.ceil(results['counts'].get('user', 0) / size)
 
+    # Look up shared project counts once rather than per result
+    counts_in_common = current_user.get_cocontributor_counts() if current_user else {}
+    loaded = dict(
+        (user._id, user)
+        for user in User.find(Q('_id', 'in', [doc['id'] for doc in docs]))
+    )
+
     users = []
     for doc in docs:
         # TODO: use utils.serialize_user
-        user = User.load(doc['id'])
-
-        if current_user:
-            n_projects_in_common = current_user.n_projects_in_common(user)
-        else:
-            n_projects_in_common = 0
+        user = loaded.get(doc['id'])
 
         if user is None:
             logger.error('Could not load user {0}'.format(doc['id']))
             continue
+
+        if current_user == user:
+            n_projects_in_common = current_user.n_projects_in_common(user)
+        else:
+            n_projects_in_common = counts_in_common.get(user._id, 0)
         if user.is_active:  # exclude merged, unregistered, etc.
             current_employment = None
             education = None
@@ -94,6 +94,9 @@ MAILGUN_API_KEY = None
 UPLOADS_PATH = os.path.join(BASE_PATH, 'uploads')
 MFR_CACHE_PATH = os.path.join(BASE_PATH, 'mfrcache')
 MFR_TEMP_PATH = os.path.join(BASE_PATH, 'mfrtemp')
+# Rendered output shared by files with identical contents, bounded in bytes
+MFR_RENDER_CACHE_PATH = os.path.join(BASE_PATH, 'mfrrendercache')
+MFR_RENDER_CACHE_MAX_BYTES = 5 * 1024 ** 3
 
 # Use Celery for file rendering
 USE_CELERY = True
@@ -104,6 +107,30 @@ USE_GNUPG = True
 # File rendering timeout (in ms)
 MFR_TIMEOUT = 30000
 
+# Render locks: one worker renders a file version at a time. Set backend to
+# 'local' to use an in-process lock (development only)
+MFR_RENDER_LOCK_BACKEND = 'mongo'
+# Seconds after which a render lease is considered abandoned
+MFR_RENDER_LEASE_TIMEOUT = 300
+
+# Chunk sizes (in bytes) for downloading render sources and streaming output
+MFR_MIN_CHUNK_SIZE = 64 * 1024
+MFR_MAX_CHUNK_SIZE = 1024 * 1024
+MFR_STREAM_CHUNK_SIZE = 64 * 1024
+# Rendered output larger than this is loaded by the client rather than inlined
+# in the file page
+MFR_INLINE_RENDER_MAX_BYTES = 1024 * 1024
+# Let the proxy serve cached renders: None, 'X-Accel-Redirect' (nginx; requires
+# an internal location mapping MFR_ACCEL_REDIRECT_PREFIX to MFR_CACHE_PATH) or
+# 'X-Sendfile' (Apache)
+MFR_SENDFILE_HEADER = None
+MFR_ACCEL_REDIRECT_PREFIX = '/protected/mfrcache/'
+
+# Renders of files up to this many bytes use the small-file queue
+MFR_SMALL_FILE_SIZE = 1024 * 1024
+MFR_SMALL_RENDER_QUEUE = 'render_small'
+MFR_LARGE_RENDER_QUEUE = 'render_large'
+
 # TODO: Override in local.py in production
 DB_HOST = 'localhost'
 DB_PORT = os_env.get('OSF_DB_PORT', 27017)
@@ -126,6 +153,8 @@ SHORT_DOMAIN = 'osf.io'
 
 # TODO: Combine Python and JavaScript config
 COMMENT_MAXLENGTH = 500
+# Maximum number of comments returned per page
+COMMENT_MAX_PAGE_SIZE = 100
 
 # Gravatar options
 GRAVATAR_SIZE_PROFILE = 70
@@ -174,6 +203,7 @@ CELERY_IMPORTS = (
     'framework.email.tasks',
     'framework.render.tasks',
     'framework.analytics.tasks',
+    'website.project.tasks',
     'website.mailchimp_utils',
     'scripts.send_digest'
 )
@@ -205,6 +235,12 @@ PIWIK_HOST = None
 PIWIK_ADMIN_TOKEN = None
 PIWIK_SITE_ID = None
 
+# Page counters: merge increments in memory and flush once per interval (in
+# seconds) or once this many distinct pages are pending
+ANALYTICS_BUFFER_COUNTERS = True
+ANALYTICS_BUFFER_INTERVAL = 10
+ANALYTICS_BUFFER_MAX_KEYS = 500
+
 SENTRY_DSN = None
 SENTRY_DSN_JS = None
 
@@ -225,6 +261,16 @@ DISK_SAVING_MODE = False
 # Add Contributors (most in common)
 MAX_MOST_IN_COMMON_LENGTH = 15
 
+# Number of GUID keys each process checks for availability at a time
+GUID_BLOCK_SIZE = 50
+# Per-process cache of GUID resolutions used by short URLs. Entries are dropped
+# locally when their referent is deleted or its URL changes, and expire after
+# GUID_CACHE_TTL seconds so that changes made by other processes show up;
+# unknown GUIDs are remembered for GUID_CACHE_MISS_TTL seconds
+GUID_CACHE_SIZE = 10000
+GUID_CACHE_TTL = 300
+GUID_CACHE_MISS_TTL = 10
+
 # Google Analytics
 GOOGLE_ANALYTICS_ID = None
 GOOGLE_SITE_VERIFICATION = None
@@ -236,6 +282,36 @@ DEFAULT_HMAC_SECRET = 'changeme'
 DEFAULT_HMAC_ALGORITHM = hashlib.sha256
 WATERBUTLER_URL = 'http://localhost:7777'
 WATERBUTLER_ADDRS = ['127.0.0.1']
+# Per-process cache of file metadata from WaterButler; entries for mutable
+# files expire after WATERBUTLER_METADATA_TTL seconds
+WATERBUTLER_METADATA_CACHE_SIZE = 1000
+WATERBUTLER_METADATA_TTL = 30
+# Per-process cache of WaterButler auth responses, keyed by session, node,
+# provider and permission. Entries are dropped locally on permission, privacy,
+# credential and login changes, and expire after WATERBUTLER_AUTH_CACHE_TTL
+# seconds so that changes made by other processes show up
+WATERBUTLER_AUTH_CACHE_SIZE = 10000
+WATERBUTLER_AUTH_CACHE_TTL = 30
+# Logs of consecutive file actions by the same user on a node, each within
+# FILE_LOG_COALESCE_WINDOW seconds of the previous one, are merged into a single
+# log listing up to FILE_LOG_COALESCE_MAX_FILES further files
+FILE_LOG_COALESCE_WINDOW = 60
+FILE_LOG_COALESCE_MAX_FILES = 1000
+
+# Per-process HTTP connection pools for requests to WaterButler and add-on
+# providers: number of hosts and keep-alive connections per host in each
+# provider's pool, default (connect, read) timeout in seconds, and retries of
+# failed connections with exponential backoff
+EXTERNAL_HTTP_POOL_HOSTS = 10
+EXTERNAL_HTTP_POOL_SIZE = 10
+EXTERNAL_HTTP_TIMEOUT = (5, 60)
+EXTERNAL_HTTP_RETRIES = 3
+EXTERNAL_HTTP_BACKOFF = 0.5
+
+# Citation add-ons (Mendeley, Zotero): seconds to cache the folder tree of each
+# connected account, and citations listed per page of a folder
+CITATION_FOLDER_CACHE_TTL = 600
+CITATION_PAGE_SIZE = 50
 
 # Test identifier namespaces
 DOI_NAMESPACE = 'doi:10.5072/FK2'
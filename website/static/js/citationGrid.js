@@ -204,6 +204,33 @@ var renderActions = function(item, col) {
             });
         }
     } else if (item.kind === 'folder' && item.open && item.children.length) {
+        buttons.push({
+            name: '',
+            icon: 'fa fa-refresh',
+            css: 'btn btn-default btn-xs',
+            tooltip: 'Refresh folders',
+            onclick: function(event) {
+                self.refreshing = true;
+                delete self.remaining[item.id];
+                delete self.bibliographies[item.id];
+                delete self.bibliographies[item.id + ':all'];
+                self.treebeard.tbController.updateFolder(null, item);
+            }
+        });
+        // Only the loaded pages of a folder are in the grid; the rest must be
+        // loaded before the folder can be exported
+        if (self.getNextPage(item) && !self.remaining[item.id]) {
+            buttons.push({
+                name: '',
+                icon: self.loading[item.id] ? 'fa fa-spinner fa-spin' : 'fa fa-ellipsis-h',
+                css: 'btn btn-default btn-xs',
+                tooltip: 'Load all citations to copy or download them',
+                onclick: function(event) {
+                    self.loadRemaining(item);
+                }
+            });
+            return makeButtons(item, col, buttons);
+        }
         buttons.push({
             name: '',
             icon: 'fa fa-file-o',
@@ -262,6 +289,10 @@ var CitationGrid = function(provider, gridSelector, styleSelector, apiUrl) {
     self.styleName = 'apa';
     self.styleXml = apaStyle;
     self.bibliographies = {};
+    self.refreshing = false;
+    // CSL of citations on pages not loaded into the grid, keyed by folder id
+    self.remaining = {};
+    self.loading = {};
 
     self.initTreebeard();
     self.initStyleSelect();
@@ -273,7 +304,13 @@ CitationGrid.prototype.initTreebeard = function() {
             divID: self.gridSelector.replace('#', ''),
             filesData: self.apiUrl,
             resolveLazyloadUrl: function(item) {
-                return item.data.urls.fetch;
+                var url = item.data.urls.fetch;
+                // Bypass the cached folder tree once after a manual refresh
+                if (self.refreshing) {
+                    self.refreshing = false;
+                    url += (url.indexOf('?') === -1 ? '?' : '&') + 'refresh=true';
+                }
+                return url;
             },
             // Wrap callback in closure to preserve intended `this`
             resolveRows: function() {
@@ -285,20 +322,6 @@ CitationGrid.prototype.initTreebeard = function() {
         },
         treebeardOptions
     );
-    var preprocess = options.lazyLoadPreprocess;
-    options.lazyLoadPreprocess = function(data){
-        data = preprocess(data);
-        // TODO remove special case for Zotero
-        if (self.provider === 'Zotero') {
-            if (data.length >= 200) {
-        data.push({
-                    name: 'Only 200 citations may be displayed',
-                    kind: 'message'
-                });
-            }
-        }
-        return data;
-    };
     self.treebeard = new Treebeard(options);
 };
 
@@ -347,14 +370,66 @@ CitationGrid.prototype.updateStyle = function(name, xml) {
     this.treebeard.tbController.redraw();
 };
 
-CitationGrid.prototype.makeBibliography = function(folder) {
-    var data = objectify(
-        folder.children.filter(function(child) {
-            return child.kind === 'file';
-        }).map(function(child) {
-            return child.data.csl;
-        })
-    );
+CitationGrid.prototype.getNextPage = function(folder) {
+    var pages = folder.children.filter(function(child) {
+        return child.kind === 'folder' && child.data.page;
+    });
+    return pages.length ? pages[0] : null;
+};
+
+/**
+ * Fetch the pages of `folder` after the loaded ones, following each page's
+ * placeholder to the next, and keep their citations for export.
+ */
+CitationGrid.prototype.loadRemaining = function(folder) {
+    var self = this;
+    if (self.loading[folder.id]) {
+        return;
+    }
+    self.loading[folder.id] = true;
+    var csl = [];
+    var fetchPage = function(url) {
+        $.getJSON(url).done(function(response) {
+            var next = null;
+            $.each(response.contents, function(idx, child) {
+                if (child.kind === 'file') {
+                    csl.push(child.csl);
+                } else if (child.page) {
+                    next = child.urls.fetch;
+                }
+            });
+            if (next) {
+                fetchPage(next);
+            } else {
+                self.loading[folder.id] = false;
+                self.remaining[folder.id] = csl;
+                delete self.bibliographies[folder.id + ':all'];
+                self.treebeard.tbController.redraw();
+            }
+        }).fail(function(jqxhr, status, error) {
+            self.loading[folder.id] = false;
+            self.treebeard.tbController.redraw();
+            Raven.captureMessage('Error while loading citations', {
+                url: url,
+                status: status,
+                error: error
+            });
+        });
+    };
+    fetchPage(self.getNextPage(folder).data.urls.fetch);
+    self.treebeard.tbController.redraw();
+};
+
+CitationGrid.prototype.getLoadedCsl = function(folder) {
+    return folder.children.filter(function(child) {
+        return child.kind === 'file';
+    }).map(function(child) {
+        return child.data.csl;
+    });
+};
+
+CitationGrid.prototype.makeBibliography = function(csl) {
+    var data = objectify(csl);
     var citeproc = citations.makeCiteproc(this.styleXml, data, 'text');
     var bibliography = citeproc.makeBibliography();
     if (bibliography[0].entry_ids) {
@@ -369,7 +444,8 @@ CitationGrid.prototype.makeBibliography = function(folder) {
 };
 
 CitationGrid.prototype.getBibliography = function(folder) {
-    this.bibliographies[folder.id] = this.bibliographies[folder.id] || this.makeBibliography(folder);
+    this.bibliographies[folder.id] = this.bibliographies[folder.id] ||
+        this.makeBibliography(this.getLoadedCsl(folder));
     return this.bibliographies[folder.id];
 };
 
@@ -378,12 +454,17 @@ CitationGrid.prototype.getCitation = function(item) {
     return bibliography[item.data.csl.id];
 };
 
+/**
+ * Format every citation in `folder`, including those on pages fetched by
+ * `loadRemaining` but not loaded into the grid.
+ */
 CitationGrid.prototype.getCitations = function(folder) {
-    var self = this;
-    return folder.children.filter(function(child) {
-        return child.kind === 'file';
-    }).map(function(child) {
-        return self.getCitation(child);
+    var csl = this.getLoadedCsl(folder).concat(this.remaining[folder.id] || []);
+    var key = folder.id + ':all';
+    this.bibliographies[key] = this.bibliographies[key] || this.makeBibliography(csl);
+    var bibliography = this.bibliographies[key];
+    return csl.map(function(each) {
+        return bibliography[each.id];
     });
 };
 
@@ -147,7 +147,6 @@ BaseComment.prototype.fetch = function() {
                     return new CommentModel(comment, self, self.$root);
                 })
             );
-            self.unreadComments(response.nUnread);
             deferred.resolve(self.comments());
             self._loaded = true;
         }
@@ -434,7 +433,8 @@ var CommentListModel = function(userName, canComment, hasChildren) {
     self.hasChildren = ko.observable(hasChildren);
     self.discussion = ko.observableArray();
 
-    self.fetch();
+    // Comments are loaded when the pane is first opened
+    self.fetchUnread();
     self.fetchDiscussion();
 
 };
@@ -443,6 +443,16 @@ CommentListModel.prototype = new BaseComment();
 
 CommentListModel.prototype.onSubmitSuccess = function() {};
 
+CommentListModel.prototype.fetchUnread = function() {
+    var self = this;
+    $.getJSON(
+        nodeApiUrl + 'comments/unread/',
+        function(response) {
+            self.unreadComments(response.nUnread);
+        }
+    );
+};
+
 CommentListModel.prototype.fetchDiscussion = function() {
     var self = this;
     $.getJSON(
@@ -464,7 +474,10 @@ CommentListModel.prototype.initListeners = function() {
 };
 
 var timestampUrl = nodeApiUrl + 'comments/timestamps/';
-var onOpen = function() {
+var onOpen = function(viewModel) {
+    if (!viewModel._loaded) {
+        viewModel.fetch();
+    }
     var request = osfHelpers.putJSON(timestampUrl);
     request.fail(function(xhr, textStatus, errorThrown) {
         Raven.captureMessage('Could not update comment timestamp', {
@@ -476,8 +489,12 @@ var onOpen = function() {
 };
 
 var init = function(selector, userName, canComment, hasChildren) {
-    new CommentPane(selector, {onOpen: onOpen});
     var viewModel = new CommentListModel(userName, canComment, hasChildren);
+    new CommentPane(selector, {
+        onOpen: function() {
+            onOpen(viewModel);
+        }
+    });
     var $elm = $(selector);
     if (!$elm.length) {
         throw('No results found for selector');
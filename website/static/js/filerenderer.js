@@ -11,7 +11,8 @@ var FileRenderer = {
     start: function(url, selector){
         this.url = url;
         this.tries = 0;
-        this.ALLOWED_RETRIES = 10;
+        // Renders are polled about once a second for up to a minute
+        this.ALLOWED_RETRIES = 60;
         this.element = $(selector);
         this.getCachedFromServer();
     },
@@ -6,6 +6,9 @@ var $osf = require('js/osfHelpers');
 
 var MetaData = require('../metadata_1.js');
 var ctx = window.contextVars;
+
+var REGISTRATION_POLL_INTERVAL = 2000;  // ms
+
 /**
     * Unblock UI and display error modal
     */
@@ -14,6 +17,26 @@ function registration_failed() {
     bootbox.alert('Registration failed');
 }
 
+/**
+    * Poll a registration until its add-ons have been copied, then go to the
+    * registration. Add-on messages are shown on the registration page. The
+    * registration already exists, so the user is redirected even if copying
+    * add-ons failed.
+    */
+function waitForRegistration(url, statusUrl) {
+    $.getJSON(statusUrl).done(function(job) {
+        if (job.status === 'complete' || job.status === 'failed') {
+            window.location.href = url;
+        } else {
+            setTimeout(function() {
+                waitForRegistration(url, statusUrl);
+            }, REGISTRATION_POLL_INTERVAL);
+        }
+    }).fail(function() {
+        window.location.href = url;
+    });
+}
+
 function registerNode(data) {
 
     // Block UI until request completes
@@ -28,7 +51,8 @@ function registerNode(data) {
         dataType: 'json'
     }).done(function(response) {
         if (response.status === 'success') {
-            window.location.href = response.result;
+            $osf.block('Registering...');
+            waitForRegistration(response.result, response.status_url);
         }
         else if (response.status === 'error') {
             registration_failed();
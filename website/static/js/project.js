@@ -32,6 +32,39 @@ NodeActions.beforeForkNode = function(url, done) {
     );
 };
 
+var FORK_POLL_INTERVAL = 2000;  // ms
+
+NodeActions.onForkFailed = function(response) {
+    $osf.unblock();
+    if (response.status === 403) {
+        $osf.growl('Sorry:', 'you do not have permission to fork this project');
+    } else {
+        $osf.growl('Error:', 'Forking failed');
+        Raven.captureMessage('Error occurred during forking');
+    }
+};
+
+// Poll a fork job until it finishes, then go to the fork
+NodeActions.waitForFork = function(job) {
+    if (job.status === 'complete') {
+        window.location = job.url;
+    } else if (job.status === 'failed') {
+        $osf.unblock();
+        $osf.growl('Error:', job.error || 'Forking failed');
+    } else {
+        if (job.total) {
+            $osf.block('Forking... (' + job.completed + ' of ' + job.total + ' components)');
+        }
+        setTimeout(function() {
+            $.getJSON(job.status_url).done(
+                NodeActions.waitForFork
+            ).fail(
+                NodeActions.onForkFailed
+            );
+        }, FORK_POLL_INTERVAL);
+    }
+};
+
 NodeActions.forkNode = function() {
     NodeActions.beforeForkNode(ctx.node.urls.api + 'fork/before/', function() {
         // Block page
@@ -40,17 +73,11 @@ NodeActions.forkNode = function() {
         $osf.postJSON(
             ctx.node.urls.api + 'fork/',
             {}
-        ).done(function(response) {
-            window.location = response;
-        }).fail(function(response) {
-            $osf.unblock();
-            if (response.status === 403) {
-                $osf.growl('Sorry:', 'you do not have permission to fork this project');
-            } else {
-                $osf.growl('Error:', 'Forking failed');
-                Raven.captureMessage('Error occurred during forking');
-            }
-        });
+        ).done(
+            NodeActions.waitForFork
+        ).fail(
+            NodeActions.onForkFailed
+        );
     });
 };
 
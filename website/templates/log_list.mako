@@ -52,6 +52,10 @@
                         </span>
                         <!-- Log actions are the same as their template name -->
                         <span data-bind="template: {name: log.action, data: log}"></span>
+                        <!-- Merged logs of actions on several files -->
+                        <span class="text-muted" data-bind="if: log.params.files && log.params.files.length">
+                            (and <span data-bind="text: log.params.files.length"></span> more)
+                        </span>
                         <!-- /ko -->
 
                         <!-- For debugging purposes: If a log template for a the Log can't be found, show
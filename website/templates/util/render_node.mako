@@ -75,6 +75,9 @@
                         </span>
                         <!-- log actions are the same as their template name -->
                         <span data-bind="template: {name: log.action, data: log}"></span>
+                        <span class="text-muted" data-bind="if: log.params.files && log.params.files.length">
+                            (and <span data-bind="text: log.params.files.length"></span> more)
+                        </span>
                         </dd>
                 </dl><!-- end foreach logs -->
             </div>
@@ -4,9 +4,9 @@ import os
 import itertools
 
 import furl
-import requests
 
 from framework.exceptions import HTTPError
+from website.util import transport
 
 
 class BaseClient(object):
@@ -19,13 +19,21 @@ class BaseClient(object):
     def _default_headers(self):
         return {}
 
+    @property
+    def _provider(self):
+        """Name of the shared connection pool to use; defaults to the host of
+        each request.
+        """
+        return None
+
     def _make_request(self, method, url, params=None, **kwargs):
         expects = kwargs.pop('expects', None)
         throws = kwargs.pop('throws', None)
 
         kwargs['headers'] = self._build_headers(**kwargs.get('headers', {}))
 
-        response = requests.request(method, url, params=params, auth=self._auth, **kwargs)
+        session = transport.get_session(self._provider or furl.furl(url).host)
+        response = session.request(method, url, params=params, auth=self._auth, **kwargs)
         if expects and response.status_code not in expects:
             raise throws if throws else HTTPError(response.status_code, message=response.content)
 
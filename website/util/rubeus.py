@@ -7,6 +7,7 @@ import datetime
 import hurry.filesize
 from modularodm import Q
 
+from framework.addons import load_addons
 from framework.auth.decorators import Auth
 
 from website.util import paths
@@ -425,6 +426,7 @@ class NodeFileCollector(object):
 
     def _collect_components(self, node, visited):
         rv = []
+        load_addons([child.resolve() for child in node.nodes])
         for child in node.nodes:
             if child.resolve()._id not in visited and not child.is_deleted and node.can_view(self.auth):
                 visited.append(child.resolve()._id)
@@ -502,6 +504,7 @@ def collect_addon_js(node, visited=None, filename='files.js', config_entry='file
         js_path = paths.resolve_addon_path(addon.config, filename)
         if js_path:
             js.add(js_path)
+    load_addons([each.resolve() for each in node.nodes if each._id not in visited])
     for each in node.nodes:
         if each._id not in visited:
             visited.append(each._id)
@@ -520,6 +523,7 @@ def collect_addon_css(node, visited=None):
     css = set()
     for addon in node.get_addons():
         css = css.union(addon.config.include_css.get('files', []))
+    load_addons([each.resolve() for each in node.nodes if each._id not in visited])
     for each in node.nodes:
         if each._id not in visited:
             visited.append(each._id)
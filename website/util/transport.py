@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Pooled HTTP transport for requests to external services. Each process keeps
+one connection pool per provider, shared by all sessions talking to that
+provider, so that keep-alive connections (and their TLS handshakes) are reused
+across requests and users. Requests made through the pools get default
+timeouts, retry connection failures with backoff, and record per-provider
+latency and error counts.
+"""
+
+import time
+import cookielib
+import threading
+import collections
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+from website import settings
+
+
+class ProviderMetrics(object):
+    """Thread-safe request counts and latencies per provider."""
+
+    def __init__(self):
+        self._data = collections.defaultdict(
+            lambda: {'requests': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+        )
+        self._lock = threading.Lock()
+
+    def record(self, provider, seconds, error=False):
+        with self._lock:
+            data = self._data[provider]
+            data['requests'] += 1
+            data['errors'] += int(error)
+            data['seconds'] += seconds
+            data['max_seconds'] = max(data['max_seconds'], seconds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                provider: dict(
+                    data,
+                    mean_seconds=data['seconds'] / data['requests'] if data['requests'] else 0.0,
+                )
+                for provider, data in self._data.iteritems()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+metrics = ProviderMetrics()
+
+
+class PooledAdapter(HTTPAdapter):
+    """Transport adapter that applies a default timeout and records metrics
+    for a provider.
+
+    :param str provider: Name under which metrics are recorded
+    :param timeout: Default timeout in seconds, or (connect, read) tuple
+    """
+
+    def __init__(self, provider, timeout=None, **kwargs):
+        self.provider = provider
+        self.timeout = timeout
+        super(PooledAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        start = time.time()
+        try:
+            response = super(PooledAdapter, self).send(request, **kwargs)
+        except requests.RequestException:
+            metrics.record(self.provider, time.time() - start, error=True)
+            raise
+        metrics.record(
+            self.provider,
+            time.time() - start,
+            error=response.status_code >= 500,
+        )
+        return response
+
+
+class NoCookiePolicy(cookielib.DefaultCookiePolicy):
+    """Refuse all cookies, so that shared sessions never carry state from one
+    user's request into another's.
+    """
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+_adapters = {}
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_adapter(provider):
+    """Get the shared adapter, and thus connection pool, for a provider."""
+    with _lock:
+        if provider not in _adapters:
+            _adapters[provider] = PooledAdapter(
+                provider,
+                timeout=settings.EXTERNAL_HTTP_TIMEOUT,
+                pool_connections=settings.EXTERNAL_HTTP_POOL_HOSTS,
+                pool_maxsize=settings.EXTERNAL_HTTP_POOL_SIZE,
+                max_retries=Retry(
+                    total=settings.EXTERNAL_HTTP_RETRIES,
+                    backoff_factor=settings.EXTERNAL_HTTP_BACKOFF,
+                ),
+            )
+        return _adapters[provider]
+
+
+def mount(session, provider):
+    """Route a session's requests through the shared pool of a provider. Use
+    for sessions that carry per-user state, such as OAuth sessions.
+
+    :param requests.Session session: Session to update
+    :param str provider: Provider name
+    :return: The session
+    """
+    adapter = get_adapter(provider)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(provider):
+    """Get the shared, cookie-less session of a provider, for requests that
+    carry no per-user state other than their own headers or parameters.
+    """
+    with _lock:
+        session = _sessions.get(provider)
+    if session is None:
+        session = requests.Session()
+        session.cookies.set_policy(NoCookiePolicy())
+        mount(session, provider)
+        with _lock:
+            session = _sessions.setdefault(provider, session)
+    return session
@@ -15,17 +15,17 @@ from framework.routing import proxy_url
 from framework.exceptions import HTTPError
 from framework.auth.forms import SignInForm
 from framework.forms import utils as form_utils
-from framework.guid.model import GuidStoredObject
+from framework.guid.model import GuidStoredObject, guid_cache, MISSING_GUID
 from framework.auth.forms import RegistrationForm
 from framework.auth.forms import ResetPasswordForm
 from framework.auth.forms import ForgotPasswordForm
 from framework.auth.decorators import collect_auth
 from framework.auth.decorators import must_be_logged_in
 
+from website import settings
 from website.models import Guid
 from website.models import Node
 from website.util import rubeus
-from website.project import model
 from website.util import web_url_for
 from website.util import permissions
 from website.project import new_dashboard
@@ -306,35 +306,92 @@ def watched_logs_get(**kwargs):
             message_long='Invalid value for "size".'
         ))
 
-    total = sum(1 for x in user.get_recent_log_ids())
-    paginated_logs, pages = paginate(user.get_recent_log_ids(), total, page, size)
-    logs = (model.NodeLog.load(id) for id in paginated_logs)
+    recent_logs = user.get_recent_logs()
+    total = recent_logs.count()
+    pages = math.ceil(total / float(size))
+    logs = recent_logs.offset(page * size).limit(size)
 
     return {
-        "logs": [serialize_log(log) for log in logs],
+        "logs": serialize_logs(logs),
         "total": total,
         "pages": pages,
         "page": page
     }
 
 
-def serialize_log(node_log, anonymous=False):
-    '''Return a dictionary representation of the log.'''
+def load_log_references(logs):
+    '''Load the users and nodes referenced by a list of logs, using one query
+    for each.
+
+    :return: Tuple of (dict mapping user IDs to users, dict mapping node IDs
+        to nodes)
+    '''
+    user_ids, node_ids = set(), set()
+    for node_log in logs:
+        if node_log.user_id:
+            user_ids.add(node_log.user_id)
+        user_ids.update(
+            contributor for contributor in node_log.params.get('contributors', [])
+            if isinstance(contributor, basestring)
+        )
+        node_ids.update(node_log.node_ids)
+    users = dict(
+        (user._id, user)
+        for user in User.find(Q('_id', 'in', list(user_ids)))
+    ) if user_ids else {}
+    nodes = dict(
+        (node._id, node)
+        for node in Node.find(Q('_id', 'in', list(node_ids)))
+    ) if node_ids else {}
+    return users, nodes
+
+
+def serialize_log(node_log, anonymous=False, users=None, nodes=None):
+    '''Return a dictionary representation of the log.
+
+    :param dict users: Optional dict mapping user IDs to preloaded users
+    :param dict nodes: Optional dict mapping node IDs to preloaded nodes
+    '''
+    if users is None or nodes is None:
+        users, nodes = load_log_references([node_log])
+    user = users.get(node_log.user_id)
+    node = node_log.get_node(nodes)
     return {
         'id': str(node_log._primary_key),
-        'user': node_log.user.serialize()
-        if isinstance(node_log.user, User)
+        'user': user.serialize()
+        if isinstance(user, User)
         else {'fullname': node_log.foreign_user},
-        'contributors': [node_log._render_log_contributor(c) for c in node_log.params.get("contributors", [])],
+        'contributors': [
+            node_log._render_log_contributor(c, users=users, nodes=nodes)
+            for c in node_log.params.get("contributors", [])
+        ],
         'api_key': node_log.api_key.label if node_log.api_key else '',
         'action': node_log.action,
         'params': node_log.params,
         'date': utils.iso8601format(node_log.date),
-        'node': node_log.node.serialize() if node_log.node else None,
+        'node': node.serialize() if node else None,
         'anonymous': anonymous
     }
 
 
+def serialize_logs(logs, anonymous=False):
+    '''Serialize a page of logs, loading the users and nodes they reference in
+    bulk rather than once per log.
+
+    :param list logs: Logs to serialize
+    :param anonymous: Whether to anonymize the logs, or a list with one flag
+        per log
+    '''
+    logs = list(logs)
+    if not isinstance(anonymous, list):
+        anonymous = [anonymous] * len(logs)
+    users, nodes = load_log_references(logs)
+    return [
+        serialize_log(node_log, log_anonymous, users=users, nodes=nodes)
+        for node_log, log_anonymous in zip(logs, anonymous)
+    ]
+
+
 def reproducibility():
     return redirect('/ezcuj/wiki')
 
@@ -365,6 +422,51 @@ def _build_guid_url(base, suffix=None):
     return u'/{0}/'.format(url)
 
 
+def _load_guid(guid):
+    """Load a GUID and its referent.
+
+    :param str guid: GUID primary key
+    :return: Tuple of (referent schema name, referent deep URL), or
+        `MISSING_GUID` if the GUID does not exist or has no viewable referent
+    """
+    guid_object = Guid.load(guid)
+    if not guid_object:
+        return MISSING_GUID
+
+    referent = guid_object.referent
+    if referent is None:
+        logger.error('Referent of GUID {0} not found'.format(guid))
+        return MISSING_GUID
+    # verify that the object is a GuidStoredObject descendant. If a model
+    #   was once a descendant but that relationship has changed, it's
+    #   possible to have referents that are instances of classes that don't
+    #   have a redirect_mode attribute or otherwise don't behave as
+    #   expected.
+    if not isinstance(referent, GuidStoredObject):
+        sentry.log_message(
+            'Guid `{}` resolved to non-guid object'.format(guid)
+        )
+        return MISSING_GUID
+    if not referent.deep_url:
+        return MISSING_GUID
+    return referent._name, referent.deep_url
+
+
+def _lookup_guid(guid):
+    """Get the deep URL of the referent of a GUID, using the per-process GUID
+    cache.
+
+    :param str guid: GUID primary key
+    :return: Deep URL, or `None` if the GUID cannot be resolved
+    """
+    resolved = guid_cache.get(guid)
+    if resolved is None:
+        resolved = _load_guid(guid)
+        ttl = settings.GUID_CACHE_MISS_TTL if resolved == MISSING_GUID else None
+        guid_cache.set(guid, resolved, ttl=ttl)
+    return resolved[1]
+
+
 def resolve_guid(guid, suffix=None):
     """Load GUID by primary key, look up the corresponding view function in the
     routing table, and return the return value of the view function without
@@ -375,31 +477,13 @@ def resolve_guid(guid, suffix=None):
     :return: Return value of proxied view function
     """
     # Look up GUID
-    guid_object = Guid.load(guid)
-    if guid_object:
-
-        # verify that the object is a GuidStoredObject descendant. If a model
-        #   was once a descendant but that relationship has changed, it's
-        #   possible to have referents that are instances of classes that don't
-        #   have a redirect_mode attribute or otherwise don't behave as
-        #   expected.
-        if not isinstance(guid_object.referent, GuidStoredObject):
-            sentry.log_message(
-                'Guid `{}` resolved to non-guid object'.format(guid)
-            )
-            raise HTTPError(http.NOT_FOUND)
-        referent = guid_object.referent
-        if referent is None:
-            logger.error('Referent of GUID {0} not found'.format(guid))
-            raise HTTPError(http.NOT_FOUND)
-        if not referent.deep_url:
-            raise HTTPError(http.NOT_FOUND)
-        url = _build_guid_url(referent.deep_url, suffix)
+    deep_url = _lookup_guid(guid)
+    if deep_url:
+        url = _build_guid_url(deep_url, suffix)
         return proxy_url(url)
 
     # GUID not found; try lower-cased and redirect if exists
-    guid_object_lower = Guid.load(guid.lower())
-    if guid_object_lower:
+    if guid.lower() != guid and _lookup_guid(guid.lower()):
         return redirect(
             _build_guid_url(guid.lower(), suffix)
         )